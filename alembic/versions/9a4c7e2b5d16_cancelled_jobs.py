@@ -0,0 +1,31 @@
+"""cancelled jobs
+
+Revision ID: 9a4c7e2b5d16
+Revises: 2d8f6b0e9a14
+Create Date: 2026-10-17 17:25:39.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c7e2b5d16'
+down_revision: Union[str, None] = '2d8f6b0e9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only PostgreSQL stores processingstatus as a native enum type
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE processingstatus ADD VALUE IF NOT EXISTS 'CANCELLED'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # PostgreSQL cannot drop a value from an enum type
+    op.execute("UPDATE processing_jobs SET status = 'FAILED', stage = 'FAILED' WHERE status = 'CANCELLED'")
@@ -1,14 +1,17 @@
+import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 
-from core.utils.config import setup_cors
+from core.logic.worker import run_workers
+from core.services.providers import provider_pool
+from core.utils.config import EMBEDDED_WORKERS, setup_cors
 from core.utils.database import Base, engine
 from core.utils.logging import configure_logging
 
-from .routers import auth, invoices, jobs, orders, users, utils
+from .routers import auth, invoices, jobs, metrics, orders, users, utils
 
 # Load environment variables
 load_dotenv()
@@ -20,8 +23,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # noqa: ARG001
     # Startup: create tables (only for local dev)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Optionally process queued jobs in this process as well
+    stop = asyncio.Event()
+    workers = asyncio.create_task(run_workers(EMBEDDED_WORKERS, stop))
     yield
-    # Shutdown: (if needed later) : await cleanup()
+    # Shutdown: let workers finish their current job, then close pooled
+    # provider clients and their connections
+    stop.set()
+    await workers
+    await provider_pool.aclose()
 
 
 # Create FastAPI app instance
@@ -44,3 +54,4 @@ app.include_router(orders.router, prefix="/orders", tags=["Orders"])
 app.include_router(invoices.router, prefix="/invoices", tags=["Invoices"])
 app.include_router(utils.router, prefix="/utils", tags=["Utils"])
 app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
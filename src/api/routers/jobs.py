@@ -1,15 +1,36 @@
 # api/routers/jobs.py
 
-from typing import Annotated
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.crud import artifacts as crud_artifacts
 from core.crud import jobs as crud_jobs
 from core.db import models
-from core.schemas.job import ProcessingJobResponse
+from core.logic.worker import interrupt_job
+from core.schemas.job import (
+    BatchJobResponse,
+    JobEvent,
+    ProcessingJobCreate,
+    ProcessingJobResponse,
+    ReextractResponse,
+)
+from core.services.scheduler import scheduling_priority
 from core.utils.auth import get_current_user
-from core.utils.database import get_db
+from core.utils.config import (
+    JOB_EVENTS_POLL_SECONDS,
+    ArtifactKind,
+    Priority,
+    ProcessingStatus,
+)
+from core.utils.database import async_session_maker, get_db
+from core.utils.events import job_events
+from core.utils.idsvc import generate_id
+from core.utils.process import reextract_document
 
 router = APIRouter()
 
@@ -37,3 +58,179 @@ async def get_job_by_id(
     if not job or (job.created_by != user.id and user.role != "admin"):
         raise HTTPException(status_code=404, detail="Job not found")
     return ProcessingJobResponse.model_validate(job, from_attributes=True)
+
+
+@router.get("/{job_id}/batch")
+async def get_batch(
+    job_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[models.User, Depends(get_current_user)],
+) -> BatchJobResponse:
+    """Retrieve a batch job with the progress and result of each of its files."""
+    job = await crud_jobs.get_job_by_id(db, job_id)
+    if not job or (job.created_by != user.id and user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    children = [
+        ProcessingJobResponse.model_validate(child, from_attributes=True)
+        for child in await crud_jobs.get_children(db, job_id)
+    ]
+    counts = dict.fromkeys(ProcessingStatus, 0)
+    for child in children:
+        counts[child.status] += 1
+
+    return BatchJobResponse(
+        job=ProcessingJobResponse.model_validate(job, from_attributes=True),
+        total=len(children),
+        counts=counts,
+        finished=not counts[ProcessingStatus.PENDING]
+        and not counts[ProcessingStatus.PROCESSING],
+        children=children,
+    )
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(
+    job_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[models.User, Depends(get_current_user)],
+) -> ProcessingJobResponse:
+    """Cancel a queued or running job, or the unfinished files of a batch.
+
+    Work in flight is interrupted right away when it runs in this process, and
+    at the next heartbeat of a standalone worker.
+    """
+    job = await crud_jobs.get_job_by_id(db, job_id)
+    if not job or (job.created_by != user.id and user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status not in crud_jobs.ACTIVE_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Job already finished"
+        )
+
+    for cancelled_id, previous in await crud_jobs.cancel_job(db, job_id):
+        if previous == ProcessingStatus.PROCESSING:
+            # The worker running it stops
+            interrupt_job(cancelled_id)
+    if job.parent_id is not None:
+        await crud_jobs.settle_batch(db, job.parent_id)
+
+    await db.refresh(job)
+    return ProcessingJobResponse.model_validate(job, from_attributes=True)
+
+
+@router.get("/{job_id}/artifacts/{kind}")
+async def get_job_artifact(
+    job_id: str,
+    kind: ArtifactKind,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[models.User, Depends(get_current_user)],
+) -> Any:  # noqa: ANN401
+    """Retrieve an intermediate output of a job, such as its parsed pages."""
+    job = await crud_jobs.get_job_by_id(db, job_id)
+    if not job or (job.created_by != user.id and user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    artifact = await crud_artifacts.get_artifact(db, job_id, kind)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return artifact
+
+
+@router.post("/{job_id}/reextract")
+async def reextract_job(
+    job_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[models.User, Depends(get_current_user)],
+    apply: bool = False,  # noqa: FBT001, FBT002
+) -> ReextractResponse:
+    """Extract the document of a job again from its stored pages, without parsing.
+
+    The new data is returned; with ``apply`` it also replaces the data of the
+    order or invoice the job created. The extraction runs as a new job.
+    """
+    source = await crud_jobs.get_job_by_id(db, job_id)
+    if not source or (source.created_by != user.id and user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    if source.status in crud_jobs.ACTIVE_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Job not finished yet"
+        )
+
+    new_id = generate_id("J")
+    await crud_jobs.create_job(
+        db,
+        ProcessingJobCreate(
+            id=new_id,
+            file_name=source.file_name,
+            created_by=user.id,
+            status=ProcessingStatus.PROCESSING,
+            content_digest=source.content_digest,
+            priority=Priority.INTERACTIVE,
+        ),
+    )
+    try:
+        with scheduling_priority(Priority.INTERACTIVE):
+            extracted, document_type = await reextract_document(
+                db=db, job_id=new_id, source_job=source, apply=apply
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        ) from e
+
+    job = await crud_jobs.get_job_by_id(db, new_id)
+    return ReextractResponse(
+        job_id=new_id,
+        source_job_id=job_id,
+        document_type=document_type,
+        result_id=job.result_id if job else None,
+        applied=apply,
+        data=extracted.model_dump(mode="json"),
+    )
+
+
+async def _job_event_stream(job_id: str, initial: JobEvent) -> AsyncIterator[str]:
+    """Yield server-sent events for each transition of a job until it finishes."""
+    with job_events.subscribe(job_id) as queue:
+        last = initial
+        yield f"event: job\ndata: {last.model_dump_json()}\n\n"
+
+        while not last.finished:
+            try:
+                event = await asyncio.wait_for(queue.get(), JOB_EVENTS_POLL_SECONDS)
+            except TimeoutError:
+                # The job may run in a worker process that publishes elsewhere
+                async with async_session_maker() as db:
+                    job = await crud_jobs.get_job_by_id(db, job_id)
+                if job is None:
+                    return
+                event = JobEvent.from_job(job)
+
+            if (event.status, event.stage) == (last.status, last.stage):
+                yield ": keep-alive\n\n"
+                continue
+
+            last = event
+            yield f"event: job\ndata: {last.model_dump_json()}\n\n"
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[models.User, Depends(get_current_user)],
+) -> StreamingResponse:
+    """Stream status transitions of a job as server-sent events.
+
+    The stream starts with the current state and ends once the job succeeded
+    or failed.
+    """
+    job = await crud_jobs.get_job_by_id(db, job_id)
+    if not job or (job.created_by != user.id and user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        _job_event_stream(job_id, JobEvent.from_job(job)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
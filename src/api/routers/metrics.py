@@ -0,0 +1,20 @@
+# api/routers/metrics.py
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from core.db import models
+from core.schemas.metrics import MetricsSnapshot
+from core.utils.auth import is_admin
+from core.utils.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_metrics(
+    _user: Annotated[models.User, Depends(is_admin)],
+) -> MetricsSnapshot:
+    """Return in-process counters such as cache hits and misses."""
+    return MetricsSnapshot.model_validate(metrics.snapshot())
@@ -1,7 +1,5 @@
 import logging
 from enum import Enum
-from pathlib import Path
-from tempfile import NamedTemporaryFile
 from typing import Annotated
 
 from fastapi import (
@@ -15,6 +13,7 @@ from fastapi import (
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.crud import blobs as crud_blobs
 from core.crud import jobs as crud_jobs
 from core.crud import orders as crud_orders
 from core.db import models
@@ -24,9 +23,14 @@ from core.schemas import order as order_schemas
 from core.schemas.classifier import DocumentType
 from core.schemas.common import PaginatedResponse
 from core.services.factories import EXTRACTOR_REGISTRY, PARSER_REGISTRY
+from core.services.scheduler import scheduling_priority
 from core.utils.auth import get_current_user, is_admin_or_entity_owner
+from core.utils.blobs import blob_store
+from core.utils.config import Priority
 from core.utils.database import get_db
 from core.utils.idsvc import generate_id
+from core.utils.ingest import UploadTooLargeError
+from core.utils.process import sanitize_filename
 
 
 class ParserOption(str, Enum):  # noqa: D101
@@ -176,8 +180,6 @@ async def generate(
     model: ModelOption = ModelOption.openai,
 ) -> order_schemas.Order:
     """Receive a document and return structured Order data."""
-    suffix = Path(file.filename or "").suffix.lower()
-
     if parser not in PARSER_REGISTRY:
         raise HTTPException(status_code=400, detail=f"Unknown parser: {parser}")
     if (model, "order") not in EXTRACTOR_REGISTRY:
@@ -185,43 +187,39 @@ async def generate(
             status_code=400, detail=f"Unknown extractor for order with model: {model}"
         )
 
-    tmp_path: Path
+    filename = sanitize_filename(file.filename or "upload.pdf")
+    try:
+        blob = await blob_store.put_upload(file, filename)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        ) from e
+    await crud_blobs.register_blobs(db, [blob])
 
     try:
-        with NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            contents = await file.read()
-            tmp.write(contents)
-            tmp_path = Path(tmp.name)
-
-        try:
-            parser_instance = PARSER_REGISTRY[parser](tmp_path, "en")
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e)) from e
-
-        job_id = generate_id("J")
-
-        await crud_jobs.create_job(
-            db,
-            job_schemas.ProcessingJobCreate(
-                id=job_id,
-                file_name=tmp_path.name,
-                created_by=current_user.id,
-            ),
-        )
+        parser_instance = PARSER_REGISTRY[parser](blob.path, "en")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
-        pipeline = DocumentPipeline[order_schemas.Order](
-            parser=parser_instance,
-            extractor=EXTRACTOR_REGISTRY[(model, "order")](),
-            document_type=DocumentType.ORDER,
-            db=db,
-            job_id=job_id,
-        )
+    job_id = generate_id("J")
+    await crud_jobs.create_job(
+        db,
+        job_schemas.ProcessingJobCreate(
+            id=job_id,
+            file_name=filename,
+            created_by=current_user.id,
+            content_digest=blob.digest,
+            priority=Priority.INTERACTIVE,
+        ),
+    )
+
+    pipeline = DocumentPipeline[order_schemas.Order](
+        parser=parser_instance,
+        model=model,
+        document_type=DocumentType.ORDER,
+        db=db,
+        job_id=job_id,
+    )
+    with scheduling_priority(Priority.INTERACTIVE):
         result, _doc_type = await pipeline.run()
-        return result
-
-    finally:
-        try:
-            if tmp_path.exists():
-                tmp_path.unlink()
-        except OSError as exc:
-            logger.exception("Failed to clean up temporary file: %s", exc)  # noqa: TRY401
+    return result
@@ -1,14 +1,12 @@
 import logging
 import os
-from datetime import UTC, datetime
-from pathlib import Path
-from typing import Annotated, cast
+import zipfile
+from typing import Annotated
 
 import anyio
 from dotenv import load_dotenv
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Depends,
     File,
     Form,
@@ -17,30 +15,42 @@ from fastapi import (
     UploadFile,
     status,
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import FormData
 from starlette.datastructures import UploadFile as StarletteUploadFile
 
+from core.crud import blobs as crud_blobs
+from core.crud import emails as crud_emails
 from core.crud import jobs as crud_jobs
 from core.crud import users as crud_users
 from core.db import models
+from core.schemas import email as email_schemas
 from core.schemas import job as job_schemas
-from core.schemas.invoice import InvoiceResponse
-from core.schemas.order import OrderResponse
 from core.utils.auth import get_current_user
-from core.utils.background import run_document_pipeline_background
+from core.utils.batch import (
+    BatchTooLargeError,
+    extract_zip_members,
+    is_zip_upload,
+)
+from core.utils.blobs import StoredBlob, blob_store
+from core.utils.config import (
+    BATCH_MAX_BYTES,
+    BATCH_MAX_CONCURRENCY,
+    BATCH_MAX_FILES,
+    MAX_UPLOAD_BYTES,
+    Priority,
+    ProcessingStatus,
+)
 from core.utils.database import get_db
 from core.utils.idsvc import generate_id
-from core.utils.process import (
-    is_dangerous_file,
-    process_uploaded_document,
-    sanitize_filename,
-)
+from core.utils.ingest import UploadTooLargeError
+from core.utils.process import is_dangerous_file, sanitize_filename
 
 load_dotenv()
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-INBOX_ROOT = Path("inbox")
 MAILGUN_SIGNING_KEY = os.environ["MAILGUN_SIGNING_KEY"]
 
 
@@ -60,17 +70,22 @@ def is_valid_mailgun_signature(
         return False
 
 
-@router.post("/inbound-email", response_model=list[OrderResponse | InvoiceResponse])
+@router.post("/inbound-email", status_code=status.HTTP_202_ACCEPTED)
 async def receive(  # noqa: PLR0913
     request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     sender: Annotated[str | None, Form()] = None,
-    recipient: Annotated[str | None, Form()] = None,  # noqa: ARG001
+    recipient: Annotated[str | None, Form()] = None,
     subject: Annotated[str | None, Form()] = None,
     body_plain: Annotated[str | None, Form()] = None,  # noqa: ARG001
     body_html: Annotated[str | None, Form()] = None,  # noqa: ARG001
-) -> list[OrderResponse | InvoiceResponse]:
-    """Process incoming email and parse all valid attachments."""
+) -> email_schemas.InboundEmailQueuedResponse:
+    """Accept an incoming email and queue a job for each valid attachment.
+
+    Attachments are stored and queued before responding; workers process them
+    concurrently in the background. Progress and results are available from
+    ``GET /utils/inbound-email/{email_id}``.
+    """
     logger.info("✅ Received inbound email from %s", sender)
 
     if not sender or not subject:
@@ -91,92 +106,247 @@ async def receive(  # noqa: PLR0913
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid signature"
         )
 
+    # Mailgun redelivers webhooks that time out, answer those with the
+    # jobs of the first delivery instead of processing the email again
+    message_id = str(form.get("Message-Id") or form.get("token"))
+    existing = await crud_emails.get_email_by_message_id(db, message_id)
+    if existing is not None:
+        logger.info(f"🔁 Email {message_id} already received as {existing.id}")
+        return _queued_email(existing, duplicate=True)
+
     user = await crud_users.get_user_by_email(db, sender)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    inbox_path = INBOX_ROOT / datetime.now(tz=UTC).strftime("%Y%m%d-%H%M%S")
-    inbox_path.mkdir(parents=True, exist_ok=True)
-
-    results: list[OrderResponse | InvoiceResponse] = []
-
-    for _, value in form.multi_items():
-        if isinstance(value, StarletteUploadFile):
-            raw_name = value.filename or "attachment.bin"
-            filename = sanitize_filename(raw_name)
-
-            if is_dangerous_file(filename):
-                logger.warning(f"⛔ Rejected dangerous file: {filename}")
-                continue
-
-            file_path = inbox_path / filename
-            async with await anyio.open_file(file_path, "wb") as f:
-                content = await value.read()
-                await f.write(content)
-
-            logger.info(f"📎 Saved attachment: {file_path}")
-
-            try:
-                job_id = generate_id("J")
-
-                await crud_jobs.create_job(
-                    db,
-                    job_schemas.ProcessingJobCreate(
-                        id=job_id,
-                        file_name=filename,
-                        created_by=user.id,
-                    ),
-                )
-
-                parsed = await process_uploaded_document(
-                    db=db, user=user, job_id=job_id, file_path=file_path
-                )
-
-                results.append(cast("OrderResponse | InvoiceResponse", parsed))
+    stored = await _store_attachments(form)
+    await crud_blobs.register_blobs(db, [blob for _, blob in stored])
+    if not stored:
+        raise HTTPException(status_code=422, detail="No valid attachments found")
 
-            finally:
-                file_path.unlink(missing_ok=True)
+    jobs = [
+        job_schemas.ProcessingJobCreate(
+            id=generate_id("J"),
+            file_name=filename,
+            created_by=user.id,
+            file_path=str(blob.path),
+            content_digest=blob.digest,
+            priority=Priority.BULK,
+        )
+        for filename, blob in stored
+    ]
+    try:
+        email = await crud_emails.create_inbound_email(
+            db,
+            email_schemas.InboundEmailCreate(
+                id=generate_id("E"),
+                message_id=message_id,
+                sender=sender,
+                recipient=recipient,
+                subject=subject,
+                created_by=user.id,
+            ),
+            jobs,
+        )
+    except IntegrityError:
+        # A concurrent redelivery recorded the email first
+        await db.rollback()
+        existing = await crud_emails.get_email_by_message_id(db, message_id)
+        if existing is None:
+            raise
+        return _queued_email(existing, duplicate=True)
+
+    logger.info(f"📨 Queued {len(jobs)} attachments of email {email.id}")
+    return _queued_email(email)
+
+
+def _queued_email(
+    email: models.InboundEmail, *, duplicate: bool = False
+) -> email_schemas.InboundEmailQueuedResponse:
+    """Build the webhook response listing the jobs of an email."""
+    return email_schemas.InboundEmailQueuedResponse(
+        email_id=email.id, job_ids=[job.id for job in email.jobs], duplicate=duplicate
+    )
 
-    if not results:
-        raise HTTPException(status_code=422, detail="No valid attachments found")
 
-    return results
+@router.get("/inbound-email/{email_id}")
+async def get_inbound_email(
+    email_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[models.User, Depends(get_current_user)],
+) -> email_schemas.InboundEmailResponse:
+    """Retrieve an inbound email with the progress and result of its attachments."""
+    email = await crud_emails.get_email_by_id(db, email_id)
+    if not email or (email.created_by != user.id and user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Email not found")
+    return email_schemas.InboundEmailResponse.model_validate(
+        email, from_attributes=True
+    )
 
 
-@router.post("/upload")
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_order_from_web(
     file: Annotated[UploadFile, File(...)],
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[models.User, Depends(get_current_user)],
-    background_tasks: BackgroundTasks,
 ) -> job_schemas.JobQueuedResponse:
-    """Support authenticated frontend users uploading a document asynchronously."""
+    """Support authenticated frontend users uploading a document asynchronously.
+
+    The document is stored and a job is queued; workers pick it up from the
+    processing queue.
+    """
     logger.info("🌐 Upload received from %s", current_user.email)
 
     filename = sanitize_filename(file.filename or "upload.pdf")
-    tmp_path = Path(f"/tmp/{filename}")  # noqa: S108
-
-    async with await anyio.open_file(tmp_path, "wb") as f:
-        content = await file.read()
-        await f.write(content)
+    try:
+        blob = await blob_store.put_upload(file, filename)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        ) from e
+    await crud_blobs.register_blobs(db, [blob])
 
     job_id = generate_id("J")
-
     await crud_jobs.create_job(
         db,
         job_schemas.ProcessingJobCreate(
             id=job_id,
-            file_name=tmp_path.name,
+            file_name=filename,
             created_by=current_user.id,
+            file_path=str(blob.path),
+            content_digest=blob.digest,
+            priority=Priority.INTERACTIVE,
         ),
     )
 
-    background_tasks.add_task(
-        run_document_pipeline_background,
-        db=db,
-        user=current_user,
-        file_path=str(tmp_path),
-        job_id=job_id,
+    return job_schemas.JobQueuedResponse(job_id=job_id)
+
+
+async def _store_attachments(form: FormData) -> list[tuple[str, StoredBlob]]:
+    """Store the attachments of an email in the blob store.
+
+    Dangerous, oversized and repeated attachments are skipped.
+    """
+    stored: dict[str, tuple[str, StoredBlob]] = {}
+    for _, value in form.multi_items():
+        if not isinstance(value, StarletteUploadFile):
+            continue
+
+        filename = sanitize_filename(value.filename or "attachment.bin")
+        if is_dangerous_file(filename):
+            logger.warning(f"⛔ Rejected dangerous file: {filename}")
+            continue
+
+        try:
+            blob = await blob_store.put_upload(value, filename)
+        except UploadTooLargeError:
+            logger.warning(f"⛔ Rejected oversized attachment: {filename}")
+            continue
+        if blob.digest in stored:
+            logger.info(f"🔁 Skipped repeated attachment: {filename}")
+            continue
+
+        logger.info(f"📎 Saved attachment: {filename}")
+        stored[blob.digest] = (filename, blob)
+    return list(stored.values())
+
+
+async def _store_batch_files(
+    files: list[UploadFile], stored: list[tuple[str, StoredBlob]]
+) -> None:
+    """Store uploaded files and the members of uploaded ZIPs, chunk by chunk.
+
+    Every file and archive member counts towards the ``BATCH_MAX_BYTES`` of
+    the whole batch.
+    """
+    for file in files:
+        filename = sanitize_filename(file.filename or "upload.pdf")
+        remaining = BATCH_MAX_BYTES - sum(blob.size for _, blob in stored)
+        if is_zip_upload(filename, file.content_type):
+            stored += await anyio.to_thread.run_sync(
+                extract_zip_members,
+                file.file,
+                blob_store.put,
+                BATCH_MAX_FILES - len(stored),
+                remaining,
+            )
+            continue
+
+        if is_dangerous_file(filename):
+            logger.warning(f"⛔ Rejected dangerous file: {filename}")
+            continue
+        if len(stored) >= BATCH_MAX_FILES:
+            msg = f"A batch holds at most {BATCH_MAX_FILES} files"
+            raise BatchTooLargeError(msg)
+
+        try:
+            blob = await blob_store.put_upload(
+                file, filename, min(MAX_UPLOAD_BYTES, remaining)
+            )
+        except UploadTooLargeError as e:
+            if remaining >= MAX_UPLOAD_BYTES:
+                raise
+            msg = f"A batch holds at most {BATCH_MAX_BYTES} bytes"
+            raise BatchTooLargeError(msg) from e
+        stored.append((filename, blob))
+
+
+@router.post("/upload/batch", status_code=status.HTTP_202_ACCEPTED)
+async def upload_batch(
+    files: Annotated[list[UploadFile], File(...)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    max_concurrency: Annotated[int, Form(ge=1)] = BATCH_MAX_CONCURRENCY,
+) -> job_schemas.BatchQueuedResponse:
+    """Queue many documents, or ZIP archives of documents, as one batch.
+
+    Every file gets its own job under a batch job; at most ``max_concurrency``
+    files of the batch are processed at the same time. Progress and results
+    are available from ``GET /jobs/{batch_id}/batch``.
+    """
+    logger.info(f"🌐 Batch upload of {len(files)} files from {current_user.email}")
+
+    stored: list[tuple[str, StoredBlob]] = []
+    try:
+        await _store_batch_files(files, stored)
+    except (BatchTooLargeError, UploadTooLargeError, zipfile.BadZipFile) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST
+            if isinstance(e, zipfile.BadZipFile)
+            else status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        ) from e
+    finally:
+        # Blobs of a rejected batch may be shared with other uploads, they are
+        # only deleted by the collector once nothing refers to them
+        await crud_blobs.register_blobs(db, [blob for _, blob in stored])
+
+    if not stored:
+        raise HTTPException(status_code=422, detail="No valid files found")
+
+    batch_id = generate_id("B")
+    children = [
+        job_schemas.ProcessingJobCreate(
+            id=generate_id("J"),
+            file_name=filename,
+            created_by=current_user.id,
+            file_path=str(blob.path),
+            content_digest=blob.digest,
+            priority=Priority.BULK,
+        )
+        for filename, blob in stored
+    ]
+    await crud_jobs.create_batch(
+        db,
+        job_schemas.ProcessingJobCreate(
+            id=batch_id,
+            file_name=f"{len(children)} files",
+            created_by=current_user.id,
+            status=ProcessingStatus.PROCESSING,
+            max_concurrency=max_concurrency,
+        ),
+        children,
     )
 
-    return job_schemas.JobQueuedResponse(job_id=job_id)
+    return job_schemas.BatchQueuedResponse(
+        batch_id=batch_id, job_ids=[child.id for child in children]
+    )
@@ -1,38 +1,73 @@
 import asyncio
+import contextlib
+import json
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import Annotated, Any, TextIO
 
 import typer
 from dotenv import load_dotenv
 from rich import print  # noqa: A004
+from rich.console import Console
 from rich.pretty import Pretty
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    ProgressColumn,
+    Task,
+    TextColumn,
+    TimeElapsedColumn,
+    TimeRemainingColumn,
+)
+from rich.text import Text
 
 from core.logic.pipeline import DocumentPipeline
+from core.logic.reprocess import Reprocessor, ReprocessSelection
+from core.logic.worker import run_workers
 from core.schemas.classifier import DocumentType
+from core.services.extractors.base import AbstractExtractor
 from core.services.factories import EXTRACTOR_REGISTRY, PARSER_REGISTRY
+from core.services.providers import provider_pool
+from core.utils.config import (
+    DEFAULT_PARSER,
+    WORKER_CONCURRENCY,
+    WORKER_DRAIN_TIMEOUT_SECONDS,
+    WORKER_STATS_INTERVAL_SECONDS,
+    ObjectStatus,
+)
 from core.utils.logging import configure_logging
 
-if TYPE_CHECKING:
-    from core.schemas.invoice import Invoice
-    from core.schemas.order import Order
-
 app = typer.Typer()
+REPROCESS_OUTPUT = Path("reprocess.jsonl")
 configure_logging()
 load_dotenv()
 
 
 @app.command()
 def parse(  # noqa: PLR0913
-    path: Path,
+    paths: Annotated[
+        list[str], typer.Argument(help="Documents, directories or glob patterns")
+    ],
     entity: str = typer.Option("order", help="Entity type (order or invoice)"),
     parser: str = typer.Option("llamaparse", help="Document parser"),
     model: str = typer.Option("openai", help="LLM model"),
     language: str = "en",
+    concurrency: int = typer.Option(4, help="Documents parsed concurrently"),
+    output: Annotated[
+        Path | None, typer.Option(help="JSON Lines file of results, or stdout")
+    ] = None,
     show: bool = False,  # noqa: FBT001, FBT002
 ) -> None:
-    """Parse a document and extract structured data."""
-    typer.echo(f"📄 Parsing '{path}' as {entity} using {model} + {parser}")
+    """Parse documents and extract structured data as JSON Lines.
 
+    Directories are searched recursively. A document that fails is reported
+    and the others are still parsed; the exit code is 1 when any failed.
+    """
     if parser not in PARSER_REGISTRY:
         error_msg = f"Invalid parser: {parser}. Available: {list(PARSER_REGISTRY)}"
         raise typer.BadParameter(error_msg)
@@ -41,39 +76,259 @@ def parse(  # noqa: PLR0913
         error_msg = f"Invalid extractor: ({model}, {entity})"
         raise typer.BadParameter(error_msg)
 
-    asyncio.run(_parse_internal(path, language, parser, model, entity, show))
+    files = _expand_paths(paths)
+    if not files:
+        error_msg = "No documents match the given paths"
+        raise typer.BadParameter(error_msg)
 
+    typer.echo(
+        f"📄 Parsing {len(files)} documents as {entity} using {model} + {parser}",
+        err=True,
+    )
+    options = _ParseOptions(language, parser, model, entity, show=show)
+    failed = asyncio.run(_parse_internal(files, options, concurrency, output))
+    if failed:
+        raise typer.Exit(code=1)
 
-async def _parse_internal(  # noqa: PLR0913
-    path: Path,
-    language: str,
-    parser: str,
-    model: str,
-    entity: str,
-    show: bool,  # noqa: FBT001
-) -> None:
-    print("🔍 Starting parse")
-    parser_instance = PARSER_REGISTRY[parser](path, language)
-    print(f"🧩 Using parser: {parser_instance.__class__.__name__}")
-    extractor_instance = EXTRACTOR_REGISTRY[(model, entity)]()
-    print(f"🤖 Using extractor: {extractor_instance.__class__.__name__}")
+
+def _is_pattern(part: str) -> bool:
+    return any(char in part for char in "*?[")
+
+
+def _expand_paths(paths: list[str]) -> list[Path]:
+    """Return the documents named, found in directories or matching patterns."""
+    files: dict[Path, None] = {}
+    for arg in paths:
+        path = Path(arg)
+        if path.is_dir():
+            matches = sorted(path.rglob("*"))
+        elif magic := [i for i, part in enumerate(path.parts) if _is_pattern(part)]:
+            # Patterns are matched from the directory their fixed part names
+            base = Path(*path.parts[: magic[0]])
+            matches = sorted(base.glob(str(Path(*path.parts[magic[0] :]))))
+        else:
+            # Missing files are reported as failures along with the others
+            matches = [path]
+        files.update(
+            (match, None)
+            for match in matches
+            if not match.name.startswith(".") and not match.is_dir()
+        )
+    return list(files)
+
+
+@dataclass(frozen=True)
+class _ParseOptions:
+    language: str
+    parser: str
+    model: str
+    entity: str
+    show: bool = False
+
+
+class _ThroughputColumn(ProgressColumn):
+    """Documents completed per second."""
+
+    def render(self, task: Task) -> Text:
+        """Render the throughput observed over the recent completions."""
+        if task.speed is None:
+            return Text("-- docs/s", style="progress.data.speed")
+        return Text(f"{task.speed:.2f} docs/s", style="progress.data.speed")
+
+
+async def _parse_internal(
+    files: list[Path], options: _ParseOptions, concurrency: int, output: Path | None
+) -> int:
+    """Parse documents concurrently, writing a JSON line for each.
+
+    Returns the number of documents that failed.
+    """
+    console = Console(stderr=True)
+    extractor = EXTRACTOR_REGISTRY[(options.model, options.entity)]()
+    failures: list[dict[str, Any]] = []
+    queue = iter(files)
+    progress = Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        _ThroughputColumn(),
+        TimeElapsedColumn(),
+        TextColumn("ETA"),
+        TimeRemainingColumn(),
+        console=console,
+    )
+    task = progress.add_task("🔍 Parsing", total=len(files))
+
+    async def work(out: TextIO) -> None:
+        for path in queue:
+            record = await _parse_one(path, options, extractor)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if "error" in record:
+                failures.append(record)
+            elif options.show:
+                progress.console.print(Pretty(record["data"]))
+            progress.advance(task)
 
     try:
-        pipeline: DocumentPipeline[Any]
-        result: Order | Invoice
+        with contextlib.ExitStack() as stack:
+            out = (
+                stack.enter_context(output.open("w", encoding="utf-8"))
+                if output
+                else sys.stdout
+            )
+            stack.enter_context(progress)
+            await asyncio.gather(*(work(out) for _ in range(max(concurrency, 1))))
+    finally:
+        await provider_pool.aclose()
+
+    console.print(f"✅ Parsed {len(files) - len(failures)} of {len(files)} documents")
+    if failures:
+        console.print(f"❌ {len(failures)} failed:")
+        for record in failures:
+            console.print(f"  {record['path']}: {record['error']}")
+    return len(failures)
+
+
+async def _parse_one(
+    path: Path, options: _ParseOptions, extractor: AbstractExtractor[Any]
+) -> dict[str, Any]:
+    """Parse one document into its JSON line, holding the error on failure."""
+    started = time.perf_counter()
+    try:
         pipeline = DocumentPipeline[Any](
-            parser=parser_instance,
-            extractor=extractor_instance,
-            document_type=DocumentType(entity),
+            parser=PARSER_REGISTRY[options.parser](path, options.language),
+            extractor=extractor,
+            model=options.model,
+            document_type=DocumentType(options.entity),
         )
         result, _doc_type = await pipeline.run()
-    except Exception as e:
-        print(f"❌ Pipeline failed: {e}")
-        raise
+    except Exception as e:  # noqa: BLE001
+        return {
+            "path": str(path),
+            "error": str(e) or type(e).__name__,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    return {
+        "path": str(path),
+        "document_type": options.entity,
+        "data": result.model_dump(mode="json"),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
 
-    if show:
-        print("✅ Parsed Structured Data:")
-        print(Pretty(result.model_dump()))
+@app.command()
+def worker(
+    concurrency: int = typer.Option(WORKER_CONCURRENCY, help="Jobs run concurrently"),
+    stats_interval: float = typer.Option(
+        WORKER_STATS_INTERVAL_SECONDS, help="Seconds between throughput reports"
+    ),
+    drain_timeout: float = typer.Option(
+        WORKER_DRAIN_TIMEOUT_SECONDS,
+        help="Seconds to let running jobs finish after SIGTERM",
+    ),
+) -> None:
+    """Process queued documents until SIGTERM or SIGINT."""
+    typer.echo(f"👷 Starting {concurrency} workers")
+    asyncio.run(_worker_internal(concurrency, stats_interval, drain_timeout))
+
+
+async def _worker_internal(
+    concurrency: int, stats_interval: float, drain_timeout: float
+) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await run_workers(concurrency, stop, stats_interval, drain_timeout)
+    finally:
+        await provider_pool.aclose()
+
+
+@app.command()
+def reprocess(  # noqa: PLR0913
+    output: Annotated[
+        Path, typer.Option(help="JSON Lines file of the changes, used to resume")
+    ] = REPROCESS_OUTPUT,
+    entity: Annotated[
+        list[str] | None, typer.Option(help="Only entity types (order, invoice)")
+    ] = None,
+    status: Annotated[
+        list[ObjectStatus] | None, typer.Option(help="Only documents in status")
+    ] = None,
+    since: Annotated[
+        datetime | None, typer.Option(help="Only documents created since")
+    ] = None,
+    until: Annotated[
+        datetime | None, typer.Option(help="Only documents created before")
+    ] = None,
+    concurrency: Annotated[
+        int, typer.Option(help="Documents extracted concurrently")
+    ] = WORKER_CONCURRENCY,
+    apply: Annotated[  # noqa: FBT002
+        bool, typer.Option(help="Replace stored data with the new data")
+    ] = False,
+    reparse: Annotated[  # noqa: FBT002
+        bool, typer.Option(help="Parse source documents again, not stored pages")
+    ] = False,
+    parser: Annotated[
+        str, typer.Option(help="Parser for source documents")
+    ] = DEFAULT_PARSER,
+) -> None:
+    """Extract stored orders and invoices again and write what changed.
+
+    Stops taking new documents on SIGTERM or SIGINT; running it again with the
+    same output resumes where it stopped.
+    """
+    if parser not in PARSER_REGISTRY:
+        error_msg = f"Invalid parser: {parser}. Available: {list(PARSER_REGISTRY)}"
+        raise typer.BadParameter(error_msg)
+    try:
+        document_types = tuple(
+            DocumentType(name) for name in entity or ("order", "invoice")
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+    selection = ReprocessSelection(
+        document_types=document_types,
+        statuses=tuple(status or ()),
+        created_from=_as_utc(since),
+        created_until=_as_utc(until),
+    )
+    reprocessor = Reprocessor(
+        output=output,
+        concurrency=concurrency,
+        apply=apply,
+        reparse=reparse,
+        parser=parser,
+    )
+    typer.echo(f"♻️ Reprocessing into '{output}' with {concurrency} at a time")
+    counts = asyncio.run(_reprocess_internal(reprocessor, selection))
+    print(f"✅ Done: {dict(counts)}")
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    """Take dates given without a time zone as UTC."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=UTC)
+
+
+async def _reprocess_internal(
+    reprocessor: Reprocessor, selection: ReprocessSelection
+) -> dict[str, int]:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        return dict(await reprocessor.run(selection, stop))
+    finally:
+        await provider_pool.aclose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+import json
+import zlib
+from typing import Any
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db.models import JobArtifact, ProcessingJob
+from core.utils.config import ARTIFACT_COMPRESSION_LEVEL, ArtifactKind
+
+
+async def save_artifacts(
+    db: AsyncSession, job_id: str, artifacts: dict[ArtifactKind, Any]
+) -> None:
+    """Store intermediate outputs of a job as zlib-compressed JSON.
+
+    An artifact of the same kind stored by an earlier attempt is replaced.
+    """
+    for kind, value in artifacts.items():
+        raw = json.dumps(value, ensure_ascii=False).encode()
+        await db.merge(
+            JobArtifact(
+                job_id=job_id,
+                kind=kind,
+                content=zlib.compress(raw, ARTIFACT_COMPRESSION_LEVEL),
+                size=len(raw),
+            )
+        )
+    await db.commit()
+
+
+async def get_artifact(db: AsyncSession, job_id: str, kind: ArtifactKind) -> Any:  # noqa: ANN401
+    """Return an artifact of a job, or None when it was not stored."""
+    content = await db.scalar(
+        select(JobArtifact.content).where(
+            JobArtifact.job_id == job_id, JobArtifact.kind == kind
+        )
+    )
+    return None if content is None else json.loads(zlib.decompress(content))
+
+
+async def get_source_job(db: AsyncSession, document_id: str) -> ProcessingJob | None:
+    """Return the latest job that parsed an order or invoice and kept its pages."""
+    stmt = (
+        select(ProcessingJob)
+        .where(
+            ProcessingJob.result_id == document_id,
+            exists().where(
+                JobArtifact.job_id == ProcessingJob.id,
+                JobArtifact.kind == ArtifactKind.PAGES,
+            ),
+        )
+        .order_by(ProcessingJob.created_at.desc())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
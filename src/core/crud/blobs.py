@@ -0,0 +1,78 @@
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from sqlalchemy import ColumnElement, delete, exists, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.crud.jobs import ACTIVE_STATUSES
+from core.db.models import Blob, Invoice, Order, ProcessingJob
+from core.utils.blobs import StoredBlob
+
+# PostgreSQL advisory lock key held by the running blob collector
+BLOB_GC_LOCK_ID = 0x57504243
+
+
+async def _register(db: AsyncSession, sizes: dict[str, int], now: datetime) -> None:
+    known = set(await db.scalars(select(Blob.digest).where(Blob.digest.in_(sizes))))
+    if known:
+        await db.execute(
+            update(Blob).where(Blob.digest.in_(known)).values(last_used_at=now)
+        )
+    db.add_all(
+        Blob(digest=digest, size=size, last_used_at=now)
+        for digest, size in sizes.items()
+        if digest not in known
+    )
+    await db.commit()
+
+
+async def register_blobs(db: AsyncSession, blobs: Iterable[StoredBlob]) -> None:
+    """Record stored blobs, or mark blobs stored before as used again."""
+    sizes = {blob.digest: blob.size for blob in blobs}
+    if not sizes:
+        return
+    now = datetime.now(tz=UTC)
+    try:
+        await _register(db, sizes, now)
+    except IntegrityError:
+        # Recorded concurrently by another upload of the same file
+        await db.rollback()
+        await _register(db, sizes, now)
+
+
+def _referenced() -> ColumnElement[bool]:
+    """Match the blobs an order, an invoice or an active job refers to."""
+    return or_(
+        exists().where(Order.content_digest == Blob.digest),
+        exists().where(Invoice.content_digest == Blob.digest),
+        exists().where(
+            ProcessingJob.content_digest == Blob.digest,
+            ProcessingJob.status.in_(ACTIVE_STATUSES),
+        ),
+    )
+
+
+async def delete_unused_blobs(
+    db: AsyncSession, unused_since: datetime, limit: int = 1000
+) -> list[str] | None:
+    """Forget up to ``limit`` unreferenced blobs not used since ``unused_since``.
+
+    Returns their digests, for the caller to delete the stored files. On
+    PostgreSQL a transaction-level advisory lock lets a single collector run
+    at a time; the others get None.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        locked = await db.scalar(
+            select(func.pg_try_advisory_xact_lock(BLOB_GC_LOCK_ID))
+        )
+        if not locked:
+            await db.rollback()
+            return None
+
+    unused = (Blob.last_used_at < unused_since) & ~_referenced()
+    digests = list(await db.scalars(select(Blob.digest).where(unused).limit(limit)))
+    if digests:
+        await db.execute(delete(Blob).where(Blob.digest.in_(digests), unused))
+    await db.commit()
+    return digests
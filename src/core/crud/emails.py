@@ -0,0 +1,40 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db.models import InboundEmail, ProcessingJob
+from core.schemas import email as email_schemas
+from core.schemas import job as job_schemas
+
+
+async def create_inbound_email(
+    db: AsyncSession,
+    email: email_schemas.InboundEmailCreate,
+    jobs: list[job_schemas.ProcessingJobCreate],
+) -> InboundEmail:
+    """Record an inbound email and queue the jobs of its attachments at once."""
+    db_email = InboundEmail(**email.model_dump())
+    db.add(db_email)
+    await db.flush()
+    db.add_all(
+        ProcessingJob(**job.model_dump(exclude={"email_id"}), email_id=email.id)
+        for job in jobs
+    )
+    await db.commit()
+    await db.refresh(db_email)
+    return db_email
+
+
+async def get_email_by_id(db: AsyncSession, email_id: str) -> InboundEmail | None:
+    """Retrieve an inbound email, with its jobs, by its ID."""
+    stmt = select(InboundEmail).where(InboundEmail.id == email_id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_email_by_message_id(
+    db: AsyncSession, message_id: str
+) -> InboundEmail | None:
+    """Retrieve an inbound email by its Mailgun message id."""
+    stmt = select(InboundEmail).where(InboundEmail.message_id == message_id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
@@ -1,8 +1,46 @@
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
 
-from core.db.models import ProcessingJob
+from sqlalchemy import (
+    ColumnElement,
+    CursorResult,
+    ScalarSelect,
+    Table,
+    and_,
+    bindparam,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from core.db.models import ProcessingJob, User
 from core.schemas import job as job_schemas
+from core.utils.config import (
+    JOB_STAGE_FLUSH_SECONDS,
+    USER_MAX_CONCURRENT_JOBS,
+    JobStage,
+    Priority,
+    ProcessingStatus,
+)
+from core.utils.database import async_session_maker
+from core.utils.events import job_events
+from core.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Conditional claim updates lost to another worker before giving up for now
+CLAIM_ATTEMPTS = 5
+# PostgreSQL advisory lock key held by the running job reaper
+REAPER_LOCK_ID = 0x57505254
+# PostgreSQL advisory lock key held while a worker claims a job
+CLAIM_LOCK_ID = 0x57504C4B
+
+ACTIVE_STATUSES = (ProcessingStatus.PENDING, ProcessingStatus.PROCESSING)
 
 
 async def create_job(
@@ -16,22 +54,128 @@ async def create_job(
     return db_job
 
 
+class JobStageBuffer:
+    """Write-behind buffer for the intermediate stages of running jobs.
+
+    Stages recorded within ``delay`` seconds of each other are coalesced, only
+    the latest one per job is kept, and written for all jobs in one batched
+    ``UPDATE``. Events are still published right away. Any other update of a
+    job takes over its buffered stage, and buffered stages never overwrite a
+    job that stopped processing in the meantime.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        delay: float,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    ) -> None:
+        self.delay = delay
+        self.session_maker = session_maker
+        self._pending: dict[str, JobStage] = {}
+        self._flusher: asyncio.Task[int] | None = None
+
+    def add(self, job_id: str, stage: JobStage) -> None:
+        """Buffer the stage of a job and schedule a flush."""
+        if job_id in self._pending:
+            metrics.incr("jobs.stage_updates.coalesced")
+        self._pending[job_id] = stage
+        job_events.publish(
+            job_schemas.JobEvent(
+                job_id=job_id, status=ProcessingStatus.PROCESSING, stage=stage
+            )
+        )
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    def pop(self, job_id: str) -> JobStage | None:
+        """Take the buffered stage of a job out of the buffer."""
+        return self._pending.pop(job_id, None)
+
+    async def _flush_later(self) -> int:
+        await asyncio.sleep(self.delay)
+        return await self.flush()
+
+    async def flush(self) -> int:
+        """Write the buffered stages; returns the number of jobs written."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        # A Core statement, the ORM would treat the parameter list as a bulk
+        # update by primary key
+        table = cast("Table", ProcessingJob.__table__)
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("job_id"),
+                table.c.status == ProcessingStatus.PROCESSING,
+            )
+            .values(stage=bindparam("new_stage"))
+        )
+        try:
+            async with self.session_maker() as db:
+                await db.execute(
+                    stmt,
+                    [
+                        {"job_id": job_id, "new_stage": stage}
+                        for job_id, stage in pending.items()
+                    ],
+                )
+                await db.commit()
+        except Exception:
+            logger.exception(f"💥 Failed to write stages of {len(pending)} jobs")
+            return 0
+
+        metrics.observe("jobs.stage_updates.batch_size", len(pending))
+        return len(pending)
+
+
+job_stage_buffer = (
+    JobStageBuffer(JOB_STAGE_FLUSH_SECONDS) if JOB_STAGE_FLUSH_SECONDS > 0 else None
+)
+
+
 async def update_job(
-    db: AsyncSession, job_id: str, update: job_schemas.ProcessingJobUpdate
+    db: AsyncSession, job_id: str, changes: job_schemas.ProcessingJobUpdate
 ) -> ProcessingJob:
-    """Update an existing processing job in the database."""
-    stmt = select(ProcessingJob).where(ProcessingJob.id == job_id)
-    result = await db.execute(stmt)
-    db_job = result.scalar_one()
+    """Update an existing processing job in the database.
 
-    for key, value in update.model_dump(exclude_unset=True).items():
-        setattr(db_job, key, value)
+    The job is updated by a single ``UPDATE`` statement, which also returns
+    the updated row on databases supporting ``RETURNING``.
+    """
+    values = changes.model_dump(exclude_unset=True)
+    if job_stage_buffer is not None and (stage := job_stage_buffer.pop(job_id)):
+        values.setdefault("stage", stage)
+
+    stmt = update(ProcessingJob).where(ProcessingJob.id == job_id).values(**values)
+    if db.get_bind().dialect.update_returning:
+        result = await db.execute(stmt.returning(ProcessingJob))
+    else:
+        await db.execute(stmt)
+        result = await db.execute(
+            select(ProcessingJob)
+            .where(ProcessingJob.id == job_id)
+            .execution_options(populate_existing=True)
+        )
+    db_job = result.scalar_one()
 
     await db.commit()
-    await db.refresh(db_job)
+    job_events.publish(job_schemas.JobEvent.from_job(db_job))
     return db_job
 
 
+async def update_job_stage(db: AsyncSession, job_id: str, stage: JobStage) -> None:
+    """Record the intermediate stage a running job reached.
+
+    Stages are buffered and written behind when ``JOB_STAGE_FLUSH_SECONDS`` is
+    set, and written straight through otherwise.
+    """
+    if job_stage_buffer is None:
+        await update_job(db, job_id, job_schemas.ProcessingJobUpdate(stage=stage))
+    else:
+        job_stage_buffer.add(job_id, stage)
+
+
 async def get_job_by_id(db: AsyncSession, job_id: str) -> ProcessingJob | None:
     """Retrieve a processing job by its ID."""
     stmt = select(ProcessingJob).where(ProcessingJob.id == job_id)
@@ -44,3 +188,454 @@ async def get_all_jobs(db: AsyncSession) -> list[ProcessingJob]:
     stmt = select(ProcessingJob).order_by(ProcessingJob.created_at.desc())
     result = await db.execute(stmt)
     return list(result.scalars().all())
+
+
+async def create_batch(
+    db: AsyncSession,
+    batch: job_schemas.ProcessingJobCreate,
+    children: list[job_schemas.ProcessingJobCreate],
+) -> ProcessingJob:
+    """Create a batch job and the jobs of its files in one transaction."""
+    db_batch = ProcessingJob(**batch.model_dump())
+    db.add(db_batch)
+    await db.flush()
+    db.add_all(
+        ProcessingJob(**child.model_dump(exclude={"parent_id"}), parent_id=batch.id)
+        for child in children
+    )
+    await db.commit()
+    await db.refresh(db_batch)
+    return db_batch
+
+
+async def get_children(db: AsyncSession, parent_id: str) -> list[ProcessingJob]:
+    """Retrieve the jobs of a batch in submission order."""
+    stmt = (
+        select(ProcessingJob)
+        .where(ProcessingJob.parent_id == parent_id)
+        .order_by(ProcessingJob.created_at, ProcessingJob.id)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def settle_batch(db: AsyncSession, parent_id: str) -> ProcessingJob | None:
+    """Finish a batch job once none of its files is pending or processing.
+
+    The batch only fails when every file failed; partial failures are reported
+    in its error message. Cancelled batches are left as they are.
+    """
+    parent_status = await db.scalar(
+        select(ProcessingJob.status).where(ProcessingJob.id == parent_id)
+    )
+    if parent_status != ProcessingStatus.PROCESSING:
+        # Already settled, or cancelled as a whole
+        return None
+
+    stmt = (
+        select(ProcessingJob.status, func.count())
+        .where(ProcessingJob.parent_id == parent_id)
+        .group_by(ProcessingJob.status)
+    )
+    counts = {
+        ProcessingStatus(status): count
+        for status, count in (await db.execute(stmt)).tuples()
+    }
+    if counts.get(ProcessingStatus.PENDING) or counts.get(ProcessingStatus.PROCESSING):
+        return None
+
+    total = sum(counts.values())
+    failed = counts.get(ProcessingStatus.FAILED, 0)
+    status = ProcessingStatus.FAILED if failed == total else ProcessingStatus.SUCCESS
+    return await update_job(
+        db,
+        parent_id,
+        job_schemas.ProcessingJobUpdate(
+            status=status,
+            stage=JobStage(status.value),
+            error_message=f"{failed} of {total} files failed" if failed else None,
+            finished_at=datetime.now(tz=UTC),
+        ),
+    )
+
+
+def _user_running(now: datetime) -> ScalarSelect[int]:
+    """Count the jobs of the job's owner being processed under a live lease."""
+    other = aliased(ProcessingJob)
+    return (
+        select(func.count())
+        .where(
+            other.created_by == ProcessingJob.created_by,
+            other.status == ProcessingStatus.PROCESSING,
+            other.lease_expires_at >= now,
+        )
+        .scalar_subquery()
+    )
+
+
+def _claimable(now: datetime) -> ColumnElement[bool]:
+    """Jobs that are due, or whose worker let its lease expire.
+
+    Files of a batch are held back while ``max_concurrency`` of their siblings
+    are being processed under a live lease; the batch job itself is never
+    claimed. Jobs of a user are held back while the user's
+    ``max_concurrent_jobs`` (or ``USER_MAX_CONCURRENT_JOBS``) are running.
+
+    The caps are counted in subqueries, which concurrent claims could both
+    pass; ``claim_job`` serializes claims on PostgreSQL so they hold there.
+    """
+    sibling = aliased(ProcessingJob)
+    parent = aliased(ProcessingJob)
+    running = (
+        select(func.count())
+        .where(
+            sibling.parent_id == ProcessingJob.parent_id,
+            sibling.status == ProcessingStatus.PROCESSING,
+            sibling.lease_expires_at >= now,
+        )
+        .scalar_subquery()
+    )
+    limit = (
+        select(parent.max_concurrency)
+        .where(parent.id == ProcessingJob.parent_id)
+        .scalar_subquery()
+    )
+    user_limit = (
+        select(
+            func.coalesce(User.max_concurrent_jobs, USER_MAX_CONCURRENT_JOBS or None)
+        )
+        .where(User.id == ProcessingJob.created_by)
+        .scalar_subquery()
+    )
+    return and_(
+        ProcessingJob.file_path.is_not(None),
+        ProcessingJob.attempts < ProcessingJob.max_attempts,
+        or_(user_limit.is_(None), _user_running(now) < user_limit),
+        or_(
+            and_(
+                ProcessingJob.status == ProcessingStatus.PENDING,
+                ProcessingJob.available_at <= now,
+                or_(ProcessingJob.parent_id.is_(None), running < limit),
+            ),
+            and_(
+                ProcessingJob.status == ProcessingStatus.PROCESSING,
+                ProcessingJob.lease_expires_at < now,
+            ),
+        ),
+    )
+
+
+def _fair_share(now: datetime) -> ColumnElement[Any]:
+    """Share of the workers the owner of a job would hold by running it too.
+
+    Serving the lowest share first is weighted fair queuing across users: a
+    user with a large backlog only gets the workers the other users leave idle.
+    """
+    weight = (
+        select(User.job_weight).where(User.id == ProcessingJob.created_by)
+    ).scalar_subquery()
+    return (_user_running(now) + 1) / func.coalesce(weight, 1.0)
+
+
+async def _update_leased(
+    db: AsyncSession,
+    job_id: str,
+    worker_id: str,
+    **values: Any,  # noqa: ANN401
+) -> bool:
+    """Update a job only while ``worker_id`` still holds its lease."""
+    if job_stage_buffer is not None and "status" in values:
+        job_stage_buffer.pop(job_id)
+    stmt = (
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.lease_owner == worker_id)
+        .values(**values)
+    )
+    result = cast("CursorResult[Any]", await db.execute(stmt))
+    await db.commit()
+    if result.rowcount != 1:
+        return False
+
+    if "status" in values:
+        job_events.publish(
+            job_schemas.JobEvent(
+                job_id=job_id,
+                status=values["status"],
+                stage=values["stage"],
+                error_message=values.get("error_message"),
+            )
+        )
+    return True
+
+
+def _observe_claim(job: ProcessingJob, worker_id: str, now: datetime) -> None:
+    """Report the scheduling decision and how long the job waited in the queue."""
+    due = cast("datetime", job.available_at)
+    # SQLite hands back naive timestamps, stored in UTC
+    waited = (now - due.replace(tzinfo=due.tzinfo or UTC)).total_seconds()
+    lane = Priority(job.priority).name.lower()
+    metrics.incr(f"jobs.claimed.{lane}")
+    metrics.observe(f"jobs.queue_wait_seconds.{lane}", waited)
+    logger.info(
+        f"📥 {worker_id} claimed {job.id} of {job.created_by} "
+        f"({lane}, attempt {job.attempts}, waited {waited:.1f}s)"
+    )
+
+
+async def count_queued(db: AsyncSession) -> dict[Priority, int]:
+    """Count the jobs waiting in the queue per priority lane."""
+    stmt = (
+        select(ProcessingJob.priority, func.count())
+        .where(
+            ProcessingJob.status == ProcessingStatus.PENDING,
+            ProcessingJob.file_path.is_not(None),
+        )
+        .group_by(ProcessingJob.priority)
+    )
+    counts = dict.fromkeys(Priority, 0)
+    for priority, count in (await db.execute(stmt)).tuples():
+        counts[Priority(priority)] = count
+    return counts
+
+
+async def claim_job(
+    db: AsyncSession, worker_id: str, lease_seconds: float
+) -> ProcessingJob | None:
+    """Lease the next claimable job to ``worker_id``.
+
+    Jobs are taken by priority lane first, then from the user with the lowest
+    weighted share of running jobs, then in the order they became due. On
+    PostgreSQL claims take turns under a transaction-level advisory lock, so
+    each one counts the jobs the previous claims started and the batch and
+    user concurrency caps are never exceeded. Other databases rely on the
+    claim being a conditional ``UPDATE``, which only one writer can win;
+    losers simply try the next candidate. There the caps are soft: claims
+    racing each other can briefly go over them.
+    """
+    for _ in range(CLAIM_ATTEMPTS):
+        if db.get_bind().dialect.name == "postgresql":
+            # Held until the claim commits or rolls back
+            await db.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_ID)))
+        now = datetime.now(tz=UTC)
+        candidate = (
+            select(ProcessingJob.id)
+            .where(_claimable(now))
+            .order_by(
+                ProcessingJob.priority,
+                _fair_share(now),
+                ProcessingJob.available_at,
+                ProcessingJob.created_at,
+            )
+            .limit(1)
+        )
+        if db.get_bind().dialect.name == "postgresql":
+            candidate = candidate.with_for_update(skip_locked=True)
+
+        job_id = (await db.execute(candidate)).scalar_one_or_none()
+        if job_id is None:
+            await db.rollback()
+            return None
+
+        stmt = (
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job_id, _claimable(now))
+            .values(
+                status=ProcessingStatus.PROCESSING,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=ProcessingJob.attempts + 1,
+                started_at=now,
+            )
+        )
+        result = cast("CursorResult[Any]", await db.execute(stmt))
+        await db.commit()
+        if result.rowcount == 1:
+            job = await get_job_by_id(db, job_id)
+            if job is not None:
+                _observe_claim(job, worker_id, now)
+                job_events.publish(job_schemas.JobEvent.from_job(job))
+            return job
+
+    return None
+
+
+async def heartbeat_job(
+    db: AsyncSession, job_id: str, worker_id: str, lease_seconds: float
+) -> bool:
+    """Extend the lease on a job; returns False if the lease was lost."""
+    expires = datetime.now(tz=UTC) + timedelta(seconds=lease_seconds)
+    return await _update_leased(db, job_id, worker_id, lease_expires_at=expires)
+
+
+async def complete_job(db: AsyncSession, job_id: str, worker_id: str) -> bool:
+    """Mark a leased job as successfully finished and release the lease."""
+    return await _update_leased(
+        db,
+        job_id,
+        worker_id,
+        status=ProcessingStatus.SUCCESS,
+        stage=JobStage.SUCCESS,
+        error_message=None,
+        finished_at=datetime.now(tz=UTC),
+        lease_owner=None,
+        lease_expires_at=None,
+    )
+
+
+async def retry_job(
+    db: AsyncSession, job_id: str, worker_id: str, error: str, delay: float
+) -> bool:
+    """Release a failed job back to the queue, due again after ``delay`` seconds."""
+    return await _update_leased(
+        db,
+        job_id,
+        worker_id,
+        status=ProcessingStatus.PENDING,
+        stage=JobStage.PENDING,
+        error_message=error,
+        available_at=datetime.now(tz=UTC) + timedelta(seconds=delay),
+        lease_owner=None,
+        lease_expires_at=None,
+    )
+
+
+async def fail_job(db: AsyncSession, job_id: str, worker_id: str, error: str) -> bool:
+    """Mark a leased job as permanently failed and release the lease."""
+    return await _update_leased(
+        db,
+        job_id,
+        worker_id,
+        status=ProcessingStatus.FAILED,
+        stage=JobStage.FAILED,
+        error_message=error,
+        finished_at=datetime.now(tz=UTC),
+        lease_owner=None,
+        lease_expires_at=None,
+    )
+
+
+async def cancel_job(
+    db: AsyncSession, job_id: str
+) -> list[tuple[str, ProcessingStatus]]:
+    """Cancel a job, along with the unfinished files of a batch.
+
+    Returns the id and previous status of every job cancelled; workers running
+    one of them lose their lease and stop.
+    """
+    active = ProcessingJob.status.in_(ACTIVE_STATUSES)
+    stmt = select(ProcessingJob.id, ProcessingJob.status).where(
+        or_(ProcessingJob.id == job_id, ProcessingJob.parent_id == job_id), active
+    )
+    cancelled = [
+        (cancelled_id, ProcessingStatus(status))
+        for cancelled_id, status in await db.execute(stmt)
+    ]
+    if not cancelled:
+        return []
+
+    await db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id.in_([row[0] for row in cancelled]), active)
+        .values(
+            status=ProcessingStatus.CANCELLED,
+            stage=JobStage.CANCELLED,
+            error_message="Cancelled",
+            finished_at=datetime.now(tz=UTC),
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+    )
+    await db.commit()
+
+    for cancelled_id, _ in cancelled:
+        if job_stage_buffer is not None:
+            job_stage_buffer.pop(cancelled_id)
+        job_events.publish(
+            job_schemas.JobEvent(
+                job_id=cancelled_id,
+                status=ProcessingStatus.CANCELLED,
+                stage=JobStage.CANCELLED,
+                error_message="Cancelled",
+            )
+        )
+    return cancelled
+
+
+async def _reap(
+    db: AsyncSession,
+    condition: ColumnElement[bool],
+    **values: Any,  # noqa: ANN401
+) -> list[tuple[str, str | None]]:
+    """Apply ``values`` to the jobs matching ``condition``; returns their ids."""
+    stmt = select(ProcessingJob.id, ProcessingJob.parent_id).where(condition)
+    reaped = [(job_id, parent_id) for job_id, parent_id in await db.execute(stmt)]
+    if reaped:
+        await db.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id.in_([job_id for job_id, _ in reaped]), condition)
+            .values(**values, lease_owner=None, lease_expires_at=None)
+        )
+    return reaped
+
+
+async def reap_jobs(
+    db: AsyncSession, stale_seconds: float
+) -> job_schemas.ReapedJobs | None:
+    """Release the jobs of dead workers and fail abandoned jobs.
+
+    Jobs whose lease expired are queued again, or failed on their last
+    attempt, so they no longer hold a batch concurrency slot. Jobs run outside
+    the queue, which have no lease, are failed once they made no progress, that
+    is were not updated, for ``stale_seconds``. On PostgreSQL a
+    transaction-level advisory lock lets a single reaper run at a time; the
+    others get None.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        locked = await db.scalar(select(func.pg_try_advisory_xact_lock(REAPER_LOCK_ID)))
+        if not locked:
+            await db.rollback()
+            return None
+
+    now = datetime.now(tz=UTC)
+    expired = and_(
+        ProcessingJob.status == ProcessingStatus.PROCESSING,
+        ProcessingJob.lease_expires_at < now,
+    )
+    requeued = await _reap(
+        db,
+        and_(expired, ProcessingJob.attempts < ProcessingJob.max_attempts),
+        status=ProcessingStatus.PENDING,
+        stage=JobStage.PENDING,
+        error_message="Worker lease expired",
+        available_at=now,
+    )
+    exhausted = await _reap(
+        db,
+        and_(expired, ProcessingJob.attempts >= ProcessingJob.max_attempts),
+        status=ProcessingStatus.FAILED,
+        stage=JobStage.FAILED,
+        error_message="Worker lease expired on the last attempt",
+        finished_at=now,
+    )
+    abandoned = await _reap(
+        db,
+        and_(
+            ProcessingJob.status.in_(ACTIVE_STATUSES),
+            ProcessingJob.file_path.is_(None),
+            ProcessingJob.max_concurrency.is_(None),
+            ProcessingJob.lease_owner.is_(None),
+            ProcessingJob.updated_at < now - timedelta(seconds=stale_seconds),
+        ),
+        status=ProcessingStatus.FAILED,
+        stage=JobStage.FAILED,
+        error_message="Job made no progress and was abandoned",
+        finished_at=now,
+    )
+    await db.commit()
+
+    failed = exhausted + abandoned
+    return job_schemas.ReapedJobs(
+        requeued=[job_id for job_id, _ in requeued],
+        failed=[job_id for job_id, _ in failed],
+        batches={parent_id for _, parent_id in failed if parent_id},
+    )
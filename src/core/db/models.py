@@ -1,9 +1,26 @@
-from sqlalchemy import DateTime, Float, ForeignKey, String
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
 from sqlalchemy import Enum as SqlEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
-from core.utils.config import Currency, ObjectStatus, ProcessingStatus
+from core.utils.config import (
+    JOB_MAX_ATTEMPTS,
+    ArtifactKind,
+    Currency,
+    JobStage,
+    ObjectStatus,
+    Priority,
+    ProcessingStatus,
+)
 from core.utils.database import Base
 
 
@@ -19,6 +36,9 @@ class User(Base):
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
     password: Mapped[str | None] = mapped_column(String, nullable=True)
     role: Mapped[str] = mapped_column(String, default="user")
+    # Share of the job queue relative to other users, and cap on running jobs
+    job_weight: Mapped[float] = mapped_column(Float, nullable=False, default=1.0)
+    max_concurrent_jobs: Mapped[int | None] = mapped_column(Integer, nullable=True)
     date_created: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -34,6 +54,10 @@ class Order(Base):
 
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
     file_name: Mapped[str] = mapped_column(String, nullable=True)
+    # SHA-256 of the source document, which keeps it in the blob store
+    content_digest: Mapped[str | None] = mapped_column(
+        String, index=True, nullable=True
+    )
     customer_name: Mapped[str] = mapped_column(String, nullable=False)
     customer_address: Mapped[str] = mapped_column(String, nullable=False)
     invoice_number: Mapped[str] = mapped_column(String, index=True, nullable=False)
@@ -90,6 +114,10 @@ class Invoice(Base):
 
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
     file_name: Mapped[str] = mapped_column(String, nullable=True)
+    # SHA-256 of the source document, which keeps it in the blob store
+    content_digest: Mapped[str | None] = mapped_column(
+        String, index=True, nullable=True
+    )
     supplier_name: Mapped[str] = mapped_column(String, nullable=False)
     supplier_address: Mapped[str] = mapped_column(String, nullable=False)
     supplier_vat_number: Mapped[str] = mapped_column(String, nullable=False)
@@ -139,10 +167,69 @@ class InvoiceLine(Base):
     invoice: Mapped["Invoice"] = relationship("Invoice", back_populates="lines")
 
 
+class Blob(Base):
+    """Source document held in the blob store, addressed by its SHA-256.
+
+    Blobs are referenced by the orders, invoices and active jobs with the same
+    ``content_digest``; unreferenced blobs are collected once unused for a
+    grace period.
+    """
+
+    __tablename__ = "blobs"
+
+    digest: Mapped[str] = mapped_column(String, primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_used_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True, nullable=False
+    )
+
+
+class InboundEmail(Base):
+    """Inbound email whose attachments are processed as jobs."""
+
+    __tablename__ = "inbound_emails"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    # Mailgun Message-Id, or webhook token, that makes redeliveries idempotent
+    message_id: Mapped[str | None] = mapped_column(
+        String, unique=True, index=True, nullable=True
+    )
+    sender: Mapped[str] = mapped_column(String, nullable=False)
+    recipient: Mapped[str | None] = mapped_column(String, nullable=True)
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    created_by: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id"), nullable=False
+    )
+    received_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    jobs: Mapped[list["ProcessingJob"]] = relationship(
+        "ProcessingJob", lazy="selectin", order_by="ProcessingJob.id"
+    )
+
+
 class ProcessingJob(Base):
-    """Processing job model for tracking file processing status."""
+    """Processing job model for tracking file processing status.
+
+    Jobs double as a durable work queue: workers claim pending jobs by taking
+    a lease, and jobs whose lease expired are claimed again until
+    ``max_attempts`` is reached.
+    """
 
     __tablename__ = "processing_jobs"
+    __table_args__ = (
+        Index("ix_processing_jobs_claim", "status", "priority", "available_at"),
+        Index(
+            "ix_processing_jobs_email_digest",
+            "email_id",
+            "content_digest",
+            unique=True,
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     status: Mapped[str] = mapped_column(
@@ -150,6 +237,11 @@ class ProcessingJob(Base):
         nullable=True,
         default=ProcessingStatus.PENDING,
     )
+    stage: Mapped[JobStage] = mapped_column(
+        SqlEnum(JobStage, name="jobstage", native_enum=False),
+        nullable=False,
+        default=JobStage.PENDING,
+    )
     file_name: Mapped[str] = mapped_column(String, nullable=True)
     error_message: Mapped[str | None] = mapped_column(String, nullable=True)
     created_by: Mapped[str] = mapped_column(
@@ -158,3 +250,74 @@ class ProcessingJob(Base):
     created_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    file_path: Mapped[str | None] = mapped_column(String, nullable=True)
+    language: Mapped[str] = mapped_column(String, nullable=False, default="en")
+    priority: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=Priority.DEFAULT
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=JOB_MAX_ATTEMPTS
+    )
+    available_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    lease_owner: Mapped[str | None] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    started_at: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Bumped by every update of the job, such as each stage it reaches
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+    # Batch jobs only group their children, which run at most max_concurrency
+    # at a time
+    parent_id: Mapped[str | None] = mapped_column(
+        String, ForeignKey("processing_jobs.id"), index=True, nullable=True
+    )
+    max_concurrency: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Order or invoice created by the job
+    result_id: Mapped[str | None] = mapped_column(String, index=True, nullable=True)
+    document_type: Mapped[str | None] = mapped_column(String, nullable=True)
+    email_id: Mapped[str | None] = mapped_column(
+        String, ForeignKey("inbound_emails.id"), index=True, nullable=True
+    )
+    # SHA-256 of the source document in the blob store
+    content_digest: Mapped[str | None] = mapped_column(
+        String, index=True, nullable=True
+    )
+
+
+class JobArtifact(Base):
+    """Intermediate output of a processing job, as zlib-compressed JSON.
+
+    Artifacts belong to the job that produced them, and through its
+    ``result_id`` to the resulting order or invoice.
+    """
+
+    __tablename__ = "job_artifacts"
+
+    job_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("processing_jobs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    kind: Mapped[ArtifactKind] = mapped_column(
+        SqlEnum(ArtifactKind, name="artifactkind", native_enum=False),
+        primary_key=True,
+    )
+    content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Size of the uncompressed JSON
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
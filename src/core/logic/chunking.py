@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from core.services.extractors.base import AbstractExtractor
+from core.utils.config import CHUNK_CONCURRENCY, CHUNK_PAGES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+TModel = TypeVar("TModel", bound=BaseModel)
+
+
+def merge_lines(chunks: list[list[Any]]) -> list[Any]:
+    """Concatenate line items from consecutive chunks, dropping carried-over rows.
+
+    When the last lines of a chunk are the same as the first lines of the next
+    one, they are taken as a row split or repeated across the page break and
+    kept once. A chunk is never dropped as a whole, and lines repeated
+    anywhere else are real repeated items and all kept.
+    """
+    merged: list[Any] = []
+    previous: list[str] = []
+    for lines in chunks:
+        keys = [line.model_dump_json() for line in lines]
+        overlap = next(
+            (
+                size
+                for size in range(min(len(previous), len(keys) - 1), 0, -1)
+                if previous[-size:] == keys[:size]
+            ),
+            0,
+        )
+        merged.extend(lines[overlap:])
+        previous = keys
+    return merged
+
+
+@dataclass
+class ChunkedExtractor(Generic[TModel]):
+    """Extract long documents page group by page group with bounded parallelism.
+
+    Header fields (parties, dates, totals) come from an extraction of the first
+    and last page. Line items come from extractions of consecutive page groups
+    by ``lines_extractor``, whose output only holds ``lines`` so that no header
+    fields are made up for the pages in between. They run concurrently and
+    are merged in page order.
+    """
+
+    extractor: AbstractExtractor[TModel]
+    lines_extractor: AbstractExtractor[Any]
+    pages_per_chunk: int = CHUNK_PAGES
+    max_concurrency: int = CHUNK_CONCURRENCY
+    page_separator: str = "\n\n"
+
+    async def extract_pages(self, pages: list[str]) -> TModel:
+        """Extract a single result from the pages of a document."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def extract(chunk: list[str], extractor: AbstractExtractor[T]) -> T:
+            async with semaphore:
+                return await extractor.extract(self.page_separator.join(chunk))
+
+        header_pages = [pages[0], pages[-1]] if len(pages) > 1 else pages
+        groups = [
+            pages[i : i + self.pages_per_chunk]
+            for i in range(0, len(pages), self.pages_per_chunk)
+        ]
+        logger.info(
+            f"📚 Extracting {len(pages)} pages in {len(groups)} chunks "
+            f"(concurrency {self.max_concurrency})"
+        )
+
+        header, chunks = await asyncio.gather(
+            extract(header_pages, self.extractor),
+            asyncio.gather(*(extract(group, self.lines_extractor) for group in groups)),
+        )
+        lines = merge_lines([chunk.lines for chunk in chunks])
+        return header.model_copy(update={"lines": lines})
@@ -0,0 +1,181 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from core.utils.config import (
+    COMPACTION_EDGE_LINES,
+    COMPACTION_MAX_LINE_LENGTH,
+    COMPACTION_REPEAT_RATIO,
+)
+from core.utils.tokens import estimate_tokens
+
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_PAGE_NUMBER = re.compile(
+    r"^(page|pagina|seite)\s*\d+(\s*(of|van|de|sur|von|/)\s*\d+)?$", re.IGNORECASE
+)
+_SEPARATOR_CELL = re.compile(r"^:?-+:?$")
+# Amounts, dates and codes made of digits and punctuation only
+_NUMERIC = re.compile(r"^[\d\s.,:;/%+\-()#€$£¥]*$")
+# Lines shorter than this are too generic to be told apart from content
+_MIN_REPEATED_LENGTH = 8
+
+
+@dataclass
+class CompactionResult:
+    """Compacted pages along with the estimated token savings."""
+
+    pages: list[str]
+    original_tokens: int
+    compacted_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated number of input tokens removed."""
+        return self.original_tokens - self.compacted_tokens
+
+
+@dataclass
+class MarkdownCompactor:
+    """Shrink parser markdown before it is sent to the classifier and extractor.
+
+    - ``collapse_whitespace`` squeezes runs of spaces and blank lines.
+    - ``drop_repeated_lines`` drops letterheads and footers repeated on later
+      pages. Only the first and last ``edge_lines`` lines of each page are
+      considered, and a line must be found there on at least
+      ``repeat_ratio`` of the pages; its first page keeps it. Table rows,
+      short and numeric lines are never dropped, nor are repeats within a
+      page, since those are usually content. It only applies from three
+      pages on. Bare page numbers are dropped altogether.
+    - ``strip_empty_cells`` removes table columns that are empty in every row.
+    - ``max_line_length`` truncates pathological lines such as OCR noise.
+    """
+
+    collapse_whitespace: bool = True
+    drop_repeated_lines: bool = True
+    repeat_ratio: float = COMPACTION_REPEAT_RATIO
+    edge_lines: int = COMPACTION_EDGE_LINES
+    strip_empty_cells: bool = True
+    max_line_length: int = COMPACTION_MAX_LINE_LENGTH
+
+    def compact(self, pages: list[str]) -> CompactionResult:
+        """Compact the pages of a document."""
+        original_tokens = sum(estimate_tokens(page) for page in pages)
+
+        compacted = [page.splitlines() for page in pages]
+        if self.collapse_whitespace:
+            compacted = [
+                [_SPACES.sub(" ", line).strip() for line in lines]
+                for lines in compacted
+            ]
+        if self.drop_repeated_lines and len(compacted) > 2:  # noqa: PLR2004
+            compacted = self._drop_repeated(compacted)
+        if self.strip_empty_cells:
+            compacted = [self._strip_tables(lines) for lines in compacted]
+        if self.max_line_length > 0:
+            compacted = [
+                [self._truncate(line) for line in lines] for lines in compacted
+            ]
+
+        result = ["\n".join(lines) for lines in compacted]
+        if self.collapse_whitespace:
+            result = [_BLANK_LINES.sub("\n\n", page).strip() for page in result]
+
+        return CompactionResult(
+            pages=result,
+            original_tokens=original_tokens,
+            compacted_tokens=sum(estimate_tokens(page) for page in result),
+        )
+
+    def _edges(self, lines: list[str]) -> list[int]:
+        """Return the indices of the first and last non-blank lines of a page."""
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        if len(filled) <= 2 * self.edge_lines:
+            return filled
+        return filled[: self.edge_lines] + filled[-self.edge_lines :]
+
+    def _drop_repeated(self, pages: list[list[str]]) -> list[list[str]]:
+        def key(line: str) -> str:
+            return line.strip().lower()
+
+        def candidate(line: str) -> bool:
+            text = line.strip()
+            return (
+                len(text) >= _MIN_REPEATED_LENGTH
+                and not text.startswith("|")
+                and not _NUMERIC.match(text)
+            )
+
+        edges = [self._edges(lines) for lines in pages]
+        page_counts: Counter[str] = Counter()
+        for lines, indices in zip(pages, edges, strict=True):
+            page_counts.update({key(lines[i]) for i in indices if candidate(lines[i])})
+
+        threshold = max(2, self.repeat_ratio * len(pages))
+        repeated = {line for line, count in page_counts.items() if count >= threshold}
+
+        seen: set[str] = set()
+        result: list[list[str]] = []
+        for lines, indices in zip(pages, edges, strict=True):
+            dropped: set[int] = set()
+            on_page: set[str] = set()
+            for i in indices:
+                line_key = key(lines[i])
+                if line_key not in repeated or line_key in on_page:
+                    continue
+                # Once per page, and only once an earlier page showed it
+                on_page.add(line_key)
+                if line_key in seen:
+                    dropped.add(i)
+            seen |= on_page
+            result.append(
+                [
+                    line
+                    for i, line in enumerate(lines)
+                    if i not in dropped and not _PAGE_NUMBER.match(line.strip())
+                ]
+            )
+        return result
+
+    def _strip_tables(self, lines: list[str]) -> list[str]:
+        result: list[str] = []
+        table: list[str] = []
+        for line in [*lines, ""]:
+            if line.lstrip().startswith("|"):
+                table.append(line)
+                continue
+            if table:
+                result.extend(_compact_table(table))
+                table = []
+            result.append(line)
+        return result[:-1]
+
+    def _truncate(self, line: str) -> str:
+        if len(line) <= self.max_line_length:
+            return line
+        return line[: self.max_line_length] + " …"
+
+
+def _compact_table(rows: list[str]) -> list[str]:
+    """Drop columns and rows of a markdown table that hold no content."""
+    cells = [
+        [cell.strip() for cell in row.strip().strip("|").split("|")] for row in rows
+    ]
+    width = max(len(row) for row in cells)
+    cells = [row + [""] * (width - len(row)) for row in cells]
+
+    def is_separator(row: list[str]) -> bool:
+        return any(row) and all(_SEPARATOR_CELL.match(cell) or not cell for cell in row)
+
+    content = [row for row in cells if not is_separator(row)]
+    keep = [i for i in range(width) if any(row[i] for row in content)]
+    if not keep:
+        return []
+
+    compacted = []
+    for row in cells:
+        if is_separator(row):
+            compacted.append("|" + "|".join("---" for _ in keep) + "|")
+        elif any(row[i] for i in keep):
+            compacted.append("| " + " | ".join(row[i] for i in keep) + " |")
+    return compacted
@@ -1,75 +1,353 @@
-from dataclasses import dataclass
-from typing import Generic, TypeVar
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generic, TypeVar, cast
 
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.crud import artifacts as crud_artifacts
 from core.crud import jobs as crud_jobs
-from core.schemas.classifier import DocumentType
+from core.logic.chunking import ChunkedExtractor
+from core.logic.compaction import MarkdownCompactor
+from core.schemas.classifier import DocumentType, UnknownDocument
 from core.schemas.job import ProcessingJobUpdate
+from core.services.classifiers.heuristic import HeuristicClassifier
 from core.services.extractors.base import AbstractExtractor
-from core.services.factories import CLASSIFIER_REGISTRY, EXTRACTOR_REGISTRY
+from core.services.factories import (
+    CLASSIFIER_REGISTRY,
+    COMBINED_EXTRACTOR_REGISTRY,
+    EXTRACTOR_REGISTRY,
+    LINE_ITEMS_EXTRACTOR_REGISTRY,
+)
 from core.services.parsers.base import AbstractDocumentParser
-from core.utils.config import DEFAULT_MODEL, ProcessingStatus
+from core.utils.config import (
+    ARTIFACTS_ENABLED,
+    CHUNK_CONCURRENCY,
+    CHUNK_PAGES,
+    CHUNKED_EXTRACTION_MIN_PAGES,
+    CLASSIFY_TIMEOUT_SECONDS,
+    COMPACTION_ENABLED,
+    DEFAULT_EXTRACTION_MODE,
+    DEFAULT_MODEL,
+    EXTRACT_TIMEOUT_SECONDS,
+    HEURISTIC_CLASSIFIER_ENABLED,
+    HEURISTIC_CLASSIFIER_WEIGHTS,
+    HEURISTIC_CONFIDENCE_THRESHOLD,
+    PARSE_TIMEOUT_SECONDS,
+    ArtifactKind,
+    ExtractionMode,
+    JobStage,
+    ProcessingStatus,
+)
+from core.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
 
+def default_pre_classifier() -> HeuristicClassifier | None:
+    """Return the configured local pre-classifier, if enabled."""
+    if not HEURISTIC_CLASSIFIER_ENABLED:
+        return None
+    if HEURISTIC_CLASSIFIER_WEIGHTS:
+        return HeuristicClassifier.from_file(Path(HEURISTIC_CLASSIFIER_WEIGHTS))
+    return HeuristicClassifier()
+
+
+def default_compactor() -> MarkdownCompactor | None:
+    """Return the configured markdown compactor, if enabled."""
+    return MarkdownCompactor() if COMPACTION_ENABLED else None
+
+
+STAGE_TIMEOUTS = {
+    JobStage.PARSING: PARSE_TIMEOUT_SECONDS,
+    JobStage.CLASSIFYING: CLASSIFY_TIMEOUT_SECONDS,
+    JobStage.EXTRACTING: EXTRACT_TIMEOUT_SECONDS,
+}
+
+
+class StageTimeoutError(TimeoutError):
+    """Raised when a pipeline stage or the whole job runs past its deadline."""
+
+
 @dataclass
 class DocumentPipeline(Generic[T]):
-    """Pipeline to convert a document into structured data of type T."""
+    """Pipeline to convert a document into structured data of type T.
+
+    Parsed pages are shrunk by ``compactor`` before any LLM call.
+    When the document type is not known up front, the local ``pre_classifier``
+    is tried first and the LLM is only consulted when its confidence is below
+    ``confidence_threshold``. ``mode`` then selects between a classifier call
+    followed by an extractor call (``two_step``) or a single call returning
+    both (``combined``). Documents of at least ``chunk_min_pages`` pages are
+    extracted in groups of ``chunk_pages`` pages, which always uses the
+    two-step path since the combined call needs the whole document.
+    Classifiers and extractors not given are those of ``model``.
+
+    Given ``pages`` parsed before, such as the stored pages of an earlier job,
+    parsing is skipped and ``parser`` may be left out; ``page_separator`` then
+    replaces the parser's.
 
-    parser: AbstractDocumentParser
+    Progress of ``job_id`` is recorded stage by stage, and with
+    ``store_artifacts`` the parsed pages, the markdown sent to the LLM and its
+    output are kept for the job. With ``finalize`` unset
+    the job is left in progress at the end, for callers that still have work
+    to do (such as persisting the result) before the job is done.
+
+    Each stage must finish within its ``stage_timeouts`` entry, and the whole
+    run before ``deadline`` (in event loop time), or the work in flight is
+    cancelled and ``StageTimeoutError`` raised.
+    """
+
+    parser: AbstractDocumentParser | None = None
     extractor: AbstractExtractor[T] | None = None
+    model: str = DEFAULT_MODEL
     document_type: DocumentType | None = None
     db: AsyncSession | None = None
     job_id: str | None = None
+    mode: ExtractionMode = DEFAULT_EXTRACTION_MODE
+    pre_classifier: HeuristicClassifier | None = field(
+        default_factory=default_pre_classifier
+    )
+    confidence_threshold: float = HEURISTIC_CONFIDENCE_THRESHOLD
+    chunk_pages: int = CHUNK_PAGES
+    chunk_min_pages: int = CHUNKED_EXTRACTION_MIN_PAGES
+    chunk_concurrency: int = CHUNK_CONCURRENCY
+    compactor: MarkdownCompactor | None = field(default_factory=default_compactor)
+    pages: list[str] | None = None
+    page_separator: str = AbstractDocumentParser.page_separator
+    store_artifacts: bool = ARTIFACTS_ENABLED
+    finalize: bool = True
+    deadline: float | None = None
+    stage_timeouts: dict[JobStage, float] = field(
+        default_factory=lambda: dict(STAGE_TIMEOUTS)
+    )
+    _stage: JobStage = field(default=JobStage.PENDING, init=False, repr=False)
+    _timeout: asyncio.Timeout | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Check that there is something to parse or parsed pages to start from."""
+        if self.parser is not None:
+            self.page_separator = self.parser.page_separator
+        elif self.pages is None:
+            raise ValueError("Provide parser or pages")  # noqa: TRY003
+
+    @property
+    def _first_stage(self) -> JobStage:
+        """Stage the run starts at, skipping parsing when pages are given."""
+        if self.pages is None:
+            return JobStage.PARSING
+        if self.document_type is None:
+            return JobStage.CLASSIFYING
+        return JobStage.EXTRACTING
 
     async def run(self) -> tuple[T, DocumentType]:
         """Run the document processing pipeline and track job status if enabled."""
-        if self.db and self.job_id:
-            await crud_jobs.update_job(
-                self.db,
-                self.job_id,
-                ProcessingJobUpdate(status=ProcessingStatus.PROCESSING),
+        await self._track(
+            ProcessingJobUpdate(
+                status=ProcessingStatus.PROCESSING, stage=self._first_stage
             )
+        )
 
         try:
-            # Parse the document to extract markdown text
-            markdown = await self.parser.parse()
+            result = await self._run_within_deadlines()
+            if isinstance(result, BaseModel):
+                await self._store(
+                    {
+                        ArtifactKind.EXTRACTION: {
+                            "document_type": cast("DocumentType", self.document_type),
+                            "data": result.model_dump(mode="json"),
+                        }
+                    }
+                )
+
+            if self.finalize:
+                await self._track(
+                    ProcessingJobUpdate(
+                        status=ProcessingStatus.SUCCESS, stage=JobStage.SUCCESS
+                    )
+                )
+
+            return result, cast("DocumentType", self.document_type)
 
-            # If the document_type is not set, classify the document type
-            if self.extractor is None or self.document_type is None:
-                classifier = CLASSIFIER_REGISTRY[DEFAULT_MODEL]()
-                predicted_type = await classifier.classify(markdown)
+        except Exception as e:
+            if self.finalize:
+                await self._track(
+                    ProcessingJobUpdate(
+                        status=ProcessingStatus.FAILED,
+                        stage=JobStage.FAILED,
+                        error_message=str(e),
+                    )
+                )
+            raise
+
+    async def _run_within_deadlines(self) -> T:
+        """Run the stages, each bounded by its timeout and the job deadline."""
+        try:
+            async with asyncio.timeout_at(self.deadline) as timeout:
+                self._timeout = timeout
+                self._arm(self._first_stage)
+                return await self._run_stages()
+        except TimeoutError as e:
+            if not timeout.expired():
+                raise
+            metrics.incr(f"pipeline.timeouts.{self._stage.value}")
+            msg = f"Job timed out while {self._stage.value}"
+            raise StageTimeoutError(msg) from e
+        finally:
+            self._timeout = None
 
-                if predicted_type == DocumentType.UNKNOWN or None:
-                    raise ValueError("❌ Could not determine document type")  # noqa: TRY003, TRY301
+    async def _run_stages(self) -> T:
+        """Parse, classify and extract the document."""
+        artifacts: dict[ArtifactKind, Any] = {}
+        pages = self.pages
+        if pages is None:
+            # Parse the document to extract markdown text, one string per page
+            parser = cast("AbstractDocumentParser", self.parser)
+            pages = await parser.parse_pages()
+            # Known once parsed for parsers that route to another parser
+            self.page_separator = parser.page_separator
+            artifacts[ArtifactKind.PAGES] = {
+                "page_separator": self.page_separator,
+                "pages": pages,
+            }
+        if self.compactor is not None:
+            pages = self._compact(pages)
+        markdown = self.page_separator.join(pages)
+        artifacts[ArtifactKind.MARKDOWN] = markdown
+        await self._store(artifacts)
 
-                self.document_type = predicted_type
+        if self.document_type is None:
+            await self._track_stage(JobStage.CLASSIFYING)
+        if self.document_type is None and self.pre_classifier is not None:
+            self._pre_classify(markdown)
 
-            # Extract structured data from the markdown text
+        if self.document_type is None:
+            mode = ExtractionMode.TWO_STEP if self._chunked(pages) else self.mode
+            started = time.perf_counter()
+            if mode == ExtractionMode.COMBINED:
+                result = await self._classify_and_extract(markdown)
+            else:
+                result = await self._classify_then_extract(markdown, pages)
+            metrics.incr(f"pipeline.auto_routed.{mode.value}")
+            metrics.observe(
+                f"pipeline.llm_seconds.{mode.value}",
+                time.perf_counter() - started,
+            )
+            return result
+
+        return await self._extract(markdown, pages)
+
+    def _arm(self, stage: JobStage) -> None:
+        """Bound the stage that starts by its timeout, within the job deadline."""
+        self._stage = stage
+        if self._timeout is None:
+            return
+
+        when = self.deadline
+        if limit := self.stage_timeouts.get(stage):
+            stage_deadline = asyncio.get_running_loop().time() + limit
+            when = stage_deadline if when is None else min(when, stage_deadline)
+        self._timeout.reschedule(when)
+
+    async def _track(self, update: ProcessingJobUpdate) -> None:
+        """Record job progress when the pipeline runs for a tracked job."""
+        if self.db and self.job_id:
+            await crud_jobs.update_job(self.db, self.job_id, update)
+
+    async def _store(self, artifacts: dict[ArtifactKind, Any]) -> None:
+        """Keep intermediate outputs when enabled for a tracked job."""
+        if self.store_artifacts and self.db and self.job_id:
+            await crud_artifacts.save_artifacts(self.db, self.job_id, artifacts)
+
+    async def _track_stage(self, stage: JobStage) -> None:
+        """Enter an intermediate stage, recording it for a tracked job."""
+        self._arm(stage)
+        if self.db and self.job_id:
+            await crud_jobs.update_job_stage(self.db, self.job_id, stage)
+
+    def _compact(self, pages: list[str]) -> list[str]:
+        """Compact the parsed pages and report the estimated tokens saved."""
+        result = cast("MarkdownCompactor", self.compactor).compact(pages)
+        logger.info(
+            f"🗜️ Compacted markdown from {result.original_tokens} to "
+            f"{result.compacted_tokens} tokens (job {self.job_id})"
+        )
+        metrics.observe("compaction.tokens_saved", result.tokens_saved)
+        metrics.observe("compaction.input_tokens", result.compacted_tokens)
+        return result.pages
+
+    def _pre_classify(self, markdown: str) -> None:
+        """Set the document type from the local classifier when it is confident."""
+        prediction = cast("HeuristicClassifier", self.pre_classifier).predict(markdown)
+
+        if (
+            prediction.document_type != DocumentType.UNKNOWN
+            and prediction.confidence >= self.confidence_threshold
+        ):
+            logger.info(
+                f"🏷️ Classified locally as {prediction.document_type.value} "
+                f"({prediction.confidence:.2f})"
+            )
+            self.document_type = prediction.document_type
+            self.extractor = None
+            metrics.incr("classifier.local.resolved")
+        else:
+            metrics.incr("classifier.local.fallback")
+
+        resolved = metrics.counter("classifier.local.resolved")
+        total = resolved + metrics.counter("classifier.local.fallback")
+        metrics.gauge("classifier.local.resolved_ratio", resolved / total)
+
+    def _chunked(self, pages: list[str]) -> bool:
+        """Return whether the document is long enough for chunked extraction."""
+        return self.chunk_pages > 0 and len(pages) >= self.chunk_min_pages
+
+    async def _extract(self, markdown: str, pages: list[str]) -> T:
+        """Extract structured data for the already known document type."""
+        await self._track_stage(JobStage.EXTRACTING)
+        if self.extractor is None:
             self.extractor = EXTRACTOR_REGISTRY[
-                (DEFAULT_MODEL, self.document_type.value)
+                (self.model, cast("DocumentType", self.document_type).value)
             ]()
 
-            result = await self.extractor.extract(markdown)
+        if self._chunked(pages):
+            document_type = cast("DocumentType", self.document_type).value
+            chunked = ChunkedExtractor[Any](
+                cast("AbstractExtractor[Any]", self.extractor),
+                LINE_ITEMS_EXTRACTOR_REGISTRY[(self.model, document_type)](),
+                pages_per_chunk=self.chunk_pages,
+                max_concurrency=self.chunk_concurrency,
+                page_separator=self.page_separator,
+            )
+            return cast("T", await chunked.extract_pages(pages))
 
-            if self.db and self.job_id:
-                await crud_jobs.update_job(
-                    self.db,
-                    self.job_id,
-                    ProcessingJobUpdate(status=ProcessingStatus.SUCCESS),
-                )
+        return await self.extractor.extract(markdown)
 
-            return result, self.document_type  # noqa: TRY300
+    async def _classify_then_extract(self, markdown: str, pages: list[str]) -> T:
+        """Classify the document with one LLM call, then extract with another."""
+        classifier = CLASSIFIER_REGISTRY[self.model]()
+        predicted_type = await classifier.classify(markdown)
 
-        except Exception as e:
-            if self.db and self.job_id:
-                await crud_jobs.update_job(
-                    self.db,
-                    self.job_id,
-                    ProcessingJobUpdate(
-                        status=ProcessingStatus.FAILED, error_message=str(e)
-                    ),
-                )
-            raise
+        if predicted_type == DocumentType.UNKNOWN:
+            raise ValueError("❌ Could not determine document type")  # noqa: TRY003
+
+        self.document_type = predicted_type
+        self.extractor = None
+        return await self._extract(markdown, pages)
+
+    async def _classify_and_extract(self, markdown: str) -> T:
+        """Classify and extract the document with a single LLM call."""
+        await self._track_stage(JobStage.EXTRACTING)
+        extractor = COMBINED_EXTRACTOR_REGISTRY[self.model]()
+        classified = (await extractor.extract(markdown)).document
+
+        if isinstance(classified, UnknownDocument):
+            raise ValueError("❌ Could not determine document type")  # noqa: TRY003, TRY004
+
+        self.document_type = classified.document_type
+        return cast("T", classified.data)
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TextIO, cast
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.crud import artifacts as crud_artifacts
+from core.crud import jobs as crud_jobs
+from core.db import models
+from core.logic.pipeline import DocumentPipeline
+from core.schemas.classifier import DocumentType
+from core.schemas.job import ProcessingJobCreate, ProcessingJobUpdate
+from core.services.factories import PARSER_REGISTRY, RESPONSE_SCHEMA_REGISTRY
+from core.services.scheduler import scheduling_priority
+from core.utils.blobs import blob_store
+from core.utils.cache import refreshing_caches
+from core.utils.config import (
+    DEFAULT_PARSER,
+    WORKER_CONCURRENCY,
+    JobStage,
+    ObjectStatus,
+    Priority,
+    ProcessingStatus,
+)
+from core.utils.database import async_session_maker
+from core.utils.idsvc import generate_id
+from core.utils.process import (
+    apply_extraction,
+    mark_job_failed,
+    reextract_document,
+)
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_MODELS: dict[DocumentType, type[models.Order | models.Invoice]] = {
+    DocumentType.ORDER: models.Order,
+    DocumentType.INVOICE: models.Invoice,
+}
+
+
+@dataclass(frozen=True)
+class ReprocessSelection:
+    """Orders and invoices to extract again; empty filters match everything."""
+
+    document_types: tuple[DocumentType, ...] = tuple(DOCUMENT_MODELS)
+    statuses: tuple[ObjectStatus, ...] = ()
+    created_from: datetime | None = None
+    created_until: datetime | None = None
+
+
+async def select_documents(
+    db: AsyncSession, selection: ReprocessSelection
+) -> list[tuple[DocumentType, str]]:
+    """Return the type and ID of the selected documents, oldest first."""
+    selected: list[tuple[DocumentType, str]] = []
+    for document_type in selection.document_types:
+        model = DOCUMENT_MODELS[document_type]
+        stmt = select(model.id).order_by(model.created_at, model.id)
+        if selection.statuses:
+            stmt = stmt.where(model.status.in_(selection.statuses))
+        if selection.created_from is not None:
+            stmt = stmt.where(model.created_at >= selection.created_from)
+        if selection.created_until is not None:
+            stmt = stmt.where(model.created_at < selection.created_until)
+        selected += [(document_type, id_) for id_ in await db.scalars(stmt)]
+    return selected
+
+
+def diff_documents(current: BaseModel, extracted: BaseModel) -> dict[str, Any]:
+    """Return the extracted fields that differ from the stored ones, with both values.
+
+    The review status is not extracted data and is left out.
+    """
+    old = current.model_dump(mode="json")
+    new = extracted.model_dump(mode="json", exclude={"status"})
+    return {
+        name: {"old": old.get(name), "new": value}
+        for name, value in new.items()
+        if old.get(name) != value
+    }
+
+
+@dataclass
+class Reprocessor:
+    """Extract stored orders and invoices again and record what changed.
+
+    A document is extracted from the pages its latest job stored, or parsed
+    again from its source document in the blob store when there are none or
+    with ``reparse``. Each extraction runs as a job, at most ``concurrency``
+    at a time, as bulk traffic within the provider rate limits. Cached parses
+    and model outputs are not reused, but replaced by the new ones.
+
+    One JSON line per document is appended to ``output``, listing the fields
+    whose value changed. Documents already in ``output``, except failed ones,
+    are skipped, so an interrupted run resumes where it stopped. With
+    ``apply`` the stored data is replaced by the new data.
+    """
+
+    output: Path
+    concurrency: int = WORKER_CONCURRENCY
+    apply: bool = False
+    reparse: bool = False
+    parser: str = DEFAULT_PARSER
+    language: str = "en"
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker
+    counts: Counter[str] = field(default_factory=Counter)
+
+    def _done(self) -> set[str]:
+        """Return the documents a previous run already went through."""
+        done: set[str] = set()
+        if not self.output.exists():
+            return done
+        with self.output.open(encoding="utf-8") as lines:
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial last line of an interrupted run
+                    continue
+                if record.get("status") != "failed":
+                    done.add(record["document_id"])
+        return done
+
+    async def run(
+        self, selection: ReprocessSelection, stop: asyncio.Event | None = None
+    ) -> Counter[str]:
+        """Reprocess the selected documents until done or ``stop`` is set.
+
+        Returns the number of documents by outcome.
+        """
+        async with self.session_maker() as db:
+            documents = await select_documents(db, selection)
+        done = self._done()
+        pending = [document for document in documents if document[1] not in done]
+        self.counts["skipped"] += len(documents) - len(pending)
+        logger.info(
+            f"♻️ Reprocessing {len(pending)} documents "
+            f"({len(documents) - len(pending)} already done)"
+        )
+
+        queue = iter(pending)
+        with self.output.open("a", encoding="utf-8") as out:
+            await asyncio.gather(
+                *(self._work(queue, out, stop) for _ in range(self.concurrency))
+            )
+        return self.counts
+
+    async def _work(
+        self,
+        queue: Iterator[tuple[DocumentType, str]],
+        out: TextIO,
+        stop: asyncio.Event | None,
+    ) -> None:
+        """Reprocess documents from the shared queue one at a time."""
+        for document_type, document_id in queue:
+            if stop is not None and stop.is_set():
+                return
+            record = await self._reprocess(document_type, document_id)
+            # Written in full at once, so lines of concurrent documents never mix
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            self.counts[record["status"]] += 1
+
+    async def _reprocess(
+        self, document_type: DocumentType, document_id: str
+    ) -> dict[str, Any]:
+        """Extract one document again, applying the changes when enabled.
+
+        The job is created once there is something to extract from, and is
+        settled here, after the changes are applied, or failed on any error.
+        """
+        record: dict[str, Any] = {
+            "document_id": document_id,
+            "document_type": document_type.value,
+        }
+        async with self.session_maker() as db:
+            job_id: str | None = None
+            try:
+                document = cast(
+                    "models.Order | models.Invoice | None",
+                    await db.get(DOCUMENT_MODELS[document_type], document_id),
+                )
+                if document is None:
+                    raise LookupError("Document no longer exists")  # noqa: TRY003, TRY301
+                current = RESPONSE_SCHEMA_REGISTRY[document_type].model_validate(
+                    document, from_attributes=True
+                )
+                source = await self._source(db, document)
+
+                record["job_id"] = job_id = generate_id("J")
+                await crud_jobs.create_job(
+                    db,
+                    ProcessingJobCreate(
+                        id=job_id,
+                        file_name=document.file_name or document.id,
+                        created_by=document.created_by,
+                        status=ProcessingStatus.PROCESSING,
+                        content_digest=document.content_digest,
+                        priority=Priority.BULK,
+                    ),
+                )
+                with scheduling_priority(Priority.BULK), refreshing_caches():
+                    extracted = await self._extract(
+                        db, job_id, document_type, document, source
+                    )
+
+                changes = diff_documents(current, extracted)
+                if self.apply and changes:
+                    await apply_extraction(db, document_type, document_id, extracted)
+                await crud_jobs.update_job(
+                    db,
+                    job_id,
+                    ProcessingJobUpdate(
+                        status=ProcessingStatus.SUCCESS, stage=JobStage.SUCCESS
+                    ),
+                )
+
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"❌ Could not reprocess {document_id}: {e}")
+                if job_id is None:
+                    await db.rollback()
+                else:
+                    await mark_job_failed(db, job_id, e)
+                record.update(status="failed", error=str(e))
+                return record
+
+        record.update(
+            status="changed" if changes else "unchanged",
+            applied=self.apply and bool(changes),
+            changes=changes,
+        )
+        return record
+
+    async def _source(
+        self, db: AsyncSession, document: models.Order | models.Invoice
+    ) -> models.ProcessingJob | Path:
+        """Return the job whose stored pages to extract from, or the file to parse."""
+        if not self.reparse:
+            source = await crud_artifacts.get_source_job(db, document.id)
+            if source is not None:
+                return source
+
+        digest = document.content_digest
+        path = blob_store.path(digest) if digest else None
+        if path is None:
+            raise LookupError("No stored pages nor source document")  # noqa: TRY003
+        return path
+
+    async def _extract(
+        self,
+        db: AsyncSession,
+        job_id: str,
+        document_type: DocumentType,
+        document: models.Order | models.Invoice,
+        source: models.ProcessingJob | Path,
+    ) -> BaseModel:
+        """Extract a document from stored pages, or parse its file again."""
+        if not isinstance(source, Path):
+            extracted, _ = await reextract_document(
+                db=db, job_id=job_id, source_job=source, finalize=False
+            )
+            return extracted
+
+        pipeline: DocumentPipeline[Any] = DocumentPipeline(
+            parser=PARSER_REGISTRY[self.parser](source, self.language),
+            document_type=document_type,
+            db=db,
+            job_id=job_id,
+            finalize=False,
+        )
+        extracted, _ = await pipeline.run()
+        # Later runs extract from the pages this job stored
+        await crud_jobs.update_job(
+            db,
+            job_id,
+            ProcessingJobUpdate(result_id=document.id, document_type=document_type),
+        )
+        return cast("BaseModel", extracted)
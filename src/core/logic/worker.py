@@ -0,0 +1,413 @@
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.crud import blobs as crud_blobs
+from core.crud import jobs as crud_jobs
+from core.crud import users as crud_users
+from core.db.models import ProcessingJob
+from core.services.scheduler import scheduling_priority
+from core.utils.blobs import BlobStore, blob_store
+from core.utils.config import (
+    BLOB_GC_GRACE_SECONDS,
+    BLOB_GC_INTERVAL_SECONDS,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_LEASE_SECONDS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_RETRY_BACKOFF_SECONDS,
+    JOB_STALE_SECONDS,
+    JOB_TIMEOUT_SECONDS,
+    REAPER_INTERVAL_SECONDS,
+    Priority,
+    ProcessingStatus,
+)
+from core.utils.database import async_session_maker
+from core.utils.metrics import metrics
+from core.utils.process import process_uploaded_document
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    """Return an identifier unique to this worker across hosts and processes."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class WorkerStats:
+    """Throughput counters of a single worker."""
+
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    cancelled: int = 0
+    busy_seconds: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def processed(self) -> int:
+        """Number of job attempts run, whatever their outcome."""
+        return self.succeeded + self.failed + self.retried + self.cancelled
+
+    @property
+    def jobs_per_minute(self) -> float:
+        """Average number of job attempts per minute since the worker started."""
+        return self.processed * 60 / max(time.monotonic() - self.started, 1e-9)
+
+    @property
+    def utilization(self) -> float:
+        """Share of time spent processing jobs rather than polling."""
+        return self.busy_seconds / max(time.monotonic() - self.started, 1e-9)
+
+
+class JobInterruptedError(Exception):
+    """Raised when a running job is cancelled or its lease is lost."""
+
+
+# Pipeline runs of the jobs processed in this process, for prompt cancellation
+_running_jobs: dict[str, asyncio.Task[Any]] = {}
+
+
+def interrupt_job(job_id: str) -> bool:
+    """Stop the work in flight for a job if this process is running it."""
+    task = _running_jobs.get(job_id)
+    if task is None:
+        return False
+    task.cancel()
+    return True
+
+
+class JobWorker:
+    """Worker that claims queued processing jobs and runs the pipeline on them.
+
+    Each claimed job is leased for ``lease_seconds`` and the lease is renewed
+    every ``heartbeat_interval`` while the job runs, so jobs of a crashed
+    worker become claimable again once their lease expires. A job that loses
+    its lease, because it was cancelled or taken over, is interrupted at the
+    next heartbeat. Failed jobs are retried with exponential backoff until
+    they run out of attempts; ``ValueError`` marks a document that cannot be
+    processed and fails the job straight away. Each attempt must finish
+    within ``job_timeout`` seconds.
+    """
+
+    def __init__(  # noqa: D107, PLR0913
+        self,
+        worker_id: str | None = None,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        retry_backoff: float = JOB_RETRY_BACKOFF_SECONDS,
+        heartbeat_interval: float = JOB_HEARTBEAT_SECONDS,
+        job_timeout: float = JOB_TIMEOUT_SECONDS,
+    ) -> None:
+        self.worker_id = worker_id or default_worker_id()
+        self.session_maker = session_maker
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.heartbeat_interval = min(heartbeat_interval, lease_seconds / 3)
+        self.job_timeout = job_timeout
+        self.stats = WorkerStats()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Process jobs until ``stop`` is set, finishing the current job first."""
+        logger.info(f"👷 Worker {self.worker_id} started")
+        while not stop.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception(f"💥 Worker {self.worker_id} failed to claim a job")
+                processed = False
+
+            if not processed:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+        logger.info(f"👷 Worker {self.worker_id} stopped")
+
+    async def run_once(self) -> bool:
+        """Claim and process a single job; returns False when the queue is empty."""
+        async with self.session_maker() as db:
+            job = await crud_jobs.claim_job(db, self.worker_id, self.lease_seconds)
+            if job is None:
+                return False
+
+            started = time.monotonic()
+            try:
+                await self._process(db, job)
+            finally:
+                self.stats.busy_seconds += time.monotonic() - started
+            return True
+
+    async def _heartbeat(self, job_id: str, work: asyncio.Task[Any]) -> None:
+        """Renew the lease on a running job, interrupting it once lost."""
+        async with self.session_maker() as db:
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                if not await crud_jobs.heartbeat_job(
+                    db, job_id, self.worker_id, self.lease_seconds
+                ):
+                    logger.warning(f"⚠️ Worker {self.worker_id} lost lease on {job_id}")
+                    work.cancel()
+                    return
+
+    async def _supervise(self, job_id: str, work: asyncio.Task[Any]) -> None:
+        """Wait for the work on a job while keeping its lease alive."""
+        _running_jobs[job_id] = work
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, work))
+        try:
+            await asyncio.wait({work})
+        except asyncio.CancelledError:
+            work.cancel()
+            raise
+        finally:
+            heartbeat.cancel()
+            _running_jobs.pop(job_id, None)
+
+        if work.cancelled():
+            raise JobInterruptedError
+        work.result()
+
+    async def _process(self, db: AsyncSession, job: ProcessingJob) -> None:
+        """Run the pipeline for a claimed job and record the outcome."""
+        # Read everything up front, a rollback expires the loaded job
+        job_id, attempts, max_attempts = job.id, job.attempts, job.max_attempts
+        parent_id = job.parent_id
+        logger.info(f"⚙️ Processing job {job_id} (attempt {attempts})")
+
+        final = True
+        try:
+            await self._run_pipeline(db, job)
+        except asyncio.CancelledError:
+            # Shutting down, the job is picked up again once its lease expires
+            final = False
+            raise
+        except JobInterruptedError:
+            final = await self._interrupted(db, job_id)
+        except ValueError as e:
+            await db.rollback()
+            await crud_jobs.fail_job(db, job_id, self.worker_id, str(e))
+            metrics.incr("jobs.failed")
+            self.stats.failed += 1
+        except Exception as e:
+            logger.exception(f"💥 Job {job_id} failed")
+            await db.rollback()
+            if attempts < max_attempts:
+                delay = self.retry_backoff * 2 ** (attempts - 1)
+                await crud_jobs.retry_job(db, job_id, self.worker_id, str(e), delay)
+                metrics.incr("jobs.retried")
+                self.stats.retried += 1
+                final = False
+            else:
+                await crud_jobs.fail_job(db, job_id, self.worker_id, str(e))
+                metrics.incr("jobs.failed")
+                self.stats.failed += 1
+        else:
+            await crud_jobs.complete_job(db, job_id, self.worker_id)
+            metrics.incr("jobs.succeeded")
+            self.stats.succeeded += 1
+
+        if final and parent_id is not None:
+            await crud_jobs.settle_batch(db, parent_id)
+
+    async def _run_pipeline(self, db: AsyncSession, job: ProcessingJob) -> None:
+        """Process the document of a job within its deadline, under its lease."""
+        user = await crud_users.get_user_by_id(db, job.created_by)
+        if user is None or job.file_path is None:
+            raise ValueError("Job has no owner or source file")  # noqa: TRY003
+
+        with scheduling_priority(Priority(job.priority)):
+            work = asyncio.create_task(
+                process_uploaded_document(
+                    db=db,
+                    user=user,
+                    job_id=job.id,
+                    file_path=Path(job.file_path),
+                    file_name=job.file_name,
+                    content_digest=job.content_digest,
+                    lang=job.language,
+                    finalize=False,
+                    deadline=asyncio.get_running_loop().time() + self.job_timeout,
+                )
+            )
+        await self._supervise(job.id, work)
+
+    async def _interrupted(self, db: AsyncSession, job_id: str) -> bool:
+        """Account for an interrupted job; returns whether it was cancelled."""
+        await db.rollback()
+        logger.warning(f"🛑 Job {job_id} was interrupted")
+        job = await crud_jobs.get_job_by_id(db, job_id)
+        # Otherwise another worker took the job over after its lease expired
+        if job is None or job.status != ProcessingStatus.CANCELLED:
+            return False
+
+        metrics.incr("jobs.cancelled")
+        self.stats.cancelled += 1
+        return True
+
+
+async def reap_once(
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    stale_seconds: float = JOB_STALE_SECONDS,
+) -> None:
+    """Release the jobs of dead workers and settle the batches they finish."""
+    async with session_maker() as db:
+        reaped = await crud_jobs.reap_jobs(db, stale_seconds)
+        if reaped is None:
+            return
+        for batch_id in reaped.batches:
+            await crud_jobs.settle_batch(db, batch_id)
+
+    if reaped.requeued or reaped.failed:
+        logger.warning(
+            f"🧹 Requeued {len(reaped.requeued)} and failed {len(reaped.failed)} "
+            "stuck jobs"
+        )
+    metrics.incr("jobs.reaped.requeued", len(reaped.requeued))
+    metrics.incr("jobs.reaped.failed", len(reaped.failed))
+
+
+async def report_queue(
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> None:
+    """Publish the number of jobs waiting in each priority lane."""
+    async with session_maker() as db:
+        queued = await crud_jobs.count_queued(db)
+    for priority, count in queued.items():
+        metrics.gauge(f"jobs.queued.{priority.name.lower()}", count)
+    if any(queued.values()):
+        lanes = ", ".join(f"{p.name.lower()} {n}" for p, n in queued.items())
+        logger.info(f"📊 Jobs queued: {lanes}")
+
+
+async def run_reaper(
+    stop: asyncio.Event, interval: float = REAPER_INTERVAL_SECONDS
+) -> None:
+    """Reap stuck jobs and report the queue every ``interval`` seconds.
+
+    Runs until ``stop`` is set.
+    """
+    while not stop.is_set():
+        try:
+            await reap_once()
+            await report_queue()
+        except Exception:
+            logger.exception("💥 Job reaper failed")
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(stop.wait(), interval)
+
+
+async def collect_blobs(
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    store: BlobStore = blob_store,
+    grace_seconds: float = BLOB_GC_GRACE_SECONDS,
+) -> int:
+    """Delete the stored documents nothing refers to anymore.
+
+    Blobs are kept for ``grace_seconds`` after their last upload, so failed
+    jobs can still be retried. Returns the number of blobs deleted.
+    """
+    unused_since = time.time() - grace_seconds
+    deleted = 0
+    while True:
+        async with session_maker() as db:
+            digests = await crud_blobs.delete_unused_blobs(
+                db, datetime.fromtimestamp(unused_since, tz=UTC)
+            )
+        if not digests:
+            break
+        for digest in digests:
+            # Files uploaded again meanwhile are kept and recorded once more
+            deleted += await anyio.to_thread.run_sync(
+                store.delete, digest, unused_since
+            )
+
+    swept = await anyio.to_thread.run_sync(store.sweep, unused_since)
+    if deleted or swept:
+        logger.info(f"🧹 Deleted {deleted} unused blobs and {swept} partial writes")
+    metrics.incr("blobs.collected", deleted)
+    return deleted
+
+
+async def run_blob_collector(
+    stop: asyncio.Event, interval: float = BLOB_GC_INTERVAL_SECONDS
+) -> None:
+    """Collect unused blobs every ``interval`` seconds until ``stop`` is set."""
+    while not stop.is_set():
+        try:
+            await collect_blobs()
+        except Exception:
+            logger.exception("💥 Blob collection failed")
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(stop.wait(), interval)
+
+
+def report_stats(workers: list[JobWorker]) -> None:
+    """Log per-worker and total throughput, doubling as a liveness heartbeat."""
+    for worker in workers:
+        stats = worker.stats
+        logger.info(
+            f"💓 {worker.worker_id}: {stats.succeeded} ok, {stats.failed} failed, "
+            f"{stats.retried} retried, {stats.cancelled} cancelled, "
+            f"{stats.jobs_per_minute:.1f} jobs/min, "
+            f"{stats.utilization:.0%} busy"
+        )
+    total = sum(worker.stats.jobs_per_minute for worker in workers)
+    metrics.gauge("workers.jobs_per_minute", total)
+    logger.info(f"💓 {len(workers)} workers, {total:.1f} jobs/min in total")
+
+
+async def run_workers(
+    concurrency: int,
+    stop: asyncio.Event,
+    stats_interval: float | None = None,
+    drain_timeout: float | None = None,
+) -> None:
+    """Run ``concurrency`` workers in this process until ``stop`` is set.
+
+    A reaper and a blob collector run alongside the workers. Once stopped,
+    workers finish their current job. Jobs still running after
+    ``drain_timeout`` seconds are cancelled; their leases expire and another
+    worker picks them up again.
+    """
+    if concurrency <= 0:
+        return
+
+    base_id = default_worker_id()
+    workers = [JobWorker(f"{base_id}-{i}") for i in range(concurrency)]
+    tasks = [asyncio.create_task(worker.run(stop)) for worker in workers]
+
+    async def report() -> None:
+        while stats_interval:
+            await asyncio.sleep(stats_interval)
+            report_stats(workers)
+
+    reporter = asyncio.create_task(report())
+    reaper = asyncio.create_task(run_reaper(stop))
+    collector = asyncio.create_task(run_blob_collector(stop))
+    try:
+        await stop.wait()
+        logger.info(f"🛑 Draining {concurrency} workers")
+        _, pending = await asyncio.wait(tasks, timeout=drain_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            logger.warning(f"⚠️ Cancelled {len(pending)} jobs still running")
+    finally:
+        reporter.cancel()
+        reaper.cancel()
+        collector.cancel()
+        for task in tasks:
+            task.cancel()
+        report_stats(workers)
@@ -1,8 +1,12 @@
 # core/schemas/classifier.py
 from enum import Enum
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from core.schemas.invoice import Invoice
+from core.schemas.order import Order
+
 
 class DocumentType(str, Enum):
     """Enum for different document types."""
@@ -16,3 +20,39 @@ class DocumentTypePrediction(BaseModel):
     """Schema for document type prediction."""
 
     document_type: DocumentType = Field(..., description="Type of the document")
+
+
+class OrderDocument(BaseModel):
+    """Document classified as an order, with its extracted data."""
+
+    document_type: Literal[DocumentType.ORDER] = Field(
+        ..., description="Always 'order'"
+    )
+    data: Order = Field(..., description="Structured order data")
+
+
+class InvoiceDocument(BaseModel):
+    """Document classified as an invoice, with its extracted data."""
+
+    document_type: Literal[DocumentType.INVOICE] = Field(
+        ..., description="Always 'invoice'"
+    )
+    data: Invoice = Field(..., description="Structured invoice data")
+
+
+class UnknownDocument(BaseModel):
+    """Document that is neither an order nor an invoice."""
+
+    document_type: Literal[DocumentType.UNKNOWN] = Field(
+        ..., description="Always 'unknown'"
+    )
+
+
+class ClassifiedDocument(BaseModel):
+    """Document type and structured data returned by a single LLM call."""
+
+    document: OrderDocument | InvoiceDocument | UnknownDocument = Field(
+        ...,
+        discriminator="document_type",
+        description="The document type together with the matching structured data",
+    )
@@ -0,0 +1,44 @@
+# core/schemas/email.py
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from core.schemas.job import ProcessingJobResponse
+
+
+class InboundEmailCreate(BaseModel):
+    """Schema for recording a new inbound email."""
+
+    id: str
+    message_id: str | None = None
+    sender: str
+    recipient: str | None = None
+    subject: str
+    created_by: str
+
+
+class InboundEmailResponse(BaseModel):
+    """Schema for returning an inbound email with the jobs of its attachments."""
+
+    id: str
+    sender: str
+    recipient: str | None
+    subject: str
+    created_by: str
+    received_at: datetime
+    jobs: list[ProcessingJobResponse]
+
+    model_config = {"from_attributes": True}
+
+
+class InboundEmailQueuedResponse(BaseModel):
+    """Schema for returning a queued email and the jobs of its attachments.
+
+    ``duplicate`` is set when the email was already received, in which case
+    the jobs of the original delivery are returned.
+    """
+
+    email_id: str
+    job_ids: list[str]
+    duplicate: bool = False
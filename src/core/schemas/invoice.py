@@ -37,6 +37,14 @@ class Invoice(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class InvoiceLines(BaseModel):
+    """Line items found on some of the pages of an invoice."""
+
+    lines: list[InvoiceLine] = Field(
+        ..., description="Line items on these pages, in the order they appear"
+    )
+
+
 class InvoiceCreate(Invoice):
     """Invoice schema for creating new invoices."""
 
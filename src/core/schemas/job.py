@@ -1,10 +1,15 @@
 # core/schemas/job.py
 
 from datetime import datetime
+from typing import TYPE_CHECKING, Any
 
 from pydantic import BaseModel
 
-from core.utils.config import ProcessingStatus
+from core.schemas.classifier import DocumentType
+from core.utils.config import JobStage, Priority, ProcessingStatus
+
+if TYPE_CHECKING:
+    from core.db.models import ProcessingJob
 
 
 class ProcessingJobCreate(BaseModel):
@@ -14,13 +19,24 @@ class ProcessingJobCreate(BaseModel):
     file_name: str
     created_by: str
     status: ProcessingStatus = ProcessingStatus.PENDING
+    file_path: str | None = None
+    language: str = "en"
+    priority: Priority = Priority.DEFAULT
+    parent_id: str | None = None
+    max_concurrency: int | None = None
+    email_id: str | None = None
+    content_digest: str | None = None
 
 
 class ProcessingJobUpdate(BaseModel):
     """Schema for updating an existing processing job."""
 
-    status: ProcessingStatus
+    status: ProcessingStatus | None = None
+    stage: JobStage | None = None
     error_message: str | None = None
+    result_id: str | None = None
+    document_type: DocumentType | None = None
+    finished_at: datetime | None = None
 
 
 class ProcessingJobResponse(BaseModel):
@@ -29,15 +45,85 @@ class ProcessingJobResponse(BaseModel):
     id: str
     file_name: str | None
     status: ProcessingStatus
+    stage: JobStage
     error_message: str | None
     created_by: str
     created_at: datetime
+    priority: Priority = Priority.DEFAULT
+    attempts: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    parent_id: str | None = None
+    email_id: str | None = None
+    result_id: str | None = None
+    document_type: DocumentType | None = None
 
     model_config = {"from_attributes": True}
 
 
+class BatchJobResponse(BaseModel):
+    """Schema for returning a batch job with the progress of its files."""
+
+    job: ProcessingJobResponse
+    total: int
+    counts: dict[ProcessingStatus, int]
+    finished: bool
+    children: list[ProcessingJobResponse]
+
+
 class JobQueuedResponse(BaseModel):
     """Schema for returning job queued response."""
 
     job_id: str
+    status: ProcessingStatus = ProcessingStatus.PENDING
+
+
+class BatchQueuedResponse(BaseModel):
+    """Schema for returning a queued batch and the jobs of its files."""
+
+    batch_id: str
+    job_ids: list[str]
     status: ProcessingStatus = ProcessingStatus.PROCESSING
+
+
+class ReextractResponse(BaseModel):
+    """Schema for returning the data extracted again from a job's stored pages."""
+
+    job_id: str
+    source_job_id: str
+    document_type: DocumentType
+    result_id: str | None
+    applied: bool
+    data: dict[str, Any]
+
+
+class ReapedJobs(BaseModel):
+    """Schema for the jobs released or failed by a reaper run."""
+
+    requeued: list[str]
+    failed: list[str]
+    batches: set[str]
+
+
+class JobEvent(BaseModel):
+    """Schema for a job status transition streamed to clients."""
+
+    job_id: str
+    status: ProcessingStatus
+    stage: JobStage
+    error_message: str | None = None
+
+    @classmethod
+    def from_job(cls, job: "ProcessingJob") -> "JobEvent":
+        """Build an event from the current state of a job."""
+        return cls(
+            job_id=job.id,
+            status=ProcessingStatus(job.status),
+            stage=job.stage,
+            error_message=job.error_message,
+        )
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job reached a final state."""
+        return self.stage in {JobStage.SUCCESS, JobStage.FAILED, JobStage.CANCELLED}
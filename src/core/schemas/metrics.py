@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+
+
+class SummarySnapshot(BaseModel):
+    """Aggregated observations of a single summary metric."""
+
+    count: int
+    total: float
+    mean: float
+    max: float
+
+
+class MetricsSnapshot(BaseModel):
+    """Point-in-time view of the in-process metrics registry."""
+
+    counters: dict[str, float] = Field(..., description="Monotonic counters")
+    gauges: dict[str, float] = Field(..., description="Current gauge values")
+    summaries: dict[str, SummarySnapshot] = Field(
+        ..., description="Count, total, mean and max of observed values"
+    )
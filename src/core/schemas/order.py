@@ -35,6 +35,14 @@ class Order(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class OrderLines(BaseModel):
+    """Line items found on some of the pages of an order."""
+
+    lines: list[OrderLine] = Field(
+        ..., description="Line items on these pages, in the order they appear"
+    )
+
+
 class OrderCreate(Order):
     """Order schema for creating new orders."""
 
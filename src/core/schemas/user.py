@@ -75,10 +75,18 @@ class AdminUserUpdate(UserUpdate):  # noqa: D101
     role: str | None = Field(
         None, description="The role of the user. Only settable by admins."
     )
+    job_weight: float | None = Field(
+        None, gt=0, description="Share of the job queue relative to other users."
+    )
+    max_concurrent_jobs: int | None = Field(
+        None, ge=1, description="Maximum number of jobs of the user run at once."
+    )
 
 
 class AdminUserResponse(UserResponse):  # noqa: D101
     role: str  # Include 'role' only for admin responses
+    job_weight: float = 1.0
+    max_concurrent_jobs: int | None = None
 
 
 class PasswordChange(BaseModel, PasswordValidationMixin):  # noqa: D101
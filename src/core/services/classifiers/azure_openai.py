@@ -1,12 +1,8 @@
-import os
-
-from openai import AsyncAzureOpenAI
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-
 from core.schemas.classifier import DocumentType, DocumentTypePrediction
 from core.services.classifiers.base import AbstractClassifier
+from core.services.providers import provider_pool
+from core.services.scheduler import scheduler
+from core.utils.tokens import estimate_tokens
 
 
 class PydanticAzureClassifier(AbstractClassifier):
@@ -14,17 +10,11 @@ class PydanticAzureClassifier(AbstractClassifier):
 
     def __init__(self, model_name: str = "gpt-4o") -> None:
         """Initialize the classifier with the specified model name."""
-        client = AsyncAzureOpenAI(
-            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-            api_key=os.environ["AZURE_OPENAI_API_KEY"],
-            api_version="2024-07-01-preview",
-            azure_deployment="gpt-4",
-        )
-        provider = OpenAIProvider(openai_client=client)
-        model = OpenAIModel(model_name, provider=provider)
-        self.agent = Agent(model, output_type=DocumentTypePrediction)
+        self.agent = provider_pool.agent("azure", model_name, DocumentTypePrediction)
 
     async def classify(self, markdown: str) -> DocumentType:
         """Classify the document type based on the provided markdown text."""
-        result = await self.agent.run(markdown)
+        result = await scheduler.run(
+            "azure", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
         return result.output.document_type
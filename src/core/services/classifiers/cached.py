@@ -0,0 +1,42 @@
+import logging
+
+from core.schemas.classifier import DocumentType, DocumentTypePrediction
+from core.services.classifiers.base import AbstractClassifier
+from core.utils.cache import DiskCache, llm_cache, schema_fingerprint, sha256_text
+
+logger = logging.getLogger(__name__)
+
+
+class CachedClassifier(AbstractClassifier):
+    """Classifier wrapper that memoizes document type predictions on disk."""
+
+    def __init__(  # noqa: D107
+        self,
+        classifier: AbstractClassifier,
+        model_key: str,
+        cache: DiskCache = llm_cache,
+    ) -> None:
+        self.classifier = classifier
+        self.model_key = model_key
+        self.cache = cache
+
+    async def classify(self, markdown: str) -> DocumentType:
+        """Return the cached prediction, calling the model on a miss."""
+        key = ":".join(
+            [
+                "classify",
+                self.model_key,
+                schema_fingerprint(DocumentTypePrediction),
+                sha256_text(markdown),
+            ]
+        )
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            logger.info(f"⚡ Classification cache hit ({self.model_key})")
+            return DocumentTypePrediction.model_validate_json(cached).document_type
+
+        document_type = await self.classifier.classify(markdown)
+        prediction = DocumentTypePrediction(document_type=document_type)
+        await self.cache.set(key, prediction.model_dump_json().encode())
+        return document_type
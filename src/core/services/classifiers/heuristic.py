@@ -0,0 +1,112 @@
+import json
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.schemas.classifier import DocumentType
+from core.services.classifiers.base import AbstractClassifier
+
+# Only the start of a document is scanned; titles and VAT details live there
+SCAN_CHARS = 20_000
+
+
+@dataclass(frozen=True)
+class Feature:
+    """Regex feature adding ``weight`` log-odds in favour of a document type."""
+
+    pattern: re.Pattern[str]
+    document_type: DocumentType
+    weight: float
+
+
+@dataclass(frozen=True)
+class Prediction:
+    """Predicted document type with a confidence between 0 and 1."""
+
+    document_type: DocumentType
+    confidence: float
+
+
+def _feature(pattern: str, document_type: DocumentType, weight: float) -> Feature:
+    return Feature(re.compile(pattern, re.IGNORECASE), document_type, weight)
+
+
+INVOICE, ORDER = DocumentType.INVOICE, DocumentType.ORDER
+
+# Keywords in English, Dutch, French and German
+DEFAULT_FEATURES: list[Feature] = [
+    _feature(r"\b(tax\s+)?invoice\b", INVOICE, 2.0),
+    _feature(r"\bfactuur\b", INVOICE, 2.5),
+    _feature(r"\bfacture\b", INVOICE, 2.5),
+    _feature(r"\brechnung\b", INVOICE, 2.5),
+    _feature(
+        r"\b(invoice|factuur|facture|rechnungs)\s*(nr|no|number|nummer)", INVOICE, 1.5
+    ),
+    _feature(r"\bfactuurnummer\b|\bnuméro\s+de\s+facture\b", INVOICE, 1.5),
+    _feature(
+        r"\b(BE|NL|FR|DE|LU)\s?0?\d{3}[\s.]?\d{3}[\s.]?\d{3}(B\d{2})?\b", INVOICE, 1.0
+    ),
+    _feature(r"\b(VAT|BTW|TVA|USt|MwSt)[\s.-]*(id|nr|no|number|nummer)", INVOICE, 1.0),
+    _feature(r"\bIBAN\b", INVOICE, 1.0),
+    _feature(r"\b(due\s+date|vervaldatum|vervaldag|échéance|fällig)", INVOICE, 1.0),
+    _feature(r"\bpurchase\s+order\b", ORDER, 3.0),
+    _feature(r"\bbestelbon\b", ORDER, 3.0),
+    _feature(r"\bbestelling\b|\bbestelnummer\b", ORDER, 2.0),
+    _feature(r"\bbon\s+de\s+commande\b", ORDER, 3.0),
+    _feature(r"\bcommande\b", ORDER, 1.5),
+    _feature(r"\bbestellung\b", ORDER, 2.5),
+    _feature(r"\b(PO|order)\s*(nr|no|number|#)", ORDER, 1.5),
+    _feature(
+        r"\b(delivery\s+date|leverdatum|date\s+de\s+livraison|liefertermin)", ORDER, 1.0
+    ),
+]
+
+
+class HeuristicClassifier(AbstractClassifier):
+    """Fast local classifier based on weighted keyword and regex features.
+
+    Each matching feature adds its weight to the score of its document type.
+    The confidence is the logistic of the margin between the best and the
+    runner-up score, so documents matching only one kind of keywords are
+    classified with high confidence and ambiguous ones fall back to the LLM.
+    """
+
+    def __init__(self, features: list[Feature] | None = None) -> None:  # noqa: D107
+        self.features = features if features is not None else DEFAULT_FEATURES
+
+    @classmethod
+    def from_file(cls, path: Path) -> "HeuristicClassifier":
+        """Load features from a JSON list of pattern, document_type and weight."""
+        entries = json.loads(path.read_text())
+        return cls(
+            [
+                _feature(
+                    entry["pattern"],
+                    DocumentType(entry["document_type"]),
+                    float(entry["weight"]),
+                )
+                for entry in entries
+            ]
+        )
+
+    def predict(self, markdown: str) -> Prediction:
+        """Return the most likely document type and its confidence."""
+        text = markdown[:SCAN_CHARS]
+        scores = {INVOICE: 0.0, ORDER: 0.0}
+        for feature in self.features:
+            if feature.pattern.search(text):
+                scores[feature.document_type] += feature.weight
+
+        (best, best_score), (_, runner_up) = sorted(
+            scores.items(), key=lambda item: item[1], reverse=True
+        )
+        if best_score <= 0:
+            return Prediction(DocumentType.UNKNOWN, 0.0)
+
+        confidence = 1 / (1 + math.exp(-(best_score - runner_up)))
+        return Prediction(best, confidence)
+
+    async def classify(self, markdown: str) -> DocumentType:
+        """Classify the document type based on the provided markdown text."""
+        return self.predict(markdown).document_type
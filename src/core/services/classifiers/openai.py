@@ -1,20 +1,19 @@
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-
 from core.schemas.classifier import DocumentType, DocumentTypePrediction
 from core.services.classifiers.base import AbstractClassifier
+from core.services.providers import provider_pool
+from core.services.scheduler import scheduler
+from core.utils.tokens import estimate_tokens
 
 
 class PydanticOpenAIClassifier(AbstractClassifier):
     """Classifier for document types using OpenAI's GPT model."""
 
     def __init__(self, model_name: str = "gpt-4o") -> None:  # noqa: D107
-        provider = OpenAIProvider()
-        model = OpenAIModel(model_name, provider=provider)
-        self.agent = Agent(model, output_type=DocumentTypePrediction)
+        self.agent = provider_pool.agent("openai", model_name, DocumentTypePrediction)
 
     async def classify(self, markdown: str) -> DocumentType:
         """Classify the document type based on the provided markdown text."""
-        result = await self.agent.run(markdown)
+        result = await scheduler.run(
+            "openai", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
         return result.output.document_type
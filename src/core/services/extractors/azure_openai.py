@@ -1,48 +1,71 @@
-import os
+from typing import TypeVar
 
-from openai import AsyncAzureOpenAI
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
+from pydantic import BaseModel
 
+from core.schemas.classifier import ClassifiedDocument
 from core.schemas.invoice import Invoice
 from core.schemas.order import Order
 from core.services.extractors.base import AbstractExtractor
+from core.services.providers import provider_pool
+from core.services.scheduler import scheduler
+from core.utils.tokens import estimate_tokens
+
+TModel = TypeVar("TModel", bound=BaseModel)
 
 
 class PydanticAzureExtractor(AbstractExtractor[Order]):  # noqa: D101
     def __init__(self, model_name: str = "gpt-4o") -> None:  # noqa: D107
-        # Log the environment vars (only safe ones!)
-        client = AsyncAzureOpenAI(
-            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-            api_key=os.environ["AZURE_OPENAI_API_KEY"],
-            api_version="2024-07-01-preview",
-            azure_deployment="gpt-4",
-        )
-        provider = OpenAIProvider(openai_client=client)
-        model = OpenAIModel(model_name, provider=provider)
-        self.agent = Agent(model, output_type=Order)
+        self.model_name = model_name
+        self.agent = provider_pool.agent("azure", model_name, Order)
 
     async def extract(self, markdown: str) -> Order:
         """Extract order information from markdown text using an AI agent."""
-        result = await self.agent.run(markdown)
+        result = await scheduler.run(
+            "azure", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
         return result.output
 
 
 class PydanticAzureInvoiceExtractor(AbstractExtractor[Invoice]):  # noqa: D101
     def __init__(self, model_name: str = "gpt-4o") -> None:  # noqa: D107
-        # Log the environment vars (only safe ones!)
-        client = AsyncAzureOpenAI(
-            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-            api_key=os.environ["AZURE_OPENAI_API_KEY"],
-            api_version="2024-07-01-preview",
-            azure_deployment="gpt-4",
-        )
-        provider = OpenAIProvider(openai_client=client)
-        model = OpenAIModel(model_name, provider=provider)
-        self.agent = Agent(model, output_type=Invoice)
+        self.model_name = model_name
+        self.agent = provider_pool.agent("azure", model_name, Invoice)
 
     async def extract(self, markdown: str) -> Invoice:
         """Extract order information from markdown text using an AI agent."""
-        result = await self.agent.run(markdown)
+        result = await scheduler.run(
+            "azure", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
+        return result.output
+
+
+class PydanticAzureClassifyingExtractor(AbstractExtractor[ClassifiedDocument]):
+    """Classify and extract a document in one call using Azure OpenAI."""
+
+    def __init__(self, model_name: str = "gpt-4o") -> None:  # noqa: D107
+        self.model_name = model_name
+        self.agent = provider_pool.agent("azure", model_name, ClassifiedDocument)
+
+    async def extract(self, markdown: str) -> ClassifiedDocument:
+        """Return the document type and its structured data from the markdown."""
+        result = await scheduler.run(
+            "azure", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
+        return result.output
+
+
+class PydanticAzureLineItemsExtractor(AbstractExtractor[TModel]):
+    """Extract only the line items of some pages using Azure OpenAI."""
+
+    def __init__(  # noqa: D107
+        self, output_type: type[TModel], model_name: str = "gpt-4o"
+    ) -> None:
+        self.model_name = model_name
+        self.agent = provider_pool.agent("azure", model_name, output_type)
+
+    async def extract(self, markdown: str) -> TModel:
+        """Return the line items found in the markdown."""
+        result = await scheduler.run(
+            "azure", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
         return result.output
@@ -7,6 +7,9 @@ T = TypeVar("T")
 class AbstractExtractor(ABC, Generic[T]):
     """Abstract base class for extractors."""
 
+    # Model the extractor calls, part of the keys of cached outputs
+    model_name = ""
+
     @abstractmethod
     async def extract(self, markdown: str) -> T:
         """Extract structured data of type T from markdown."""
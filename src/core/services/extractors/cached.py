@@ -0,0 +1,58 @@
+import logging
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from core.schemas.classifier import DocumentType
+from core.services.extractors.base import AbstractExtractor
+from core.utils.cache import DiskCache, llm_cache, schema_fingerprint, sha256_text
+
+logger = logging.getLogger(__name__)
+
+TModel = TypeVar("TModel", bound=BaseModel)
+
+
+class CachedExtractor(AbstractExtractor[TModel]):
+    """Extractor wrapper that memoizes structured outputs on disk.
+
+    The cache key combines the markdown digest, the model key and name, the
+    document type and a fingerprint of the output schema, so model and schema
+    changes invalidate old entries automatically.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        extractor: AbstractExtractor[TModel],
+        model_key: str,
+        document_type: DocumentType,
+        output_type: type[TModel],
+        cache: DiskCache = llm_cache,
+    ) -> None:
+        self.extractor = extractor
+        self.model_key = model_key
+        self.model_name = extractor.model_name
+        self.document_type = document_type
+        self.output_type = output_type
+        self.cache = cache
+
+    async def extract(self, markdown: str) -> TModel:
+        """Return the cached extraction, calling the model on a miss."""
+        key = ":".join(
+            [
+                "extract",
+                self.model_key,
+                self.model_name,
+                self.document_type.value,
+                schema_fingerprint(self.output_type),
+                sha256_text(markdown),
+            ]
+        )
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            logger.info(f"⚡ Extraction cache hit for {key}")
+            return self.output_type.model_validate_json(cached)
+
+        result = await self.extractor.extract(markdown)
+        await self.cache.set(key, result.model_dump_json().encode())
+        return result
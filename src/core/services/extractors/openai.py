@@ -1,23 +1,30 @@
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
+from typing import TypeVar
 
+from pydantic import BaseModel
+
+from core.schemas.classifier import ClassifiedDocument
 from core.schemas.invoice import Invoice
 from core.schemas.order import Order
 from core.services.extractors.base import AbstractExtractor
+from core.services.providers import provider_pool
+from core.services.scheduler import scheduler
+from core.utils.tokens import estimate_tokens
+
+TModel = TypeVar("TModel", bound=BaseModel)
 
 
 class PydanticOpenAIExtractor(AbstractExtractor[Order]):
     """Extractor for orders using OpenAI's GPT model."""
 
     def __init__(self, model_name: str = "gpt-4o") -> None:  # noqa: D107
-        provider = OpenAIProvider()
-        model = OpenAIModel(model_name, provider=provider)
-        self.agent = Agent(model, output_type=Order)
+        self.model_name = model_name
+        self.agent = provider_pool.agent("openai", model_name, Order)
 
     async def extract(self, markdown: str) -> Order:
         """Extract an order from the provided markdown string using the agent."""
-        result = await self.agent.run(markdown)
+        result = await scheduler.run(
+            "openai", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
         return result.output
 
 
@@ -25,11 +32,44 @@ class PydanticOpenAIInvoiceExtractor(AbstractExtractor[Invoice]):
     """Extractor for invoices using OpenAI's GPT model."""
 
     def __init__(self, model_name: str = "gpt-4o") -> None:  # noqa: D107
-        provider = OpenAIProvider()
-        model = OpenAIModel(model_name, provider=provider)
-        self.agent = Agent(model, output_type=Invoice)
+        self.model_name = model_name
+        self.agent = provider_pool.agent("openai", model_name, Invoice)
 
     async def extract(self, markdown: str) -> Invoice:
         """Extract an invoice from the provided markdown string using the agent."""
-        result = await self.agent.run(markdown)
+        result = await scheduler.run(
+            "openai", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
+        return result.output
+
+
+class PydanticOpenAIClassifyingExtractor(AbstractExtractor[ClassifiedDocument]):
+    """Classify and extract a document in one call using OpenAI's GPT model."""
+
+    def __init__(self, model_name: str = "gpt-4o") -> None:  # noqa: D107
+        self.model_name = model_name
+        self.agent = provider_pool.agent("openai", model_name, ClassifiedDocument)
+
+    async def extract(self, markdown: str) -> ClassifiedDocument:
+        """Return the document type and its structured data from the markdown."""
+        result = await scheduler.run(
+            "openai", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
+        return result.output
+
+
+class PydanticOpenAILineItemsExtractor(AbstractExtractor[TModel]):
+    """Extract only the line items of some pages using OpenAI's GPT model."""
+
+    def __init__(  # noqa: D107
+        self, output_type: type[TModel], model_name: str = "gpt-4o"
+    ) -> None:
+        self.model_name = model_name
+        self.agent = provider_pool.agent("openai", model_name, output_type)
+
+    async def extract(self, markdown: str) -> TModel:
+        """Return the line items found in the markdown."""
+        result = await scheduler.run(
+            "openai", lambda: self.agent.run(markdown), estimate_tokens(markdown)
+        )
         return result.output
@@ -1,49 +1,255 @@
 from collections.abc import Callable
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import Any
 
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.crud.invoices import create_invoice
-from core.crud.orders import create_order
+from core.crud.invoices import create_invoice, update_invoice
+from core.crud.orders import create_order, update_order
 from core.db import models
-from core.schemas.classifier import DocumentType
-from core.schemas.invoice import InvoiceCreate, InvoiceResponse
-from core.schemas.order import OrderCreate, OrderResponse
+from core.schemas.classifier import ClassifiedDocument, DocumentType
+from core.schemas.invoice import (
+    Invoice,
+    InvoiceCreate,
+    InvoiceLines,
+    InvoiceResponse,
+    InvoiceUpdate,
+)
+from core.schemas.order import (
+    Order,
+    OrderCreate,
+    OrderLines,
+    OrderResponse,
+    OrderUpdate,
+)
 from core.services.classifiers.azure_openai import PydanticAzureClassifier
 from core.services.classifiers.base import AbstractClassifier
+from core.services.classifiers.cached import CachedClassifier
 from core.services.classifiers.openai import PydanticOpenAIClassifier
 from core.services.extractors.azure_openai import (
+    PydanticAzureClassifyingExtractor,
     PydanticAzureExtractor,
     PydanticAzureInvoiceExtractor,
+    PydanticAzureLineItemsExtractor,
 )
 from core.services.extractors.base import AbstractExtractor
+from core.services.extractors.cached import CachedExtractor
 from core.services.extractors.openai import (
+    PydanticOpenAIClassifyingExtractor,
     PydanticOpenAIExtractor,
     PydanticOpenAIInvoiceExtractor,
+    PydanticOpenAILineItemsExtractor,
 )
 from core.services.parsers.azure_parser import AzureDocumentParser
-from core.services.parsers.base import AbstractDocumentParser
+from core.services.parsers.base import AbstractDocumentParser, DocumentSource
+from core.services.parsers.cached import CachedDocumentParser
 from core.services.parsers.llamaparse_parser import LlamaParseParser
+from core.services.parsers.pdf_text_parser import PdfTextLayerParser
+from core.services.routing import (
+    FailoverClassifier,
+    FailoverDocumentParser,
+    FailoverExtractor,
+)
+from core.utils.config import (
+    LLM_CACHE_ENABLED,
+    PARSE_CACHE_ENABLED,
+    PDF_TEXT_LAYER_ENABLED,
+    ROUTING_MODELS,
+    ROUTING_PARSERS,
+)
+
+# Parsers read a path, or a DocumentSource for documents held in memory
+ParserFactory = Callable[[Path | DocumentSource, str], AbstractDocumentParser]
+
+
+def cached_parser(name: str, factory: ParserFactory) -> ParserFactory:
+    """Wrap a parser factory so its parsers reuse cached results."""
+
+    def build(document: Path | DocumentSource, lang: str) -> AbstractDocumentParser:
+        # The cache and the parser share one source, read at most once
+        source = DocumentSource.of(document)
+        parser = factory(source, lang)
+        if not PARSE_CACHE_ENABLED:
+            return parser
+        return CachedDocumentParser(parser, name=name, source=source, language=lang)
+
+    return build
+
+
+def text_layer_first(factory: ParserFactory) -> ParserFactory:
+    """Wrap a cloud parser factory so digital PDFs are parsed locally first."""
 
-T = TypeVar("T")
+    def build(document: Path | DocumentSource, lang: str) -> AbstractDocumentParser:
+        if not PDF_TEXT_LAYER_ENABLED:
+            return factory(document, lang)
+        return PdfTextLayerParser(document, lang, fallback=factory)
 
-PARSER_REGISTRY: dict[str, Callable[[Path, str], AbstractDocumentParser]] = {
-    "llamaparse": lambda path, lang: LlamaParseParser(path=Path(path), language=lang),
-    "azure": lambda path, lang: AzureDocumentParser(path=Path(path), language=lang),
+    return build
+
+
+_PARSERS: dict[str, ParserFactory] = {
+    "llamaparse": lambda document, lang: LlamaParseParser(document, language=lang),
+    "azure": lambda document, lang: AzureDocumentParser(document, language=lang),
 }
 
+PARSER_REGISTRY: dict[str, ParserFactory] = {
+    name: text_layer_first(cached_parser(name, factory))
+    for name, factory in _PARSERS.items()
+}
+# Routes each document across the ROUTING_PARSERS with failover and hedging
+PARSER_REGISTRY["auto"] = text_layer_first(
+    cached_parser(
+        "auto",
+        lambda document, lang: FailoverDocumentParser(
+            document, lang, {name: _PARSERS[name] for name in ROUTING_PARSERS}
+        ),
+    )
+)
+
+
+def cached_extractor[TModel: BaseModel](
+    model_key: str,
+    document_type: DocumentType,
+    output_type: type[TModel],
+    factory: Callable[[], AbstractExtractor[TModel]],
+) -> Callable[[], AbstractExtractor[TModel]]:
+    """Wrap an extractor factory so its extractors reuse cached outputs."""
+
+    def build() -> AbstractExtractor[TModel]:
+        extractor = factory()
+        if not LLM_CACHE_ENABLED:
+            return extractor
+        return CachedExtractor(extractor, model_key, document_type, output_type)
+
+    return build
+
+
+def cached_classifier(
+    model_key: str, factory: Callable[[], AbstractClassifier]
+) -> Callable[[], AbstractClassifier]:
+    """Wrap a classifier factory so its classifiers reuse cached predictions."""
+
+    def build() -> AbstractClassifier:
+        classifier = factory()
+        if not LLM_CACHE_ENABLED:
+            return classifier
+        return CachedClassifier(classifier, model_key)
+
+    return build
+
+
+def routed_models[T](backends: dict[str, T]) -> dict[str, T]:
+    """Select the ROUTING_MODELS backends, in their configured order."""
+    return {name: backends[name] for name in ROUTING_MODELS}
+
+
+def failover_extractor[TModel: BaseModel](
+    backends: dict[str, Callable[[], AbstractExtractor[TModel]]],
+) -> Callable[[], AbstractExtractor[TModel]]:
+    """Build extractors routing across the ROUTING_MODELS backends."""
+    selected = routed_models(backends)
+    return lambda: FailoverExtractor(selected)
+
+
 EXTRACTOR_REGISTRY: dict[tuple[str, str], Callable[[], AbstractExtractor[Any]]] = {
-    ("openai", "order"): lambda: PydanticOpenAIExtractor(),
-    ("azure", "order"): lambda: PydanticAzureExtractor(),
-    ("openai", "invoice"): lambda: PydanticOpenAIInvoiceExtractor(),
-    ("azure", "invoice"): lambda: PydanticAzureInvoiceExtractor(),
+    ("openai", "order"): cached_extractor(
+        "openai", DocumentType.ORDER, Order, PydanticOpenAIExtractor
+    ),
+    ("azure", "order"): cached_extractor(
+        "azure", DocumentType.ORDER, Order, PydanticAzureExtractor
+    ),
+    ("openai", "invoice"): cached_extractor(
+        "openai", DocumentType.INVOICE, Invoice, PydanticOpenAIInvoiceExtractor
+    ),
+    ("azure", "invoice"): cached_extractor(
+        "azure", DocumentType.INVOICE, Invoice, PydanticAzureInvoiceExtractor
+    ),
+    ("auto", "order"): cached_extractor(
+        "auto",
+        DocumentType.ORDER,
+        Order,
+        failover_extractor(
+            {"openai": PydanticOpenAIExtractor, "azure": PydanticAzureExtractor}
+        ),
+    ),
+    ("auto", "invoice"): cached_extractor(
+        "auto",
+        DocumentType.INVOICE,
+        Invoice,
+        failover_extractor(
+            {
+                "openai": PydanticOpenAIInvoiceExtractor,
+                "azure": PydanticAzureInvoiceExtractor,
+            }
+        ),
+    ),
+}
+
+
+def line_item_extractors[TModel: BaseModel](
+    document_type: DocumentType, output_type: type[TModel]
+) -> dict[tuple[str, str], Callable[[], AbstractExtractor[Any]]]:
+    """Build the line item extractors of a document type, for every model."""
+    backends: dict[str, Callable[[], AbstractExtractor[TModel]]] = {
+        "openai": lambda: PydanticOpenAILineItemsExtractor(output_type),
+        "azure": lambda: PydanticAzureLineItemsExtractor(output_type),
+    }
+    factories = {**backends, "auto": failover_extractor(backends)}
+    return {
+        (model, document_type.value): cached_extractor(
+            model, document_type, output_type, factory
+        )
+        for model, factory in factories.items()
+    }
+
+
+# Extractors of the line items alone, run on the page groups of long documents
+LINE_ITEMS_EXTRACTOR_REGISTRY = {
+    **line_item_extractors(DocumentType.ORDER, OrderLines),
+    **line_item_extractors(DocumentType.INVOICE, InvoiceLines),
+}
+
+# Single-call extractors returning both the document type and its data
+COMBINED_EXTRACTOR_REGISTRY: dict[
+    str, Callable[[], AbstractExtractor[ClassifiedDocument]]
+] = {
+    "openai": cached_extractor(
+        "openai",
+        DocumentType.UNKNOWN,
+        ClassifiedDocument,
+        PydanticOpenAIClassifyingExtractor,
+    ),
+    "azure": cached_extractor(
+        "azure",
+        DocumentType.UNKNOWN,
+        ClassifiedDocument,
+        PydanticAzureClassifyingExtractor,
+    ),
+    "auto": cached_extractor(
+        "auto",
+        DocumentType.UNKNOWN,
+        ClassifiedDocument,
+        failover_extractor(
+            {
+                "openai": PydanticOpenAIClassifyingExtractor,
+                "azure": PydanticAzureClassifyingExtractor,
+            }
+        ),
+    ),
 }
 
 CLASSIFIER_REGISTRY: dict[str, Callable[[], AbstractClassifier]] = {
-    "openai": PydanticOpenAIClassifier,
-    "azure": PydanticAzureClassifier,
+    "openai": cached_classifier("openai", PydanticOpenAIClassifier),
+    "azure": cached_classifier("azure", PydanticAzureClassifier),
+    "auto": cached_classifier(
+        "auto",
+        lambda: FailoverClassifier(
+            routed_models(
+                {"openai": PydanticOpenAIClassifier, "azure": PydanticAzureClassifier}
+            )
+        ),
+    ),
 }
 
 CREATE_FN_REGISTRY: dict[
@@ -58,6 +264,18 @@ CREATE_SCHEMA_REGISTRY: dict[DocumentType, type[OrderCreate | InvoiceCreate]] =
     DocumentType.INVOICE: InvoiceCreate,
 }
 
+UPDATE_FN_REGISTRY: dict[
+    DocumentType, Callable[[AsyncSession, str, BaseModel], Any]
+] = {
+    DocumentType.ORDER: update_order,  # type: ignore  # noqa: PGH003
+    DocumentType.INVOICE: update_invoice,  # type: ignore  # noqa: PGH003
+}
+
+UPDATE_SCHEMA_REGISTRY: dict[DocumentType, type[OrderUpdate | InvoiceUpdate]] = {
+    DocumentType.ORDER: OrderUpdate,
+    DocumentType.INVOICE: InvoiceUpdate,
+}
+
 RESPONSE_SCHEMA_REGISTRY: dict[DocumentType, type[BaseModel]] = {
     DocumentType.ORDER: OrderResponse,
     DocumentType.INVOICE: InvoiceResponse,
@@ -1,12 +1,12 @@
-import os
 from io import BytesIO
 from pathlib import Path
 
-import anyio
-from azure.ai.formrecognizer.aio import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
+from azure.ai.formrecognizer import AnalyzeResult
 
-from .base import AbstractDocumentParser
+from core.services.providers import provider_pool
+from core.services.scheduler import scheduler
+
+from .base import AbstractDocumentParser, DocumentSource
 
 SUPPORTED_AZURE_FORMATS = {".pdf", ".jpg", ".jpeg", ".png", ".tiff", ".bmp"}
 
@@ -14,44 +14,48 @@ SUPPORTED_AZURE_FORMATS = {".pdf", ".jpg", ".jpeg", ".png", ".tiff", ".bmp"}
 class AzureDocumentParser(AbstractDocumentParser):
     """Azure Document Intelligence parser returning Markdown text."""
 
-    def __init__(self, path: Path, language: str = "en") -> None:  # noqa: D107
-        self.path = path
+    page_separator = "\n"
+
+    def __init__(self, source: Path | DocumentSource, language: str = "en") -> None:  # noqa: D107
+        self.source = DocumentSource.of(source)
         self.language = language
 
         # Validate supported file format
-        if self.path.suffix.lower() not in SUPPORTED_AZURE_FORMATS:
+        if self.source.suffix not in SUPPORTED_AZURE_FORMATS:
             msg = f"Unsupported file format for \
-                    AzureDocumentParser: '{self.path.suffix}'. \
+                    AzureDocumentParser: '{self.source.suffix}'. \
                         Supported formats are: {', '.join(SUPPORTED_AZURE_FORMATS)}."
             raise ValueError(msg)
 
-        self.endpoint = os.environ["AZURE_DI_ENDPOINT"]
-        self.key = os.environ["AZURE_DI_KEY"]
-        self.client = DocumentAnalysisClient(
-            endpoint=self.endpoint,
-            credential=AzureKeyCredential(self.key),
-        )
+        self.client = provider_pool.document_analysis_client()
 
     async def parse(self) -> str:
         """Asynchronously parse a PDF using Azure Form Recognizer
         and return markdown.
         """
-        async with await anyio.open_file(self.path, "rb") as f:
-            file_bytes = await f.read()
+        return self.page_separator.join(await self.parse_pages())
+
+    async def parse_pages(self) -> list[str]:
+        """Parse a PDF using Azure Form Recognizer into markdown per page."""
+        content = await self.source.read()
+
+        async def analyze() -> AnalyzeResult:
+            # Wrap the bytes in a stream — this avoids double content_type injection
+            stream = BytesIO(content)
 
-        # Wrap the bytes in a stream — this avoids double content_type injection
-        stream = BytesIO(file_bytes)
+            poller = await self.client.begin_analyze_document(
+                model_id="prebuilt-layout",
+                document=stream,
+            )
+            return await poller.result()
 
-        poller = await self.client.begin_analyze_document(
-            model_id="prebuilt-layout",
-            document=stream,
-        )
-        result = await poller.result()
+        result = await scheduler.run("azure_di", analyze)
 
-        markdown = []
+        pages = []
         for page in result.pages:
-            markdown.append(f"# Page {page.page_number}\n")
-            markdown.extend([line.content for line in page.lines])
+            markdown = [f"# Page {page.page_number}\n"]
+            markdown.extend([line.content for line in page.lines or []])
             markdown.append("\n")
+            pages.append("\n".join(markdown))
 
-        return "\n".join(markdown)
+        return pages
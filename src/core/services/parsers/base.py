@@ -1,7 +1,82 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable
+from pathlib import Path
+
+import anyio
+
+# A document on disk, in memory, or arriving as an async stream of chunks
+SourceContent = Path | bytes | memoryview | AsyncIterable[bytes]
+
+
+class DocumentSource:
+    """A document to parse, with the file name that gives its type.
+
+    In-memory content is handed to parsers as is, without a temporary file.
+    Content is read at most once, the first time a parser needs it in memory,
+    and shared by every parser given the same source, so a local parse, a
+    cache lookup and a cloud fallback do not read the file again each.
+    """
+
+    def __init__(self, content: SourceContent, name: str | None = None) -> None:
+        """Wrap ``content``; ``name`` is required unless it is a path."""
+        if name is None:
+            if not isinstance(content, Path):
+                msg = "A name is required for documents held in memory"
+                raise ValueError(msg)
+            name = content.name
+        self.content = content
+        self.name = name
+        self._data: bytes | memoryview | None = None
+
+    @classmethod
+    def of(cls, document: "Path | DocumentSource") -> "DocumentSource":
+        """Return ``document`` as a source, wrapping a path as needed."""
+        if isinstance(document, DocumentSource):
+            return document
+        return cls(Path(document))
+
+    @property
+    def suffix(self) -> str:
+        """Lowercase extension of the document's file name."""
+        return Path(self.name).suffix.lower()
+
+    @property
+    def path(self) -> Path | None:
+        """Path of the document on disk, or None when held in memory."""
+        return self.content if isinstance(self.content, Path) else None
+
+    @property
+    def in_memory(self) -> bool:
+        """Whether the content is held in memory, rather than only on disk."""
+        return self._data is not None or self.path is None
+
+    async def read(self) -> bytes | memoryview:
+        """Return the content in memory, reading a file or stream only once."""
+        if self._data is None:
+            if isinstance(self.content, Path):
+                self._data = await anyio.Path(self.content).read_bytes()
+            elif isinstance(self.content, bytes | memoryview):
+                self._data = self.content
+            else:
+                buffer = bytearray()
+                async for chunk in self.content:
+                    buffer += chunk
+                self._data = memoryview(buffer)
+        return self._data
 
 
 class AbstractDocumentParser(ABC):  # noqa: D101
+    # Separator used to join per-page markdown into a single document; parsers
+    # that hand documents to another parser take its separator once parsed
+    page_separator = "\n\n"
+
     @abstractmethod
     async def parse(self) -> str:  # noqa: D102
         pass
+
+    async def parse_pages(self) -> list[str]:
+        """Parse the document into markdown, one string per page.
+
+        Parsers that cannot split by page return the whole document as one page.
+        """
+        return [await self.parse()]
@@ -0,0 +1,70 @@
+import json
+import logging
+from pathlib import Path
+
+from core.utils.blobs import blob_store
+from core.utils.cache import DiskCache, asha256_bytes, parse_cache
+
+from .base import AbstractDocumentParser, DocumentSource
+
+logger = logging.getLogger(__name__)
+
+
+class CachedDocumentParser(AbstractDocumentParser):
+    """Parser wrapper that serves previously parsed documents from a local cache.
+
+    Entries are keyed on the SHA-256 of the file content together with the
+    parser name and language, so re-uploads of the same file under another
+    name still hit the cache.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        parser: AbstractDocumentParser,
+        name: str,
+        source: Path | DocumentSource,
+        language: str = "en",
+        cache: DiskCache = parse_cache,
+    ) -> None:
+        self.parser = parser
+        self.name = name
+        self.source = DocumentSource.of(source)
+        self.language = language
+        self.cache = cache
+        self.page_separator = parser.page_separator
+
+    async def parse(self) -> str:
+        """Return cached markdown for the document, parsing it on a miss."""
+        pages = await self.parse_pages()
+        return self.page_separator.join(pages)
+
+    async def parse_pages(self) -> list[str]:
+        """Return cached per-page markdown, parsing the document on a miss."""
+        digest = await self._digest()
+        key = f"pages:{self.name}:{self.language}:{digest}"
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            logger.info(f"⚡ Parse cache hit for {self.source.name} ({self.name})")
+            entry = json.loads(cached)
+            # Entries written before separators were cached hold only the pages
+            if isinstance(entry, list):
+                return entry
+            self.page_separator = entry["page_separator"]
+            return list(entry["pages"])
+
+        pages = await self.parser.parse_pages()
+        # Routing parsers only know their separator once a backend answered
+        self.page_separator = self.parser.page_separator
+        entry = {"page_separator": self.page_separator, "pages": pages}
+        await self.cache.set(key, json.dumps(entry).encode())
+        return pages
+
+    async def _digest(self) -> str:
+        """Return the SHA-256 of the document's content."""
+        # Documents from the blob store are named after their digest already
+        path = self.source.path
+        if path is not None and (digest := blob_store.digest_of(path)):
+            return digest
+        # Otherwise the content is read once, and shared with the parser on a miss
+        return await asha256_bytes(await self.source.read())
@@ -1,11 +1,9 @@
-import os
 from pathlib import Path
 
-from llama_cloud_services import LlamaParse
+from core.services.providers import provider_pool
+from core.services.scheduler import scheduler
 
-from .base import AbstractDocumentParser
-
-LLAMA_CLOUD_API_KEY = os.getenv("LLAMA_CLOUD_API_KEY")
+from .base import AbstractDocumentParser, DocumentSource
 
 SUPPORTED_EXTENSIONS = {
     ".pdf",
@@ -21,21 +19,36 @@ SUPPORTED_EXTENSIONS = {
 
 
 class LlamaParseParser(AbstractDocumentParser):  # noqa: D101
-    def __init__(self, path: Path, language: str = "en") -> None:  # noqa: D107
-        if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            msg = f"Unsupported file format for LlamaParseParser: '{path.suffix}'. \
+    def __init__(self, source: Path | DocumentSource, language: str = "en") -> None:  # noqa: D107
+        self.source = DocumentSource.of(source)
+        suffix = self.source.suffix
+        if suffix not in SUPPORTED_EXTENSIONS:
+            msg = f"Unsupported file format for LlamaParseParser: '{suffix}'. \
                     Supported formats are: {', '.join(SUPPORTED_EXTENSIONS)}."
             raise ValueError(msg)
-        self.parser = LlamaParse(
-            api_key=LLAMA_CLOUD_API_KEY,
-            language=language,
-            num_workers=4,
-            verbose=True,
-        )
-        self.path = path
+        self.parser = provider_pool.llamaparse(language)
+        self.language = language
 
     async def parse(self) -> str:
         """Parse a document into markdown text."""
-        result = await self.parser.aparse(self.path)
+        return self.page_separator.join(await self.parse_pages())
+
+    async def parse_pages(self) -> list[str]:
+        """Parse a document into markdown text, one string per page.
+
+        The content is uploaded from memory when another parser already read
+        it, or when it was never on disk.
+        """
+        document: Path | bytes
+        if self.source.path is not None and not self.source.in_memory:
+            document = self.source.path
+        else:
+            document = bytes(await self.source.read())
+        result = await scheduler.run(
+            "llamaparse",
+            lambda: self.parser.aparse(
+                document, extra_info={"file_name": self.source.name}
+            ),
+        )
         markdown_documents = result.get_markdown_documents(split_by_page=True)
-        return "\n\n".join(doc.text for doc in markdown_documents)
+        return [doc.text for doc in markdown_documents]
@@ -0,0 +1,163 @@
+import logging
+import re
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+
+import anyio
+from pypdf import PdfReader
+
+from core.utils.config import (
+    PDF_TEXT_MAX_GARBLED_RATIO,
+    PDF_TEXT_MIN_CHARS_PER_PAGE,
+    PDF_TEXT_MIN_PRINTABLE_RATIO,
+)
+from core.utils.metrics import metrics
+
+from .base import AbstractDocumentParser, DocumentSource
+
+logger = logging.getLogger(__name__)
+
+# Two or more spaces separate columns in pypdf's layout mode output
+_COLUMN_GAP = re.compile(r"\s{2,}")
+_GARBLED = re.compile("\ufffd|\\(cid:\\d+\\)")
+_MIN_TABLE_COLUMNS = 3
+_MIN_TABLE_ROWS = 2
+
+
+def _cells(line: str) -> list[str]:
+    return _COLUMN_GAP.split(line.strip())
+
+
+def _table(rows: list[list[str]]) -> str:
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    lines = [f"| {' | '.join(rows[0])} |", f"|{'---|' * width}"]
+    lines.extend(f"| {' | '.join(row)} |" for row in rows[1:])
+    return "\n".join(lines)
+
+
+def layout_to_markdown(text: str) -> str:
+    """Convert layout-preserving page text to markdown.
+
+    Runs of consecutive lines that split into the same number of columns (at
+    least three) become a markdown table; other lines become paragraphs.
+    """
+    blocks: list[str] = []
+    rows: list[list[str]] = []
+
+    def flush_rows() -> None:
+        if len(rows) >= _MIN_TABLE_ROWS:
+            blocks.append(_table(rows))
+        else:
+            blocks.extend(" ".join(row) for row in rows)
+        rows.clear()
+
+    for line in text.splitlines():
+        cells = _cells(line)
+        if len(cells) >= _MIN_TABLE_COLUMNS and (
+            not rows or abs(len(cells) - len(rows[0])) <= 1
+        ):
+            rows.append(cells)
+            continue
+
+        flush_rows()
+        if line.strip():
+            blocks.append(" ".join(cells))
+        elif blocks and blocks[-1]:
+            blocks.append("")
+
+    flush_rows()
+    return "\n".join(blocks).strip()
+
+
+class PdfTextLayerParser(AbstractDocumentParser):
+    """Local parser for PDFs with an embedded text layer.
+
+    Digital PDFs are converted to markdown without any network call. Files that
+    are not PDFs, PDFs with an image page that has too little text or too
+    much undecodable text to be trusted (typically scans), and PDFs with a
+    page that is mostly unprintable characters or replacement glyphs (broken
+    font encodings) are handed to the ``fallback`` cloud parser instead.
+    """
+
+    def __init__(  # noqa: D107, PLR0913
+        self,
+        source: Path | DocumentSource,
+        language: str = "en",
+        fallback: Callable[[DocumentSource, str], AbstractDocumentParser] | None = None,
+        min_chars_per_page: int = PDF_TEXT_MIN_CHARS_PER_PAGE,
+        max_garbled_ratio: float = PDF_TEXT_MAX_GARBLED_RATIO,
+        min_printable_ratio: float = PDF_TEXT_MIN_PRINTABLE_RATIO,
+    ) -> None:
+        self.source = DocumentSource.of(source)
+        self.language = language
+        self.fallback = fallback
+        self.min_chars_per_page = min_chars_per_page
+        self.max_garbled_ratio = max_garbled_ratio
+        self.min_printable_ratio = min_printable_ratio
+
+    async def parse(self) -> str:
+        """Parse the document into markdown text."""
+        pages = await self.parse_pages()
+        return self.page_separator.join(pages)
+
+    async def parse_pages(self) -> list[str]:
+        """Parse the document locally when its text layer is good enough."""
+        pages = None
+        if self.source.suffix == ".pdf":
+            content = await self.source.read()
+            pages = await anyio.to_thread.run_sync(self._extract_pages, content)
+
+        if pages is not None:
+            logger.info(f"📃 Parsed {self.source.name} from its PDF text layer")
+            metrics.incr("parser.text_layer.local")
+            return [layout_to_markdown(page) for page in pages]
+
+        if self.fallback is None:
+            msg = f"No usable text layer in '{self.source.name}' and no fallback parser"
+            raise ValueError(msg)
+
+        metrics.incr("parser.text_layer.fallback")
+        # The fallback reuses the content read above
+        parser = self.fallback(self.source, self.language)
+        pages = await parser.parse_pages()
+        self.page_separator = parser.page_separator
+        return pages
+
+    def _extract_pages(self, content: bytes | memoryview) -> list[str] | None:
+        """Return the layout text of every page, or None if any page is unusable."""
+        try:
+            reader = PdfReader(BytesIO(content))
+            pages = []
+            for page in reader.pages:
+                text = page.extract_text(extraction_mode="layout")
+                # Sparse pages are fine unless they are images needing OCR, but
+                # no page may be garbage from a broken font encoding
+                if not self._printable(text) or (
+                    not self._usable(text) and len(page.images)
+                ):
+                    return None
+                pages.append(text)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"⚠️ Could not read text layer of {self.source.name}: {e}")
+            return None
+
+        return pages if any(self._usable(page) for page in pages) else None
+
+    def _printable(self, text: str) -> bool:
+        """Return whether enough of a page's text is printable and decodable."""
+        chars = "".join(text.split())
+        if not chars:
+            return True
+        unreadable = sum(not char.isprintable() for char in chars)
+        unreadable += sum(len(match) for match in _GARBLED.findall(chars))
+        return 1 - unreadable / len(chars) >= self.min_printable_ratio
+
+    def _usable(self, text: str) -> bool:
+        """Return whether a page holds enough readable text to skip OCR."""
+        chars = len("".join(text.split()))
+        if chars < self.min_chars_per_page:
+            return False
+        garbled = sum(len(match) for match in _GARBLED.findall(text))
+        return garbled / chars <= self.max_garbled_ratio
@@ -0,0 +1,126 @@
+import logging
+import os
+from typing import Any, TypeVar, cast
+
+import httpx
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient
+from azure.core.credentials import AzureKeyCredential
+from llama_cloud_services import LlamaParse
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+from pydantic_ai import Agent
+from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.providers.openai import OpenAIProvider
+
+from core.utils.config import (
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ProviderPool:
+    """Process-wide pool of provider clients and pydantic-ai agents.
+
+    Clients and agents are created once on first use and reused by every
+    extractor, classifier and parser, so documents share keep-alive
+    connections instead of paying for new TLS handshakes.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http_clients: dict[str, httpx.AsyncClient] = {}
+        self._openai_clients: dict[str, AsyncOpenAI] = {}
+        self._agents: dict[tuple[str, str, type[Any]], Agent[None, Any]] = {}
+        self._llamaparse: dict[str, LlamaParse] = {}
+        self._document_analysis_client: DocumentAnalysisClient | None = None
+
+    def http_client(self, name: str = "llm") -> httpx.AsyncClient:
+        """Return the pooled HTTP client for a group of providers."""
+        if name not in self._http_clients:
+            self._http_clients[name] = httpx.AsyncClient(limits=self.limits)
+        return self._http_clients[name]
+
+    def openai_client(self, provider: str) -> AsyncOpenAI:
+        """Return the shared OpenAI or Azure OpenAI client."""
+        if provider not in self._openai_clients:
+            if provider == "openai":
+                client = AsyncOpenAI(http_client=self.http_client())
+            elif provider == "azure":
+                client = AsyncAzureOpenAI(
+                    azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+                    api_key=os.environ["AZURE_OPENAI_API_KEY"],
+                    api_version="2024-07-01-preview",
+                    azure_deployment="gpt-4",
+                    http_client=self.http_client(),
+                )
+            else:
+                msg = f"Unknown LLM provider: {provider}"
+                raise ValueError(msg)
+            self._openai_clients[provider] = client
+        return self._openai_clients[provider]
+
+    def agent(
+        self, provider: str, model_name: str, output_type: type[T]
+    ) -> Agent[None, T]:
+        """Return the shared agent for a (provider, model, output type) combination."""
+        key = (provider, model_name, output_type)
+        if key not in self._agents:
+            model = OpenAIModel(
+                model_name,
+                provider=OpenAIProvider(openai_client=self.openai_client(provider)),
+            )
+            self._agents[key] = Agent(model, output_type=output_type)
+        return cast("Agent[None, T]", self._agents[key])
+
+    def llamaparse(self, language: str) -> LlamaParse:
+        """Return the shared LlamaParse client for a language."""
+        if language not in self._llamaparse:
+            # LlamaParse rewrites base_url and auth headers on its client,
+            # so it gets a pool of its own rather than the shared LLM pool.
+            self._llamaparse[language] = LlamaParse(
+                api_key=os.getenv("LLAMA_CLOUD_API_KEY"),
+                language=language,
+                num_workers=4,
+                verbose=True,
+                custom_client=self.http_client("llamaparse"),
+            )
+        return self._llamaparse[language]
+
+    def document_analysis_client(self) -> DocumentAnalysisClient:
+        """Return the shared Azure Document Intelligence client."""
+        if self._document_analysis_client is None:
+            self._document_analysis_client = DocumentAnalysisClient(
+                endpoint=os.environ["AZURE_DI_ENDPOINT"],
+                credential=AzureKeyCredential(os.environ["AZURE_DI_KEY"]),
+            )
+        return self._document_analysis_client
+
+    async def aclose(self) -> None:
+        """Close all pooled clients; they are recreated on next use."""
+        if self._document_analysis_client is not None:
+            await self._document_analysis_client.close()
+        for client in self._http_clients.values():
+            await client.aclose()
+
+        self._agents.clear()
+        self._openai_clients.clear()
+        self._llamaparse.clear()
+        self._http_clients.clear()
+        self._document_analysis_client = None
+        logger.info("🔌 Closed provider clients")
+
+
+provider_pool = ProviderPool()
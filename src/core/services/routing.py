@@ -0,0 +1,310 @@
+import asyncio
+import functools
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Generic, TypeVar, cast
+
+from core.schemas.classifier import DocumentType
+from core.services.classifiers.base import AbstractClassifier
+from core.services.extractors.base import AbstractExtractor
+from core.services.parsers.base import AbstractDocumentParser, DocumentSource
+from core.services.scheduler import on_admission
+from core.utils.config import (
+    HEDGE_MIN_SAMPLES,
+    HEDGING_ENABLED,
+    ROUTING_LLM_TIMEOUT_SECONDS,
+    ROUTING_MAX_ERROR_RATE,
+    ROUTING_PARSER_TIMEOUT_SECONDS,
+)
+from core.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+B = TypeVar("B")
+
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 200
+
+
+class BackendStats:
+    """Latency and error statistics of one backend for one kind of call."""
+
+    def __init__(self, name: str) -> None:  # noqa: D107
+        self.name = name
+        self.latency_ewma = 0.0
+        self.error_rate = 0.0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def samples(self) -> int:
+        """Number of successful calls in the latency window."""
+        return len(self.latencies)
+
+    @property
+    def p95(self) -> float:
+        """95th percentile latency over the latency window."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the recent error rate is below the failover threshold."""
+        return self.error_rate < ROUTING_MAX_ERROR_RATE
+
+    def success(self, seconds: float) -> None:
+        """Record a successful call and its latency."""
+        if self.latencies:
+            self.latency_ewma += EWMA_ALPHA * (seconds - self.latency_ewma)
+        else:
+            self.latency_ewma = seconds
+        self.latencies.append(seconds)
+        self.error_rate *= 1 - EWMA_ALPHA
+        self._report()
+
+    def failure(self) -> None:
+        """Record a failed or timed out call."""
+        self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+        metrics.incr(f"routing.{self.name}.errors")
+        self._report()
+
+    def _report(self) -> None:
+        metrics.gauge(f"routing.{self.name}.latency_ewma", self.latency_ewma)
+        metrics.gauge(f"routing.{self.name}.latency_p95", self.p95)
+        metrics.gauge(f"routing.{self.name}.error_rate", self.error_rate)
+
+
+class Router:
+    """Routes a call across sibling backends with failover and hedging.
+
+    Backends are tried in their declared order, except that backends whose
+    recent error rate exceeds ``ROUTING_MAX_ERROR_RATE`` are moved to the end.
+    A call that raises or exceeds ``timeout`` fails over to the next backend.
+    With ``hedging`` enabled, a second backend is started once the first has
+    been running longer than its observed p95 latency; the first result wins
+    and the other call is cancelled. Latency is measured from the moment the
+    provider scheduler sends a call, not from when it was queued.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        kind: str,
+        timeout: float,
+        hedging: bool = HEDGING_ENABLED,  # noqa: FBT001
+    ) -> None:
+        self.kind = kind
+        self.timeout = timeout
+        self.hedging = hedging
+        self.stats: dict[str, BackendStats] = {}
+
+    def backend_stats(self, backend: str) -> BackendStats:
+        """Return the statistics of a backend, creating them on first use."""
+        if backend not in self.stats:
+            self.stats[backend] = BackendStats(f"{self.kind}.{backend}")
+        return self.stats[backend]
+
+    def order(self, backends: list[str]) -> list[str]:
+        """Return backends in the order they should be tried."""
+        return sorted(backends, key=lambda name: not self.backend_stats(name).healthy)
+
+    async def _attempt(
+        self,
+        backend: str,
+        call: Callable[[], Awaitable[T]],
+        hedge: asyncio.Event | None = None,
+    ) -> T:
+        """Run one call to ``backend``, setting ``hedge`` once it runs too long.
+
+        The timeout, the latency sample and the hedge delay count from the
+        moment the provider scheduler sends the call, so time spent queueing
+        for a slot or backing off from rate limits is not held against the
+        backend.
+        """
+        stats = self.backend_stats(backend)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        hedge_timer: asyncio.TimerHandle | None = None
+
+        def admitted() -> None:
+            nonlocal started, hedge_timer
+            started = time.perf_counter()
+            timeout.reschedule(loop.time() + self.timeout)
+            delay = self._hedge_delay(backend)
+            if hedge is not None and hedge_timer is None and delay is not None:
+                hedge_timer = loop.call_later(delay, hedge.set)
+
+        try:
+            async with asyncio.timeout(None) as timeout:
+                with on_admission(admitted):
+                    result = await call()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.failure()
+            raise
+        finally:
+            if hedge_timer is not None:
+                hedge_timer.cancel()
+        stats.success(time.perf_counter() - started)
+        return result
+
+    def _hedge_delay(self, backend: str) -> float | None:
+        stats = self.backend_stats(backend)
+        if not self.hedging or stats.samples < HEDGE_MIN_SAMPLES:
+            return None
+        return stats.p95
+
+    def _failure(
+        self,
+        task: asyncio.Task[T],
+        backend: str,
+        failover: bool,  # noqa: FBT001
+    ) -> BaseException | None:
+        """Return the error a finished call raised, if any, and record it."""
+        error = task.exception()
+        if error is not None:
+            logger.warning(f"🔀 {self.kind} call to {backend} failed: {error!r}")
+            if failover:
+                metrics.incr(f"routing.{self.kind}.{backend}.failovers")
+        return error
+
+    async def call(
+        self, backends: dict[str, B], invoke: Callable[[B], Awaitable[T]]
+    ) -> T:
+        """Invoke the best of ``backends``, failing over to its siblings."""
+        pending = self.order(list(backends))
+        running: dict[asyncio.Task[T], str] = {}
+        error: BaseException | None = None
+        hedge = asyncio.Event()
+        hedge_wait = asyncio.create_task(hedge.wait())
+
+        def start(backend: str) -> None:
+            call = functools.partial(invoke, backends[backend])
+            attempt = self._attempt(backend, call, hedge)
+            running[asyncio.create_task(attempt)] = backend
+
+        try:
+            while pending or running:
+                if not running:
+                    start(pending.pop(0))
+
+                done, _ = await asyncio.wait(
+                    {hedge_wait, *running}, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if hedge_wait in done:
+                    done.remove(hedge_wait)
+                    hedge.clear()
+                    hedge_wait = asyncio.create_task(hedge.wait())
+                    # Only a lone call is hedged, and not once it has finished
+                    if pending and len(running) == 1 and not done:
+                        backend = pending.pop(0)
+                        logger.info(f"🏁 Hedging {self.kind} call to {backend}")
+                        metrics.incr(f"routing.{self.kind}.{backend}.hedges")
+                        start(backend)
+                        continue
+
+                for task in done:
+                    attempt = cast("asyncio.Task[T]", task)
+                    error = self._failure(attempt, running.pop(attempt), bool(pending))
+                    if error is None:
+                        return attempt.result()
+        finally:
+            for task in running:
+                task.cancel()
+            hedge_wait.cancel()
+
+        raise error or RuntimeError(f"No {self.kind} backend available")
+
+
+extract_router = Router("extract", ROUTING_LLM_TIMEOUT_SECONDS)
+classify_router = Router("classify", ROUTING_LLM_TIMEOUT_SECONDS)
+parse_router = Router("parse", ROUTING_PARSER_TIMEOUT_SECONDS)
+
+
+class FailoverExtractor(AbstractExtractor[T], Generic[T]):
+    """Extractor that routes each call across sibling LLM backends."""
+
+    def __init__(  # noqa: D107
+        self,
+        backends: dict[str, Callable[[], AbstractExtractor[T]]],
+        router: Router = extract_router,
+    ) -> None:
+        self.backends = backends
+        self.router = router
+
+    @property
+    def model_name(self) -> str:  # type: ignore[override]
+        """Models of every backend, as any of them may answer."""
+        return ",".join(
+            f"{name}={factory().model_name}" for name, factory in self.backends.items()
+        )
+
+    async def extract(self, markdown: str) -> T:
+        """Extract with the first backend that answers successfully."""
+        return await self.router.call(
+            self.backends, lambda factory: factory().extract(markdown)
+        )
+
+
+class FailoverClassifier(AbstractClassifier):
+    """Classifier that routes each call across sibling LLM backends."""
+
+    def __init__(  # noqa: D107
+        self,
+        backends: dict[str, Callable[[], AbstractClassifier]],
+        router: Router = classify_router,
+    ) -> None:
+        self.backends = backends
+        self.router = router
+
+    async def classify(self, markdown: str) -> DocumentType:
+        """Classify with the first backend that answers successfully."""
+        return await self.router.call(
+            self.backends, lambda factory: factory().classify(markdown)
+        )
+
+
+class FailoverDocumentParser(AbstractDocumentParser):
+    """Parser that routes each document across sibling parsing services.
+
+    Backend parsers are only built when they are tried, so a backend that
+    rejects the file type fails over like any other error. Once parsed, the
+    ``page_separator`` is that of the backend that answered.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        source: Path | DocumentSource,
+        language: str,
+        backends: dict[str, Callable[[DocumentSource, str], AbstractDocumentParser]],
+        router: Router = parse_router,
+    ) -> None:
+        self.source = DocumentSource.of(source)
+        self.language = language
+        self.backends = backends
+        self.router = router
+
+    async def parse(self) -> str:
+        """Parse the document with the first backend that succeeds."""
+        pages = await self.parse_pages()
+        return self.page_separator.join(pages)
+
+    async def parse_pages(self) -> list[str]:
+        """Parse the document into pages with the first backend that succeeds."""
+        pages, self.page_separator = await self.router.call(
+            self.backends, self._parse_with
+        )
+        return pages
+
+    async def _parse_with(
+        self, factory: Callable[[DocumentSource, str], AbstractDocumentParser]
+    ) -> tuple[list[str], str]:
+        parser = factory(self.source, self.language)
+        return await parser.parse_pages(), parser.page_separator
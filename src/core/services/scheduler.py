@@ -0,0 +1,235 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import TypeVar
+
+from core.utils.config import (
+    PROVIDER_LIMITS,
+    SCHEDULER_BACKOFF_SECONDS,
+    SCHEDULER_MAX_RETRIES,
+    Priority,
+)
+from core.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HTTP_TOO_MANY_REQUESTS = 429
+HTTP_SERVICE_UNAVAILABLE = 503
+
+
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.DEFAULT)
+_on_admission: ContextVar[Callable[[], None] | None] = ContextVar(
+    "on_admission", default=None
+)
+
+
+@contextmanager
+def scheduling_priority(priority: Priority) -> Iterator[None]:
+    """Run provider calls made inside the block with the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def on_admission(callback: Callable[[], None]) -> Iterator[None]:
+    """Call ``callback`` each time a provider call made inside the block is sent.
+
+    That is once it holds a slot and is within the rate limits, so after any
+    queueing or backoff, and again for each retry after a rate limit.
+    """
+    token = _on_admission.set(callback)
+    try:
+        yield
+    finally:
+        _on_admission.reset(token)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Return the back-off requested by a rate-limited provider error.
+
+    Returns ``None`` when the error is not a rate limit or overload response.
+    Works with OpenAI/pydantic-ai, Azure SDK and httpx errors, which all expose
+    a ``status_code`` on the error or on its ``response``.
+    """
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    if status not in {HTTP_TOO_MANY_REQUESTS, HTTP_SERVICE_UNAVAILABLE}:
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", SCHEDULER_BACKOFF_SECONDS))
+    except (TypeError, ValueError):
+        return SCHEDULER_BACKOFF_SECONDS
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` tokens per minute."""
+
+    def __init__(self, per_minute: float) -> None:  # noqa: D107
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take ``amount`` tokens from the bucket."""
+        self._refill()
+        self.level -= amount
+
+
+class ProviderScheduler:
+    """Admission control for calls to a single provider.
+
+    Callers wait in a priority queue for one of ``max_concurrency`` slots, then
+    for the request and token buckets to allow the call. Rate-limit errors
+    pause the whole provider for the requested retry-after before retrying.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.paused_until = 0.0
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a slot."""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def _report(self) -> None:
+        metrics.gauge(f"scheduler.{self.name}.queue_depth", self.queue_depth)
+        metrics.gauge(f"scheduler.{self.name}.active", self._active)
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self._active < self.max_concurrency and not self.queue_depth:
+            self._active += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._report()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                future.cancel()
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._waiters and self._active < self.max_concurrency:
+            *_, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(None)
+        self._report()
+
+    async def _throttle(self, tokens: float) -> None:
+        while True:
+            wait = max(
+                self.paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens) if self.tokens else 0.0,
+            )
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+
+        self.requests.consume(1)
+        if self.tokens:
+            self.tokens.consume(tokens)
+
+    @asynccontextmanager
+    async def slot(self, tokens: float = 0) -> AsyncIterator[None]:
+        """Hold a concurrency slot for one rate-limited call."""
+        queued_at = time.monotonic()
+        await self._acquire(_priority.get())
+        self._report()
+        try:
+            await self._throttle(tokens)
+            metrics.observe(
+                f"scheduler.{self.name}.wait_seconds", time.monotonic() - queued_at
+            )
+            metrics.incr(f"scheduler.{self.name}.requests")
+            if (callback := _on_admission.get()) is not None:
+                callback()
+            yield
+        finally:
+            self._release()
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: float = 0) -> T:
+        """Run ``call`` within the provider limits, retrying on rate limits."""
+        attempt = 0
+        while True:
+            async with self.slot(tokens):
+                try:
+                    return await call()
+                except Exception as exc:
+                    delay = retry_after(exc)
+                    if delay is None or attempt >= SCHEDULER_MAX_RETRIES:
+                        raise
+                    delay = max(delay, SCHEDULER_BACKOFF_SECONDS * 2**attempt)
+                    self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                    metrics.incr(f"scheduler.{self.name}.throttled")
+                    logger.warning(f"⏳ {self.name} rate limited, backing off {delay}s")
+            attempt += 1
+
+
+class Scheduler:
+    """Registry of per-provider schedulers shared by the whole process."""
+
+    def __init__(self, limits: dict[str, tuple[float, float, int]]) -> None:  # noqa: D107
+        self.limits = limits
+        self._providers: dict[str, ProviderScheduler] = {}
+
+    def provider(self, name: str) -> ProviderScheduler:
+        """Return the scheduler for a provider, creating it on first use."""
+        if name not in self._providers:
+            rpm, tpm, concurrency = self.limits[name]
+            self._providers[name] = ProviderScheduler(name, rpm, tpm, concurrency)
+        return self._providers[name]
+
+    async def run(
+        self, provider: str, call: Callable[[], Awaitable[T]], tokens: float = 0
+    ) -> T:
+        """Run ``call`` through the scheduler of ``provider``."""
+        return await self.provider(provider).run(call, tokens)
+
+
+scheduler = Scheduler(PROVIDER_LIMITS)
@@ -0,0 +1,64 @@
+import logging
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, BinaryIO
+
+from core.utils.blobs import StoredBlob
+from core.utils.process import is_dangerous_file, sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+
+class BatchTooLargeError(ValueError):
+    """Raised when a batch exceeds the allowed number of files or bytes."""
+
+
+def is_zip_upload(filename: str, content_type: str | None) -> bool:
+    """Return whether an uploaded file is a ZIP archive to unpack."""
+    return Path(filename).suffix.lower() == ".zip" or content_type in {
+        "application/zip",
+        "application/x-zip-compressed",
+    }
+
+
+def extract_zip_members(
+    source: BinaryIO,
+    store: Callable[[IO[bytes], str], StoredBlob],
+    max_files: int,
+    max_bytes: int,
+) -> list[tuple[str, StoredBlob]]:
+    """Copy the documents of a ZIP archive to storage, one member at a time.
+
+    Only the central directory is read up front; each member is decompressed
+    straight into ``store`` under its sanitized name. Directories, hidden
+    files and dangerous file types are skipped. Returns the stored file names
+    and blobs.
+    """
+    stored: list[tuple[str, StoredBlob]] = []
+    with zipfile.ZipFile(source) as archive:
+        members = [
+            info
+            for info in archive.infolist()
+            if not info.is_dir()
+            and not any(
+                part.startswith((".", "__MACOSX")) for part in Path(info.filename).parts
+            )
+        ]
+        if len(members) > max_files:
+            msg = f"Archive holds {len(members)} files, the limit is {max_files}"
+            raise BatchTooLargeError(msg)
+        if sum(info.file_size for info in members) > max_bytes:
+            msg = f"Archive expands to more than {max_bytes} bytes"
+            raise BatchTooLargeError(msg)
+
+        for info in members:
+            filename = sanitize_filename(Path(info.filename).name)
+            if is_dangerous_file(filename):
+                logger.warning(f"⛔ Skipped dangerous archive member: {info.filename}")
+                continue
+
+            with archive.open(info) as src:
+                stored.append((filename, store(src, filename)))
+
+    return stored
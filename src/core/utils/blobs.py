@@ -0,0 +1,161 @@
+import contextlib
+import logging
+import os
+import re
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+import anyio
+from starlette.datastructures import UploadFile
+
+from core.utils.config import MAX_UPLOAD_BYTES, UPLOAD_DIR
+from core.utils.ingest import IngestedFile, UploadTooLargeError, copy_hashed
+
+logger = logging.getLogger(__name__)
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    """A document held in the blob store."""
+
+    digest: str
+    size: int
+    path: Path
+
+
+class BlobStore(ABC):
+    """Storage of source documents addressed by the SHA-256 of their content.
+
+    Identical files are stored once, whatever their name. Parsers read blobs
+    straight from the local path of the store.
+    """
+
+    @abstractmethod
+    def put(
+        self, src: IO[bytes], filename: str, max_bytes: int | None = None
+    ) -> StoredBlob:
+        """Store the content of ``src``, blocking; ``filename`` gives its type."""
+
+    @abstractmethod
+    def path(self, digest: str) -> Path | None:
+        """Return the local path of a blob, or None when it is not stored."""
+
+    @abstractmethod
+    def delete(self, digest: str, unused_since: float | None = None) -> bool:
+        """Delete a blob, unless stored again after ``unused_since``.
+
+        Returns whether the blob was deleted.
+        """
+
+    def digest_of(self, path: Path) -> str | None:  # noqa: ARG002
+        """Return the digest of the blob at ``path``, or None outside the store."""
+        return None
+
+    def sweep(self, older_than: float) -> int:  # noqa: ARG002
+        """Remove partial writes started before ``older_than``; returns a count."""
+        return 0
+
+    async def put_upload(
+        self, file: UploadFile, filename: str, max_bytes: int = MAX_UPLOAD_BYTES
+    ) -> StoredBlob:
+        """Store an upload in a worker thread.
+
+        Uploads whose declared size is over ``max_bytes`` are rejected before
+        reading anything, others as soon as the copy goes past it.
+        """
+        if file.size is not None and file.size > max_bytes:
+            msg = f"'{filename}' is larger than {max_bytes} bytes"
+            raise UploadTooLargeError(msg)
+        return await anyio.to_thread.run_sync(self.put, file.file, filename, max_bytes)
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store on the local filesystem, sharded by digest.
+
+    Blobs live at ``<root>/ab/cd/<digest><ext>``. Content is written to a
+    temporary file under ``<root>/incoming`` and renamed into place once
+    complete, so readers never see partial blobs. Storing a blob that is
+    already present only refreshes its modification time.
+    """
+
+    def __init__(self, root: Path) -> None:  # noqa: D107
+        self.root = root
+        self.incoming = root / "incoming"
+
+    def _shard(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4]
+
+    def put(
+        self, src: IO[bytes], filename: str, max_bytes: int | None = None
+    ) -> StoredBlob:
+        """Store the content of ``src``, blocking; ``filename`` gives its type."""
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.incoming / f"{uuid.uuid4().hex}.tmp"
+        try:
+            with tmp_path.open("wb") as dst:
+                ingested = copy_hashed(src, dst, filename, max_bytes)
+            return self._commit(tmp_path, ingested, Path(filename).suffix.lower())
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _commit(
+        self, tmp_path: Path, ingested: IngestedFile, suffix: str
+    ) -> StoredBlob:
+        digest = ingested.sha256
+        existing = self.path(digest)
+        if existing is not None:
+            with contextlib.suppress(FileNotFoundError):
+                # Marks it as used again, a collection under way then keeps it
+                os.utime(existing)
+                return StoredBlob(digest=digest, size=ingested.size, path=existing)
+
+        path = self._shard(digest) / f"{digest}{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.replace(path)
+        logger.info(f"📥 Stored blob {digest[:12]} ({ingested.size} bytes)")
+        return StoredBlob(digest=digest, size=ingested.size, path=path)
+
+    def path(self, digest: str) -> Path | None:
+        """Return the local path of a blob, or None when it is not stored."""
+        return next(self._shard(digest).glob(f"{digest}*"), None)
+
+    def delete(self, digest: str, unused_since: float | None = None) -> bool:
+        """Delete a blob, unless stored again after ``unused_since``.
+
+        Returns whether the blob was deleted.
+        """
+        path = self.path(digest)
+        if path is None:
+            return False
+        try:
+            if unused_since is not None and path.stat().st_mtime >= unused_since:
+                return False
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def digest_of(self, path: Path) -> str | None:
+        """Return the digest of the blob at ``path``, or None outside the store."""
+        digest = path.name[:64]
+        if _DIGEST.fullmatch(digest) and path.parent == self._shard(digest):
+            return digest
+        return None
+
+    def sweep(self, older_than: float) -> int:
+        """Remove partial writes started before ``older_than``; returns a count."""
+        removed = 0
+        for path in self.incoming.glob("*.tmp"):
+            with contextlib.suppress(FileNotFoundError):
+                if path.stat().st_mtime < older_than:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+
+blob_store: BlobStore = LocalBlobStore(UPLOAD_DIR)
@@ -0,0 +1,204 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+import anyio
+from pydantic import BaseModel
+
+from core.utils.config import (
+    LLM_CACHE_DIR,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_TTL_SECONDS,
+    PARSE_CACHE_DIR,
+    PARSE_CACHE_MAX_BYTES,
+)
+from core.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Every entry starts with a magic marker and its creation time
+_HEADER = struct.Struct(">4sd")
+_MAGIC = b"WPC1"
+
+_refreshing: ContextVar[bool] = ContextVar("cache_refreshing", default=False)
+
+
+@contextmanager
+def refreshing_caches() -> Iterator[None]:
+    """Compute values again inside the block, replacing any cached entries."""
+    token = _refreshing.set(True)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+
+def sha256_text(text: str) -> str:
+    """Compute the SHA-256 hex digest of a string."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@functools.cache
+def schema_fingerprint(model: type[BaseModel]) -> str:
+    """Return a short digest of a Pydantic model's JSON schema.
+
+    Any change to fields, types or descriptions yields a new fingerprint, which
+    invalidates cache entries produced against the old schema.
+    """
+    schema = json.dumps(model.model_json_schema(), sort_keys=True)
+    return sha256_text(schema)[:16]
+
+
+def sha256_file(path: Path) -> str:
+    """Compute the SHA-256 hex digest of a file without loading it in memory."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def asha256_file(path: Path) -> str:
+    """Compute the SHA-256 hex digest of a file in a worker thread."""
+    return await anyio.to_thread.run_sync(sha256_file, path)
+
+
+async def asha256_bytes(data: bytes | memoryview) -> str:
+    """Compute the SHA-256 hex digest of content in memory in a worker thread."""
+    return await anyio.to_thread.run_sync(lambda: hashlib.sha256(data).hexdigest())
+
+
+class DiskCache:
+    """Local on-disk key/value store with size-based LRU eviction.
+
+    Entries are stored as one file per key, sharded by the first two characters
+    of the hashed key. Reads bump the file's modification time, so eviction can
+    drop the least recently used entries once the store exceeds ``max_bytes``.
+    Entries older than ``ttl_seconds`` are treated as misses and removed.
+    """
+
+    def __init__(
+        self, root: Path, max_bytes: int, name: str, ttl_seconds: float | None = None
+    ) -> None:
+        """Create a cache rooted at ``root``; ``name`` prefixes its metrics."""
+        self.root = root
+        self.max_bytes = max_bytes
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> bytes | None:
+        """Return the cached value for ``key``, or ``None`` on a miss.
+
+        Inside ``refreshing_caches`` every lookup misses, so the value computed
+        instead overwrites the entry.
+        """
+        if _refreshing.get():
+            metrics.incr(f"{self.name}.refreshes")
+            return None
+        value = await anyio.to_thread.run_sync(self._get, key)
+        metrics.incr(
+            f"{self.name}.hits" if value is not None else f"{self.name}.misses"
+        )
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        """Store ``value`` under ``key``, evicting old entries if needed."""
+        await anyio.to_thread.run_sync(self._set, key, value)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.root / digest[:2] / digest
+
+    def _get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        if len(data) < _HEADER.size:
+            return None
+        magic, created_at = _HEADER.unpack_from(data)
+        expired = self.ttl_seconds is not None and (
+            time.time() - created_at > self.ttl_seconds
+        )
+        if magic != _MAGIC or expired:
+            path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)  # mark as recently used
+        return data[_HEADER.size :]
+
+    def _set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a unique temp file first so readers never see partial entries
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(_HEADER.pack(_MAGIC, time.time()) + value)
+        tmp_path.replace(path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += _HEADER.size + len(value)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan_size(self) -> int:
+        return sum(
+            path.stat().st_size for path in self.root.glob("*/*") if path.is_file()
+        )
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the store is under 90% full."""
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.root.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+
+        self._size = total
+        if evicted:
+            metrics.incr(f"{self.name}.evictions", evicted)
+            logger.info(f"🧹 Evicted {evicted} entries from {self.name}")
+
+
+parse_cache = DiskCache(PARSE_CACHE_DIR, PARSE_CACHE_MAX_BYTES, name="parse_cache")
+
+llm_cache = DiskCache(
+    LLM_CACHE_DIR,
+    LLM_CACHE_MAX_BYTES,
+    name="llm_cache",
+    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+)
@@ -1,10 +1,141 @@
-from enum import Enum
+import os
+from enum import Enum, IntEnum
+from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-DEFAULT_PARSER = "llamaparse"
-DEFAULT_MODEL = "openai"
+# Set to "auto" to route across all backends with failover
+DEFAULT_PARSER = os.getenv("DEFAULT_PARSER", "llamaparse")
+DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "openai")
+
+# Local cache of parsed documents, keyed by file content, parser and language
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+PARSE_CACHE_DIR = Path(os.getenv("PARSE_CACHE_DIR", ".cache/parses"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Local cache of classifier and extractor outputs, keyed by markdown, model and schema
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", ".cache/llm"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Keep-alive connection pool shared by the long-lived provider clients
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Local keyword classifier consulted before the LLM classifier
+HEURISTIC_CLASSIFIER_ENABLED = (
+    os.getenv("HEURISTIC_CLASSIFIER_ENABLED", "true").lower() == "true"
+)
+HEURISTIC_CONFIDENCE_THRESHOLD = float(
+    os.getenv("HEURISTIC_CONFIDENCE_THRESHOLD", "0.95")
+)
+HEURISTIC_CLASSIFIER_WEIGHTS = os.getenv("HEURISTIC_CLASSIFIER_WEIGHTS")
+
+# Long documents are extracted in page groups; 0 pages per chunk disables it
+CHUNKED_EXTRACTION_MIN_PAGES = int(os.getenv("CHUNKED_EXTRACTION_MIN_PAGES", "8"))
+CHUNK_PAGES = int(os.getenv("CHUNK_PAGES", "4"))
+CHUNK_CONCURRENCY = int(os.getenv("CHUNK_CONCURRENCY", "4"))
+
+# Local PDF text layer parsing ahead of the cloud parsers. A page is usable
+# when it has enough text and little undecodable text; a PDF is parsed locally
+# when at least one page is usable, every other page has no image to OCR, and
+# on every page at least PDF_TEXT_MIN_PRINTABLE_RATIO of the characters are
+# printable and decodable
+PDF_TEXT_LAYER_ENABLED = os.getenv("PDF_TEXT_LAYER_ENABLED", "true").lower() == "true"
+PDF_TEXT_MIN_CHARS_PER_PAGE = int(os.getenv("PDF_TEXT_MIN_CHARS_PER_PAGE", "200"))
+PDF_TEXT_MAX_GARBLED_RATIO = float(os.getenv("PDF_TEXT_MAX_GARBLED_RATIO", "0.02"))
+PDF_TEXT_MIN_PRINTABLE_RATIO = float(os.getenv("PDF_TEXT_MIN_PRINTABLE_RATIO", "0.95"))
+
+# Markdown compaction applied before any LLM call
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "true").lower() == "true"
+COMPACTION_REPEAT_RATIO = float(os.getenv("COMPACTION_REPEAT_RATIO", "0.6"))
+# Lines at the top and bottom of each page considered as letterhead or footer
+COMPACTION_EDGE_LINES = int(os.getenv("COMPACTION_EDGE_LINES", "3"))
+COMPACTION_MAX_LINE_LENGTH = int(os.getenv("COMPACTION_MAX_LINE_LENGTH", "1000"))
+
+# Per-provider requests/min, tokens/min (0 disables) and concurrency caps,
+# overridable with e.g. OPENAI_RPM, OPENAI_TPM and OPENAI_MAX_CONCURRENCY
+PROVIDER_LIMITS: dict[str, tuple[float, float, int]] = {
+    provider: (
+        float(os.getenv(f"{provider.upper()}_RPM", str(rpm))),
+        float(os.getenv(f"{provider.upper()}_TPM", str(tpm))),
+        int(os.getenv(f"{provider.upper()}_MAX_CONCURRENCY", str(concurrency))),
+    )
+    for provider, rpm, tpm, concurrency in [
+        ("openai", 500, 300_000, 16),
+        ("azure", 300, 150_000, 16),
+        ("llamaparse", 120, 0, 8),
+        ("azure_di", 900, 0, 8),
+    ]
+}
+SCHEDULER_MAX_RETRIES = int(os.getenv("SCHEDULER_MAX_RETRIES", "3"))
+SCHEDULER_BACKOFF_SECONDS = float(os.getenv("SCHEDULER_BACKOFF_SECONDS", "2"))
+
+# Failover between sibling backends of the "auto" parser and model; a hedged
+# request goes to the next backend once a call runs past the observed p95
+ROUTING_MODELS = os.getenv("ROUTING_MODELS", "openai,azure").split(",")
+ROUTING_PARSERS = os.getenv("ROUTING_PARSERS", "llamaparse,azure").split(",")
+ROUTING_LLM_TIMEOUT_SECONDS = float(os.getenv("ROUTING_LLM_TIMEOUT_SECONDS", "120"))
+ROUTING_PARSER_TIMEOUT_SECONDS = float(
+    os.getenv("ROUTING_PARSER_TIMEOUT_SECONDS", "600")
+)
+ROUTING_MAX_ERROR_RATE = float(os.getenv("ROUTING_MAX_ERROR_RATE", "0.5"))
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+# Durable processing job queue; uploads are kept in a blob store under UPLOAD_DIR,
+# which must be shared with the worker processes
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024**2)))
+# Stored documents no order, invoice or active job refers to are deleted once
+# unused for BLOB_GC_GRACE_SECONDS, checked every BLOB_GC_INTERVAL_SECONDS
+BLOB_GC_INTERVAL_SECONDS = float(os.getenv("BLOB_GC_INTERVAL_SECONDS", "3600"))
+BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", str(7 * 24 * 3600)))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "30"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+# Workers running inside the API process; set to 0 when running `wpath worker`
+EMBEDDED_WORKERS = int(os.getenv("EMBEDDED_WORKERS", "1"))
+# Batch uploads: files per batch, total uncompressed bytes, and default number
+# of files of one batch processed at the same time (a hard cap on PostgreSQL,
+# which serializes claims; a soft one that racing claims can exceed elsewhere)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(2 * 1024**3)))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+# Defaults of the standalone `wpath worker` command
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+WORKER_STATS_INTERVAL_SECONDS = float(os.getenv("WORKER_STATS_INTERVAL_SECONDS", "60"))
+WORKER_DRAIN_TIMEOUT_SECONDS = float(os.getenv("WORKER_DRAIN_TIMEOUT_SECONDS", "300"))
+# Job progress streams fall back to polling the database at this interval
+# for jobs run by workers in other processes
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "2"))
+# Intermediate job stages are written to the database in batches at this
+# interval; 0 writes every transition straight through
+JOB_STAGE_FLUSH_SECONDS = float(os.getenv("JOB_STAGE_FLUSH_SECONDS", "0"))
+# Workers renew their lease, and notice cancelled jobs, at this interval
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+# Deadline of a whole job, and of each pipeline stage, in seconds
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "1800"))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "600"))
+CLASSIFY_TIMEOUT_SECONDS = float(os.getenv("CLASSIFY_TIMEOUT_SECONDS", "180"))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "900"))
+# The reaper releases expired leases and fails jobs that are not run by a
+# worker and made no progress (no stage reached nor other update) for
+# JOB_STALE_SECONDS, which must exceed the longest stage timeout
+REAPER_INTERVAL_SECONDS = float(os.getenv("REAPER_INTERVAL_SECONDS", "30"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "3600"))
+# Intermediate outputs of jobs (parsed pages, the markdown sent to the LLM and
+# its output) are kept zlib-compressed, so documents can be extracted again
+# without parsing them again
+ARTIFACTS_ENABLED = os.getenv("ARTIFACTS_ENABLED", "true").lower() == "true"
+ARTIFACT_COMPRESSION_LEVEL = int(os.getenv("ARTIFACT_COMPRESSION_LEVEL", "6"))
+# Jobs of a single user processed at the same time, unless set on the user;
+# 0 means no limit. Like the batch cap, only a hard cap on PostgreSQL
+USER_MAX_CONCURRENT_JOBS = int(os.getenv("USER_MAX_CONCURRENT_JOBS", "0"))
 
 
 class ObjectStatus(str, Enum):  # noqa: D101
@@ -21,6 +152,48 @@ class ProcessingStatus(str, Enum):  # noqa: D101
     PROCESSING = "processing"
     SUCCESS = "success"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Priority(IntEnum):
+    """Scheduling priority of jobs and provider calls; lower values go first."""
+
+    INTERACTIVE = 0
+    DEFAULT = 5
+    BULK = 10
+
+
+class JobStage(str, Enum):
+    """Fine-grained progress of a processing job, streamed to clients."""
+
+    PENDING = "pending"
+    PARSING = "parsing"
+    CLASSIFYING = "classifying"
+    EXTRACTING = "extracting"
+    PERSISTING = "persisting"
+    SUCCESS = "success"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ArtifactKind(str, Enum):
+    """Intermediate output of a processing job kept for re-extraction."""
+
+    PAGES = "pages"  # parsed markdown of each page, before compaction
+    MARKDOWN = "markdown"  # compacted markdown sent to the LLM
+    EXTRACTION = "extraction"  # document type and data returned by the LLM
+
+
+class ExtractionMode(str, Enum):
+    """How the pipeline classifies and extracts documents of unknown type."""
+
+    TWO_STEP = "two_step"  # classifier call, then extractor call
+    COMBINED = "combined"  # one call returning type and data together
+
+
+DEFAULT_EXTRACTION_MODE = ExtractionMode(
+    os.getenv("DEFAULT_EXTRACTION_MODE", ExtractionMode.TWO_STEP.value)
+)
 
 
 class Currency(str, Enum):  # noqa: D101
@@ -0,0 +1,42 @@
+import asyncio
+import contextlib
+from collections import defaultdict
+from collections.abc import Iterator
+
+from core.schemas.job import JobEvent
+
+# Events kept per subscriber before the oldest ones are dropped
+MAX_PENDING_EVENTS = 100
+
+
+class JobEventBus:
+    """In-process publish/subscribe of processing job transitions.
+
+    Only transitions made in this process are delivered; subscribers that need
+    to follow jobs run elsewhere poll the database as well.
+    """
+
+    def __init__(self) -> None:  # noqa: D107
+        self._subscribers: dict[str, set[asyncio.Queue[JobEvent]]] = defaultdict(set)
+
+    def publish(self, event: JobEvent) -> None:
+        """Deliver an event to every subscriber of its job."""
+        for queue in self._subscribers.get(event.job_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @contextlib.contextmanager
+    def subscribe(self, job_id: str) -> Iterator[asyncio.Queue[JobEvent]]:
+        """Receive the events of a job on a queue while the block runs."""
+        queue: asyncio.Queue[JobEvent] = asyncio.Queue(MAX_PENDING_EVENTS)
+        self._subscribers[job_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[job_id].discard(queue)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+
+job_events = JobEventBus()
@@ -0,0 +1,37 @@
+import hashlib
+from dataclasses import dataclass
+from typing import IO
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an uploaded file exceeds the allowed size."""
+
+
+@dataclass(frozen=True)
+class IngestedFile:
+    """Size and SHA-256 of a file copied to storage."""
+
+    size: int
+    sha256: str
+
+
+def copy_hashed(
+    src: IO[bytes], dst: IO[bytes], name: str, max_bytes: int | None = None
+) -> IngestedFile:
+    """Copy ``src`` to ``dst`` chunk by chunk, hashing it on the way.
+
+    Only one chunk is held in memory at a time. The copy stops as soon as it
+    goes past ``max_bytes``; ``name`` identifies the file in that error.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := src.read(COPY_CHUNK_SIZE):
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            msg = f"'{name}' is larger than {max_bytes} bytes"
+            raise UploadTooLargeError(msg)
+        digest.update(chunk)
+        dst.write(chunk)
+    return IngestedFile(size=size, sha256=digest.hexdigest())
@@ -0,0 +1,67 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class Summary:
+    """Running count, total and maximum of an observed value."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        """Average of all observations."""
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    """In-process registry of counters, gauges and summaries."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+        self._summaries: dict[str, Summary] = defaultdict(Summary)
+
+    def incr(self, name: str, value: float = 1.0) -> None:
+        """Increment a counter."""
+        self._counters[name] += value
+
+    def gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Add an observation to a summary."""
+        self._summaries[name].observe(value)
+
+    def counter(self, name: str) -> float:
+        """Return the current value of a counter."""
+        return self._counters.get(name, 0.0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a point-in-time copy of all metrics."""
+        return {
+            "counters": dict(self._counters),
+            "gauges": dict(self._gauges),
+            "summaries": {
+                name: {
+                    "count": summary.count,
+                    "total": summary.total,
+                    "mean": summary.mean,
+                    "max": summary.max,
+                }
+                for name, summary in self._summaries.items()
+            },
+        }
+
+
+metrics = Metrics()
@@ -3,23 +3,38 @@ import re
 from pathlib import Path
 from typing import Any, TypeVar
 
-import anyio
 from fastapi import HTTPException, UploadFile
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.crud import artifacts as crud_artifacts
+from core.crud import blobs as crud_blobs
+from core.crud import jobs as crud_jobs
 from core.db import models
 from core.logic.pipeline import DocumentPipeline
 from core.schemas.classifier import DocumentType
+from core.schemas.job import ProcessingJobUpdate
 from core.services.factories import (
     CREATE_FN_REGISTRY,
     CREATE_SCHEMA_REGISTRY,
     PARSER_REGISTRY,
     RESPONSE_SCHEMA_REGISTRY,
+    UPDATE_FN_REGISTRY,
+    UPDATE_SCHEMA_REGISTRY,
+)
+from core.utils.blobs import StoredBlob, blob_store
+from core.utils.cache import refreshing_caches
+from core.utils.config import (
+    DEFAULT_EXTRACTION_MODE,
+    DEFAULT_PARSER,
+    ArtifactKind,
+    ExtractionMode,
+    JobStage,
+    ProcessingStatus,
 )
-from core.utils.config import DEFAULT_PARSER
 from core.utils.database import Base
 from core.utils.idsvc import generate_id
+from core.utils.ingest import UploadTooLargeError
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +58,35 @@ def is_dangerous_file(filename: str) -> bool:
     return Path(filename).suffix.lower() in forbidden_extensions
 
 
+async def _store_document(
+    db: AsyncSession, file: UploadFile, filename: str
+) -> StoredBlob:
+    """Store an uploaded document in the blob store."""
+    if is_dangerous_file(filename):
+        logger.warning(f"⛔ Rejected dangerous file: {file.filename}")
+        raise HTTPException(status_code=400, detail="Dangerous file type")
+    try:
+        stored = await blob_store.put_upload(file, filename)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    await crud_blobs.register_blobs(db, [stored])
+    return stored
+
+
+async def mark_job_failed(db: AsyncSession, job_id: str, error: Exception) -> None:
+    """Mark a job failed after rolling back its unfinished work."""
+    await db.rollback()
+    await crud_jobs.update_job(
+        db,
+        job_id,
+        ProcessingJobUpdate(
+            status=ProcessingStatus.FAILED,
+            stage=JobStage.FAILED,
+            error_message=str(error),
+        ),
+    )
+
+
 async def process_uploaded_document(  # noqa: PLR0913
     *,
     db: AsyncSession,
@@ -50,50 +94,147 @@ async def process_uploaded_document(  # noqa: PLR0913
     job_id: str,
     file: UploadFile | None = None,
     file_path: Path | None = None,
+    file_name: str | None = None,
+    content_digest: str | None = None,
     lang: str = "en",
+    mode: ExtractionMode = DEFAULT_EXTRACTION_MODE,
+    finalize: bool = True,
+    deadline: float | None = None,
     prefix_map: dict[DocumentType, str] = {  # noqa: B006
         DocumentType.ORDER: "O",
         DocumentType.INVOICE: "I",
     },
 ) -> BaseModel:
-    """Process an uploaded document and create in the database."""
+    """Process an uploaded document and create in the database.
+
+    The job is marked successful once the result is stored, or failed on
+    error. Queue workers pass ``finalize=False`` and settle the job themselves.
+    ``deadline`` bounds the pipeline run, in event loop time. A ``file`` is
+    stored in the blob store first; a ``file_path`` is read in place, and
+    ``content_digest`` names its blob when it comes from the store.
+    """
     if file is not None:
-        if is_dangerous_file(file.filename or "unknown"):
-            logger.warning(f"⛔ Rejected dangerous file: {file.filename}")
-            raise HTTPException(status_code=400, detail="Dangerous file type")
-        tmp_path = Path(f"/tmp/{sanitize_filename(file.filename or 'unknown')}")  # noqa: S108
-        async with await anyio.open_file(tmp_path, "wb") as f:
-            content = await file.read()
-            await f.write(content)
-        delete_after = True
-    elif file_path is not None:
-        tmp_path = file_path
-        delete_after = False
-    else:
+        file_name = sanitize_filename(file.filename or "unknown")
+        stored = await _store_document(db, file, file_name)
+        file_path, content_digest = stored.path, stored.digest
+    elif file_path is None:
         raise ValueError("Provide file or file_path")  # noqa: TRY003
 
     try:
         pipeline: DocumentPipeline[Any] = DocumentPipeline(
-            parser=PARSER_REGISTRY[DEFAULT_PARSER](tmp_path, lang),
+            parser=PARSER_REGISTRY[DEFAULT_PARSER](file_path, lang),
             db=db,
             job_id=job_id,
+            mode=mode,
+            finalize=False,
+            deadline=deadline,
         )
         parsed_entity, document_type = await pipeline.run()
 
         if document_type is None:
-            raise ValueError("❌ Document type could not be determined")  # noqa: TRY003
+            raise ValueError("❌ Document type could not be determined")  # noqa: TRY003, TRY301
 
+        await crud_jobs.update_job_stage(db, job_id, JobStage.PERSISTING)
         parsed_dict = parsed_entity.model_dump()
-        parsed_dict["file_name"] = tmp_path.name
+        parsed_dict["file_name"] = file_name or file_path.name
         parsed_dict["id"] = generate_id(prefix_map[document_type])
 
         create_fn = CREATE_FN_REGISTRY[document_type]
         schema_create = CREATE_SCHEMA_REGISTRY[document_type](**parsed_dict)
         created = await create_fn(db, schema_create, user)
+        # Keeps the source document stored, written along with the job below
+        created.content_digest = content_digest
 
         schema_response = RESPONSE_SCHEMA_REGISTRY[document_type]
-        return schema_response.model_validate(created, from_attributes=True)
+        response = schema_response.model_validate(created, from_attributes=True)
+
+    except Exception as e:
+        if finalize:
+            await mark_job_failed(db, job_id, e)
+        raise
+
+    else:
+        update = ProcessingJobUpdate(result_id=created.id, document_type=document_type)
+        if finalize:
+            update.status = ProcessingStatus.SUCCESS
+            update.stage = JobStage.SUCCESS
+        await crud_jobs.update_job(db, job_id, update)
+        return response
+
+
+async def apply_extraction(
+    db: AsyncSession, document_type: DocumentType, document_id: str, data: BaseModel
+) -> None:
+    """Replace the data of an order or invoice with newly extracted data.
+
+    The document keeps its review status.
+    """
+    changes = UPDATE_SCHEMA_REGISTRY[document_type](
+        **data.model_dump(exclude={"status"})
+    )
+    await UPDATE_FN_REGISTRY[document_type](db, document_id, changes)
+
 
-    finally:
-        if delete_after:
-            tmp_path.unlink(missing_ok=True)
+async def reextract_document(  # noqa: PLR0913
+    *,
+    db: AsyncSession,
+    job_id: str,
+    source_job: models.ProcessingJob,
+    apply: bool = False,
+    mode: ExtractionMode = DEFAULT_EXTRACTION_MODE,
+    finalize: bool = True,
+    deadline: float | None = None,
+) -> tuple[BaseModel, DocumentType]:
+    """Extract the document of ``source_job`` again, from its stored pages.
+
+    The pipeline starts after parsing, with the document type of the source
+    job when known. The new data is returned with its type; with ``apply``
+    it also replaces the data of the order or invoice the source job created.
+    ``job_id`` is settled as in ``process_uploaded_document``.
+    """
+    try:
+        stored = await crud_artifacts.get_artifact(
+            db, source_job.id, ArtifactKind.PAGES
+        )
+        if stored is None:
+            msg = f"❌ Job {source_job.id} has no stored pages to extract from"
+            raise ValueError(msg)  # noqa: TRY301
+
+        known_type = (
+            DocumentType(source_job.document_type) if source_job.document_type else None
+        )
+        pipeline: DocumentPipeline[Any] = DocumentPipeline(
+            pages=stored["pages"],
+            page_separator=stored["page_separator"],
+            document_type=known_type,
+            db=db,
+            job_id=job_id,
+            mode=mode,
+            finalize=False,
+            deadline=deadline,
+        )
+        # A new extraction is the point, so cached model outputs are not reused
+        with refreshing_caches():
+            extracted, document_type = await pipeline.run()
+        # The document only matches the source job's result with the same type
+        result_id = source_job.result_id if document_type == known_type else None
+
+        if apply:
+            if result_id is None:
+                msg = f"❌ Job {source_job.id} has no {document_type.value} to update"
+                raise ValueError(msg)  # noqa: TRY301
+            await crud_jobs.update_job_stage(db, job_id, JobStage.PERSISTING)
+            await apply_extraction(db, document_type, result_id, extracted)
+            logger.info(f"♻️ Re-extracted {result_id} from job {source_job.id}")
+
+    except Exception as e:
+        if finalize:
+            await mark_job_failed(db, job_id, e)
+        raise
+
+    update = ProcessingJobUpdate(result_id=result_id, document_type=document_type)
+    if finalize:
+        update.status = ProcessingStatus.SUCCESS
+        update.stage = JobStage.SUCCESS
+    await crud_jobs.update_job(db, job_id, update)
+    return extracted, document_type
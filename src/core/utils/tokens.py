@@ -0,0 +1,7 @@
+# Rough token estimate for GPT-style tokenizers on mixed prose and tables
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a text."""
+    return len(text) // CHARS_PER_TOKEN
@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# Settings read at import time; tests never reach a real database or provider
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("MAILGUN_SIGNING_KEY", "test")
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp())
+os.environ.setdefault("EMBEDDED_WORKERS", "0")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("PARSE_CACHE_ENABLED", "false")
@@ -0,0 +1,39 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from core.services.parsers import pdf_text_parser
+from core.services.parsers.base import DocumentSource
+from core.services.parsers.pdf_text_parser import PdfTextLayerParser
+
+READABLE = "Invoice 2024-001 for Customer, Street 1, total 121.00 EUR. " * 5
+
+
+def _reader(*texts: str) -> SimpleNamespace:
+    """Return a stand-in PdfReader whose pages hold ``texts`` and no images."""
+    pages = [
+        SimpleNamespace(extract_text=lambda text=text, **_: text, images=[])
+        for text in texts
+    ]
+    return SimpleNamespace(pages=pages)
+
+
+class TextLayerAcceptanceTest(unittest.TestCase):
+    """Which text layers are parsed locally rather than sent to OCR."""
+
+    def setUp(self) -> None:
+        """Create a parser for an in-memory PDF."""
+        self.parser = PdfTextLayerParser(DocumentSource(b"", "document.pdf"))
+
+    def _extract(self, *texts: str) -> list[str] | None:
+        with patch.object(pdf_text_parser, "PdfReader", lambda _: _reader(*texts)):
+            return self.parser._extract_pages(b"")  # noqa: SLF001
+
+    def test_sparse_page_without_images_is_kept(self) -> None:
+        """A short but readable page does not need OCR."""
+        assert self._extract(READABLE, "Page 2 of 2") == [READABLE, "Page 2 of 2"]
+
+    def test_garbled_page_without_images_is_rejected(self) -> None:
+        """A page of replacement glyphs and control characters goes to OCR."""
+        garbled = "�\x01\x02(cid:12)(cid:7) ab" * 20
+        assert self._extract(READABLE, garbled) is None
@@ -0,0 +1,53 @@
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+from core.logic.pipeline import DocumentPipeline
+from core.schemas.classifier import DocumentType
+from core.schemas.order import Order, OrderLines
+from core.services.extractors.base import AbstractExtractor
+from core.services.factories import LINE_ITEMS_EXTRACTOR_REGISTRY
+
+
+class FakeExtractor(AbstractExtractor[Any]):
+    """Extractor returning a fixed result and recording its calls."""
+
+    def __init__(self, result: Any) -> None:  # noqa: ANN401, D107
+        self.result = result
+        self.calls = 0
+
+    async def extract(self, markdown: str) -> Any:  # noqa: ANN401, ARG002
+        """Return the fixed result."""
+        self.calls += 1
+        return self.result
+
+
+class ChunkedModelTest(unittest.IsolatedAsyncioTestCase):
+    """Chunked extraction uses the line item extractor of the chosen model."""
+
+    async def test_chunked_run_uses_line_items_of_model(self) -> None:
+        """A long document extracted with azure never calls the default model."""
+        header = FakeExtractor(Order.model_construct(lines=[]))
+        azure_lines = FakeExtractor(OrderLines(lines=[]))
+        openai_lines = FakeExtractor(OrderLines(lines=[]))
+        registry = {
+            ("azure", "order"): lambda: azure_lines,
+            ("openai", "order"): lambda: openai_lines,
+        }
+
+        with patch.dict(LINE_ITEMS_EXTRACTOR_REGISTRY, registry):
+            pipeline = DocumentPipeline[Order](
+                pages=[f"page {number}" for number in range(8)],
+                extractor=header,
+                model="azure",
+                document_type=DocumentType.ORDER,
+                compactor=None,
+                store_artifacts=False,
+                chunk_pages=4,
+                chunk_min_pages=8,
+            )
+            await pipeline.run()
+
+        assert header.calls == 1
+        assert azure_lines.calls == 2
+        assert openai_lines.calls == 0
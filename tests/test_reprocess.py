@@ -0,0 +1,59 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.db import models
+from core.logic.reprocess import Reprocessor, ReprocessSelection
+from core.utils.config import ObjectStatus, ProcessingStatus
+from core.utils.database import Base
+
+
+class ReprocessWithoutSourceTest(unittest.IsolatedAsyncioTestCase):
+    """Documents with nothing to extract from fail without leaving a job behind."""
+
+    async def asyncSetUp(self) -> None:
+        """Create a database holding one order without pages nor source file."""
+        self.directory = Path(tempfile.mkdtemp())
+        engine = create_async_engine(f"sqlite+aiosqlite:///{self.directory / 'db'}")
+        self.addAsyncCleanup(engine.dispose)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        self.session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with self.session_maker() as db:
+            db.add(models.User(id="U1", username="user", email="user@example.com"))
+            db.add(
+                models.Order(
+                    id="O1",
+                    customer_name="Customer",
+                    customer_address="Street 1",
+                    invoice_number="2024-001",
+                    order_date="2024-01-01",
+                    due_date="2024-01-31",
+                    total_excl_vat=100.0,
+                    vat=21.0,
+                    total_incl_vat=121.0,
+                    created_by="U1",
+                    status=ObjectStatus.TO_ACCEPT,
+                )
+            )
+            await db.commit()
+
+    async def test_no_source_fails_without_job(self) -> None:
+        """The document is reported failed and no job is left in progress."""
+        output = self.directory / "reprocess.jsonl"
+        reprocessor = Reprocessor(output=output, session_maker=self.session_maker)
+
+        counts = await reprocessor.run(ReprocessSelection())
+
+        assert counts["failed"] == 1
+        record = json.loads(output.read_text(encoding="utf-8"))
+        assert record["status"] == "failed"
+        assert record["error"] == "No stored pages nor source document"
+        async with self.session_maker() as db:
+            statuses = list(await db.scalars(select(models.ProcessingJob.status)))
+        assert ProcessingStatus.PROCESSING not in statuses